@@ -2,6 +2,7 @@ from django.db import models
 from constance.admin import Config, ConstanceAdmin
 from django.contrib import admin
 from django.apps import apps
+from common.models import ApiLogDailySummary
 from unfold.admin import (
     ModelAdmin,
     StackedInline as BaseStackedInline,
@@ -63,6 +64,29 @@ except admin.sites.AlreadyRegistered:
     pass
 
 
+# --- API log summaries ---
+
+
+@admin.register(ApiLogDailySummary)
+class ApiLogDailySummaryAdmin(BaseModelAdmin):
+    list_display = (
+        "day",
+        "method",
+        "status_code",
+        "request_count",
+        "average_execution_time",
+        "max_execution_time",
+    )
+    list_filter = ("method", "status_code", "day")
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # --- AUTO REGISTRATION FUNCTIONALITY ---
 
 
@@ -1,12 +1,33 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
 from rest_framework import generics
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotAuthenticated
+from drf_spectacular.types import OpenApiTypes
+from common.services.health import readiness
+from common.services.metrics import registry
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from common.serializers import MessageSerializer
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 
+HEALTHY = {"message": "System is healthy"}
+_LIVE_BODY = b'{"status":"ok"}'
+
+
+def liveness(request):
+    """
+    Liveness probe: the process is up and serving. Touches no dependency and
+    bypasses DRF entirely; the body is built once at import time.
+    """
+    return HttpResponse(_LIVE_BODY, content_type="application/json")
+
+
 @extend_schema_view(get=extend_schema(tags=["system"]))
 class HealthCheckView(generics.GenericAPIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     serializer_class = MessageSerializer
 
@@ -14,8 +35,51 @@ class HealthCheckView(generics.GenericAPIView):
         """
         Returns a simple message indicating the API is healthy.
         """
-        data = {"message": "System is healthy"}
+        return Response(HEALTHY)
+
 
-        serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        return Response(serializer.data)
+@extend_schema_view(
+    get=extend_schema(
+        tags=["system"],
+        responses={200: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT},
+    )
+)
+class ReadinessView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        Readiness probe: database, cache and media volume checks with their
+        latencies. Responds 503 when any of them fails or times out.
+        """
+        healthy, results = readiness.status()
+        return Response(
+            {
+                "status": "ok" if healthy else "unavailable",
+                "checks": {name: result.as_dict() for name, result in results.items()},
+            },
+            status=200 if healthy else 503,
+        )
+
+
+@extend_schema_view(
+    get=extend_schema(tags=["system"], responses={200: OpenApiTypes.STR})
+)
+class MetricsView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        Returns request metrics of all workers in Prometheus text format.
+        Requires `Authorization: Bearer <METRICS_TOKEN>` when a token is set.
+        """
+        token = getattr(settings, "METRICS_TOKEN", None)
+        if token:
+            provided = request.headers.get("Authorization", "")
+            if not constant_time_compare(provided, f"Bearer {token}"):
+                raise NotAuthenticated()
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4"
+        )
@@ -1,18 +1,110 @@
 import os
-from typing import Any, Optional
+import time
+import uuid
+import threading
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import receiver
 
 try:
     from constance import config as constance_config
+    from constance import settings as constance_settings
+    from constance.signals import config_updated
+    from constance.utils import get_values
 except Exception:
     constance_config = None
+    constance_settings = None
+    config_updated = None
+    get_values = None
+
+
+VERSION_KEY = "constance:snapshot:ver"
+DEFAULT_SNAPSHOT_TTL = 5.0
+
+_MISSING = object()
+_lock = threading.Lock()
+# Every Constance value of this process, the version stamp it was loaded at,
+# and when the stamp has to be checked again
+_snapshot: dict[str, Any] = {"values": None, "version": None, "expires": 0.0}
+
+
+def _new_stamp() -> str:
+    return uuid.uuid4().hex
+
+
+def _shared_version() -> Optional[str]:
+    try:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = _new_stamp()
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY) or version
+        return version
+    except Exception:
+        # A cache outage degrades to TTL-only refreshes
+        return None
+
+
+def _load() -> Mapping[str, Any]:
+    """All Constance keys in one backend read, defaults filled in."""
+    values = get_values()
+    for key, options in constance_settings.CONFIG.items():
+        if values.get(key) is None:
+            values[key] = options[0]
+    return MappingProxyType(values)
+
+
+def snapshot() -> Mapping[str, Any]:
+    """The cached Constance values of this process.
+
+    Between refreshes a lookup is a dict read. Every `CONSTANCE_SNAPSHOT_TTL`
+    seconds the shared version stamp is compared (one cache read) and the
+    values are reloaded only if another process changed a setting since.
+    """
+    if constance_config is None:
+        return MappingProxyType({})
+    values = _snapshot["values"]
+    if values is not None and time.monotonic() < _snapshot["expires"]:
+        return values
+    with _lock:
+        values = _snapshot["values"]
+        if values is not None and time.monotonic() < _snapshot["expires"]:
+            return values
+        version = _shared_version()
+        if values is None or version is None or version != _snapshot["version"]:
+            _snapshot["values"] = _load()
+            _snapshot["version"] = version
+        ttl = getattr(settings, "CONSTANCE_SNAPSHOT_TTL", DEFAULT_SNAPSHOT_TTL)
+        _snapshot["expires"] = time.monotonic() + ttl
+        return _snapshot["values"]
+
+
+def invalidate() -> None:
+    """Drop this process' snapshot and make every other process reload too."""
+    _snapshot.update(values=None, version=None, expires=0.0)
+    try:
+        cache.set(VERSION_KEY, _new_stamp(), None)
+    except Exception:
+        return
+    # Bump again after commit: another process may have reloaded pre-commit rows
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, _new_stamp(), None))
+
+
+if config_updated is not None:
+
+    @receiver(config_updated, dispatch_uid="common.config.invalidate")
+    def _config_updated(sender, key, old_value, new_value, **kwargs):
+        invalidate()
 
 
 def get(setting: str, default: Any | None = None) -> Any:
     """Return a dynamic setting from Constance, falling back to env or default. rder: Constance (if available) -> os.environ -> default"""
-    if constance_config is not None and hasattr(constance_config, setting):
-        value = getattr(constance_config, setting)
-        if value not in (None, ""):
-            return value
+    value = snapshot().get(setting, _MISSING)
+    if value is not _MISSING and value not in (None, ""):
+        return value
     value = os.getenv(setting)
     return value if value not in (None, "") else default
 
@@ -26,6 +118,22 @@ def get_bool(setting: str, default: bool = False) -> bool:
     return bool(val) if val is not None else default
 
 
+def get_int(setting: str, default: int = 0) -> int:
+    val = get(setting)
+    try:
+        return int(val) if val is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float(setting: str, default: float = 0.0) -> float:
+    val = get(setting)
+    try:
+        return float(val) if val is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
 def get_secret(setting: str, default: Optional[str] = None) -> Optional[str]:
     """Return sensitive value. Pluggable for encryption later.
 
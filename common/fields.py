@@ -1,26 +1,103 @@
 import os
-from common.services.image import ImageOptimizer
-from django.db.models.signals import pre_save, pre_delete
-from django.db.models.fields.files import FileField, ImageField
+import logging
+from PIL import Image
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from common.models import ImageProcessingStatus
+from common.services.blobs import BlobStore
+from common.services.media import MediaCleanup
+from common.services.image import ImageOptimizer, ImageTooLargeError
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete
+from typing import Optional
+from django.db.models.fields.files import (
+    FieldFile,
+    FileDescriptor,
+    FileField,
+    ImageField,
+    ImageFileDescriptor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def validate_image_pixels(value):
+    """Reject decompression bombs from the image header, before any decode."""
+    try:
+        position = value.tell()
+    except Exception:
+        return
+    try:
+        ImageOptimizer.check_pixels(Image.open(value).size)
+    except ImageTooLargeError as e:
+        raise ValidationError(str(e), code="image_too_large")
+    except Exception:
+        # Unreadable images are rejected by ImageField's own validation
+        pass
+    finally:
+        value.seek(position)
+
+
+# Marks a file column whose loaded value is unknown (deferred at load time)
+_NOT_LOADED = object()
+
+
+class SnapshotDescriptorMixin:
+    """
+    Carries the loaded-file snapshot over when ``refresh_from_db`` copies a
+    freshly loaded file onto an existing instance.
+    """
+
+    def __set__(self, instance, value):
+        super().__set__(instance, value)
+        source = getattr(value, "instance", None)
+        if (
+            source is not None
+            and source is not instance
+            and type(source) is type(instance)
+            and source.pk == instance.pk
+        ):
+            key = self.field.snapshot_key
+            if key in source.__dict__:
+                instance.__dict__[key] = source.__dict__[key]
+
+
+class SnapshotFileDescriptor(SnapshotDescriptorMixin, FileDescriptor):
+    pass
+
+
+class SnapshotImageFileDescriptor(SnapshotDescriptorMixin, ImageFileDescriptor):
+    pass
 
 
 class AutoCleanupFieldMixin:
     """
     A mixin that automatically deletes files when either
     the file is replaced or the model is deleted.
+
+    The stored file name is snapshotted on the instance when it is loaded, so
+    replacement detection needs no extra query. Saves whose ``update_fields``
+    exclude the file column skip the check entirely. Files are removed by a
+    background task after the transaction commits (see ``MediaCleanup``).
     """
 
+    @property
+    def snapshot_key(self) -> str:
+        return f"_loaded_{self.attname}"
+
+    def discard(self, name: str) -> None:
+        """
+        Removes a stored file by name once the transaction commits.
+        """
+        MediaCleanup.defer(self, [name])
+
     def delete_file(self, instance, **kwargs):
         """
         Deletes the file from storage when the corresponding field is cleared or model instance is deleted.
         """
         file = getattr(instance, self.name)
-        if file and hasattr(file, "path") and os.path.isfile(file.path):
-            try:
-                os.remove(file.path)
-            except (FileNotFoundError, PermissionError) as e:
-                # Log the error if needed
-                print(f"Error deleting file {file.path}: {e}")
+        if file:
+            self.discard(file.name)
 
     def contribute_to_class(self, cls, name, **kwargs):
         """
@@ -28,29 +105,60 @@ class AutoCleanupFieldMixin:
         """
         super().contribute_to_class(cls, name, **kwargs)
 
+        # Snapshot the stored name on load and after every save
+        post_init.connect(self.snapshot_file, sender=cls)
+        post_save.connect(self.snapshot_file, sender=cls)
+
         # Connect pre_save signal to handle file replacement
         pre_save.connect(self.handle_file_replacement, sender=cls)
 
         # Connect pre_delete signal to handle instance deletion
         pre_delete.connect(self.handle_instance_deletion, sender=cls)
 
-    def handle_file_replacement(self, instance, **kwargs):
+    def snapshot_file(self, instance, **kwargs):
         """
-        Deletes the old file when a new file is uploaded.
+        Remembers the stored file name so replacements are detected in memory.
         """
-        if not instance.pk:
+        value = instance.__dict__.get(self.attname, _NOT_LOADED)
+        if value is _NOT_LOADED:
+            instance.__dict__.pop(self.snapshot_key, None)
             return
+        if isinstance(value, FieldFile):
+            if not value._committed:
+                # An unsaved upload passed to the constructor
+                return
+            value = value.name
+        elif value is not None and not isinstance(value, str):
+            return
+        instance.__dict__[self.snapshot_key] = value or None
 
-        try:
-            old_instance = instance.__class__.objects.get(pk=instance.pk)
-            old_file = getattr(old_instance, self.name)
-            new_file = getattr(instance, self.name)
+    def loaded_name(self, instance) -> Optional[str]:
+        """
+        Name of the file currently stored for `instance`.
+        """
+        name = instance.__dict__.get(self.snapshot_key, _NOT_LOADED)
+        if name is _NOT_LOADED:
+            # The column was deferred when the instance was loaded
+            name = (
+                instance.__class__._base_manager.filter(pk=instance.pk)
+                .values_list(self.attname, flat=True)
+                .first()
+            )
+        return name or None
 
-            if old_file and old_file != new_file:
-                self.delete_file(old_instance)
+    def handle_file_replacement(self, instance, update_fields=None, **kwargs):
+        """
+        Deletes the old file when a new file is uploaded.
+        """
+        if instance._state.adding:
+            return
+        if update_fields is not None and self.attname not in update_fields:
+            return
 
-        except instance.__class__.DoesNotExist:
-            pass
+        old_name = self.loaded_name(instance)
+        new_file = getattr(instance, self.name)
+        if old_name and old_name != (new_file.name if new_file else None):
+            self.discard(old_name)
 
     def handle_instance_deletion(self, instance, **kwargs):
         """
@@ -65,7 +173,7 @@ class AutoCleanupFileField(AutoCleanupFieldMixin, FileField):
     the file is replaced or the model is deleted.
     """
 
-    pass
+    descriptor_class = SnapshotFileDescriptor
 
 
 class AutoCleanupImageField(AutoCleanupFieldMixin, ImageField):
@@ -74,24 +182,232 @@ class AutoCleanupImageField(AutoCleanupFieldMixin, ImageField):
     the file is replaced or the model is deleted.
     """
 
-    pass
+    descriptor_class = SnapshotImageFileDescriptor
 
 
 class OptimizedImageField(AutoCleanupImageField):
-    def __init__(self, *args, format=None, quality=None, max_dimensions=None, **kwargs):
+    """
+    An ImageField that converts uploads to WebP/AVIF.
+
+    With ``optimize_async=True`` the original upload is stored as-is and the
+    conversion is queued on django-q2 once the transaction commits; the
+    worker swaps the optimized file in. ``status_field`` names a model field
+    that tracks the conversion as an ``ImageProcessingStatus``.
+
+    ``variants`` renders resized AVIF/WebP copies next to the stored image
+    (``True`` uses ``IMAGE_VARIANTS``, or pass a name -> (width, height) map).
+
+    ``deduplicate`` stores outputs under the hash of the source bytes and
+    encode options, so re-uploading an image reuses the stored output without
+    encoding again. Shared files are reference-counted by ``BlobStore``.
+    """
+
+    default_validators = [*ImageField.default_validators, validate_image_pixels]
+
+    def __init__(
+        self,
+        *args,
+        format=None,
+        quality=None,
+        max_dimensions=None,
+        optimize_async=False,
+        status_field=None,
+        variants=None,
+        deduplicate=False,
+        **kwargs,
+    ):
         self.image_format = format
         self.image_quality = quality
         self.max_dimensions = max_dimensions
+        self.optimize_async = optimize_async
+        self.status_field = status_field
+        self.variants = variants
+        self.deduplicate = deduplicate
         super().__init__(*args, **kwargs)
 
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if self.optimize_async:
+            pre_save.connect(self.mark_pending, sender=cls)
+            post_save.connect(self.queue_optimization, sender=cls)
+
+    def optimize(self, file):
+        return ImageOptimizer.optimize_image(
+            file,
+            format=self.image_format,
+            quality=self.image_quality,
+            max_dimensions=self.max_dimensions,
+        )
+
+    def store_optimized(self, instance, file) -> Optional[str]:
+        """Encode `file` and store the result (and its variants).
+
+        Returns the stored name, or None when encoding failed. With
+        ``deduplicate`` an existing output for the same source and options is
+        reused without encoding.
+        """
+        storage = self.storage
+        if self.deduplicate:
+            options = ImageOptimizer.resolve_options(
+                self.image_format, self.image_quality, self.max_dimensions
+            )
+            digest = BlobStore.digest(file, *options)
+            blob_name = self.generate_filename(instance, f"{digest}.{options[0]}")
+            if storage.exists(blob_name):
+                BlobStore.acquire(blob_name, digest)
+                return blob_name
+
+        optimized = self.optimize(file)
+        if optimized is file:
+            return None
+        if self.deduplicate:
+            name = storage.save(blob_name, optimized)
+            BlobStore.acquire(name, digest)
+        else:
+            name = storage.save(
+                self.generate_filename(instance, os.path.basename(optimized.name)),
+                optimized,
+            )
+        optimized.close()
+        self.save_variants(FieldFile(instance, self, name))
+        return name
+
+    def discard(self, name: str) -> None:
+        """Remove a stored image and its variants unless other rows share it."""
+        if self.deduplicate and not BlobStore.release(name):
+            return
+        MediaCleanup.defer(
+            self,
+            [*self.variant_names(name), name],
+            blob=name if self.deduplicate else None,
+        )
+
     def pre_save(self, model_instance, add):
         file = getattr(model_instance, self.attname)
-        if file and not file._committed:
-            optimized = ImageOptimizer.optimize_image(
-                file,
-                format=self.image_format,
-                quality=self.image_quality,
-                max_dimensions=self.max_dimensions,
-            )
-            setattr(model_instance, self.attname, optimized)
+        if file and not file._committed and not self.optimize_async:
+            name = self.store_optimized(model_instance, file)
+            if name is not None:
+                setattr(model_instance, self.attname, name)
+                return getattr(model_instance, self.attname)
         return super().pre_save(model_instance, add)
+
+    def variant_sizes(self) -> dict:
+        if not self.variants:
+            return {}
+        return ImageOptimizer.variant_sizes(
+            None if self.variants is True else self.variants
+        )
+
+    def variant_names(self, name: str) -> list[str]:
+        return [
+            ImageOptimizer.variant_name(name, variant, format)
+            for variant in self.variant_sizes()
+            for format in ImageOptimizer.VARIANT_FORMATS
+        ]
+
+    def save_variants(self, file) -> None:
+        """Render and store the size variants of a stored image."""
+        if not self.variants or not file:
+            return
+        try:
+            with file.open("rb"):
+                outputs = ImageOptimizer.generate_variants(
+                    file,
+                    file.name,
+                    variants=self.variant_sizes(),
+                    quality=self.image_quality,
+                )
+        except Exception:
+            logger.exception("Error generating variants for %s", file.name)
+            return
+        for name, content in outputs.items():
+            # Deterministic paths: replace rather than suffix on collision
+            file.storage.delete(name)
+            file.storage.save(name, content)
+
+    def variant_urls(self, file) -> Optional[dict]:
+        """Map variant -> format -> URL for a stored image, or None."""
+        if not self.variants or not file:
+            return None
+        return {
+            variant: {
+                format: file.storage.url(
+                    ImageOptimizer.variant_name(file.name, variant, format)
+                )
+                for format in ImageOptimizer.VARIANT_FORMATS
+            }
+            for variant in self.variant_sizes()
+        }
+
+    def mark_pending(self, instance, **kwargs):
+        """Flag a new upload for background optimization before fields are saved."""
+        file = getattr(instance, self.attname)
+        if not file or file._committed:
+            return
+        instance.__dict__.setdefault("_pending_image_fields", set()).add(self.attname)
+        if self.status_field:
+            setattr(instance, self.status_field, ImageProcessingStatus.PENDING)
+
+    def queue_optimization(self, instance, **kwargs):
+        """Queue the conversion of a freshly stored original after commit."""
+        pending = instance.__dict__.get("_pending_image_fields", set())
+        if self.attname not in pending:
+            return
+        pending.discard(self.attname)
+        args = (
+            instance._meta.label,
+            str(instance.pk),
+            self.name,
+            getattr(instance, self.attname).name,
+        )
+
+        def enqueue():
+            from django_q.tasks import async_task
+
+            async_task("common.tasks.optimize_image_field", *args)
+
+        transaction.on_commit(enqueue)
+
+    def _mark_failed(self, model, pk, source_name: str) -> None:
+        # Saved through the model so post_save receivers (cache invalidation)
+        # see the new status; skipped if the file was replaced meanwhile
+        with transaction.atomic():
+            current = model._base_manager.select_for_update().filter(pk=pk).first()
+            if current is None or getattr(current, self.attname).name != source_name:
+                return
+            setattr(current, self.status_field, ImageProcessingStatus.FAILED)
+            current.save(update_fields=[self.status_field])
+
+    def optimize_stored_file(self, instance) -> bool:
+        """Convert the stored original and swap it in; used by the worker.
+
+        Returns False when the file was replaced meanwhile or encoding failed.
+        """
+        model = instance.__class__
+        file = getattr(instance, self.attname)
+        source_name = file.name
+        with file.open("rb"):
+            try:
+                name = self.store_optimized(instance, file)
+            except ImageTooLargeError:
+                name = None
+        if name is None:
+            if self.status_field:
+                self._mark_failed(model, instance.pk, source_name)
+            return False
+
+        with transaction.atomic():
+            current = (
+                model._base_manager.select_for_update().filter(pk=instance.pk).first()
+            )
+            if current is None or getattr(current, self.attname).name != source_name:
+                self.discard(name)
+                return False
+            setattr(current, self.attname, name)
+            update_fields = [self.attname]
+            if self.status_field:
+                setattr(current, self.status_field, ImageProcessingStatus.READY)
+                update_fields.append(self.status_field)
+            # The replacement handler removes the original once saved
+            current.save(update_fields=update_fields)
+        return True
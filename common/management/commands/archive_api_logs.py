@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from common.services.api_logs import ApiLogArchiver
+
+
+class Command(BaseCommand):
+    help = "Archive API log rows past the retention window into daily gzip files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Retention window in days (defaults to API_LOG_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ApiLogArchiver.BATCH_SIZE,
+            help="Rows archived and deleted per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be archived.",
+        )
+
+    def handle(self, *args, days=None, batch_size=None, dry_run=False, **options):
+        count = ApiLogArchiver.archive(
+            retention_days=days, batch_size=batch_size, dry_run=dry_run
+        )
+        verb = "Would archive" if dry_run else "Archived"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} API log row(s)."))
@@ -0,0 +1,52 @@
+import json
+import timeit
+from django.core.management.base import BaseCommand
+from common.signals import get_masker
+
+
+SAMPLE_PAYLOAD = {
+    "api": "http://localhost/api/workspace/organizations/",
+    "headers": {
+        "CONTENT_TYPE": "application/json",
+        "AUTHORIZATION": "Bearer eyJhbGciOi...",
+        "USER_AGENT": "bench",
+    },
+    "body": {
+        "name": "Acme",
+        "organization": {"api_key": "sk_test_123", "brand": {"color": "#0af"}},
+        "members": [{"email": f"user{i}@example.com", "role": "member"} for i in range(20)],
+    },
+    "method": "POST",
+    "client_ip_address": "127.0.0.1",
+    "response": json.dumps({"id": 1, "token": "abc", "items": list(range(50))}),
+    "status_code": 201,
+    "execution_time": 0.012,
+}
+
+CLEAN_PAYLOAD = {
+    **SAMPLE_PAYLOAD,
+    "headers": {"CONTENT_TYPE": "application/json"},
+    "body": {"members": SAMPLE_PAYLOAD["body"]["members"]},
+    "response": json.dumps({"id": 1, "items": list(range(50))}),
+}
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the per-payload cost of API log masking."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20_000)
+
+    def handle(self, *args, iterations=20_000, **options):
+        mask = get_masker().mask
+        for label, payload in (
+            ("sensitive payload", SAMPLE_PAYLOAD),
+            ("clean payload", CLEAN_PAYLOAD),
+        ):
+            seconds = min(
+                timeit.repeat(lambda: mask(payload), number=iterations, repeat=3)
+            )
+            self.stdout.write(
+                f"{label}: {seconds / iterations * 1e6:.1f} µs per payload "
+                f"({iterations} iterations)"
+            )
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from common.services.media import MediaCleanup
+
+
+class Command(BaseCommand):
+    help = "Delete media files under managed upload paths that no row references."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List orphaned files without deleting them.",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=MediaCleanup.SWEEP_GRACE_PERIOD.total_seconds() / 3600,
+            help="Skip files modified more recently than this.",
+        )
+
+    def handle(self, *args, dry_run=False, grace_hours=None, **options):
+        orphans = MediaCleanup.sweep(
+            grace=timedelta(hours=grace_hours), dry_run=dry_run
+        )
+        for name in orphans:
+            self.stdout.write(name)
+        verb = "Found" if dry_run else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {len(orphans)} orphaned media file(s).")
+        )
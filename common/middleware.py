@@ -0,0 +1,276 @@
+import re
+import sys
+import json
+import time
+import uuid
+import logging
+from typing import Optional
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.urls import Resolver404, resolve
+from drf_api_logger import API_LOGGER_SIGNAL
+from drf_api_logger import apps as api_logger_apps
+from drf_api_logger.middleware.api_logger_middleware import APILoggerMiddleware
+from drf_api_logger.utils import get_client_ip, get_headers, mask_sensitive_data
+from common.signals import get_api_log_policy, get_masker
+from common.services.metrics import (
+    REQUEST_LATENCY,
+    REQUEST_QUERIES,
+    RESPONSE_SIZE,
+    registry,
+)
+from common.services.query_profiler import QueryProfiler, request_profiled
+
+
+logger = logging.getLogger(__name__)
+
+
+class APILogPolicyMiddleware(APILoggerMiddleware):
+    """
+    drf-api-logger middleware that applies the API log policy.
+
+    Excluded routes skip logging before the request body is read, and
+    responses are sampled by status before anything is parsed, so dropped
+    requests cost neither JSON decoding nor a database insert. Bodies above
+    the configured cap are logged as a truncated preview.
+
+    Everything else follows upstream ``APILoggerMiddleware.__call__``
+    (drf-api-logger 1.1.20): path type, content types, body size limits,
+    tracing and the payload sent to the database and signal. Its ``__call__``
+    offers no hook for these decisions, hence the override.
+    """
+
+    PLACEHOLDER_BODIES = {
+        "application/gzip": "** GZIP Archive **",
+        "application/octet-stream": "** Binary File **",
+        "text/calendar": "** Calendar **",
+    }
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.content_types = {"application/json", "application/vnd.api+json"}
+        self.content_types.update(self.PLACEHOLDER_BODIES)
+        extra = getattr(settings, "DRF_API_LOGGER_CONTENT_TYPES", None)
+        if isinstance(extra, (list, tuple)):
+            self.content_types.update(
+                content_type
+                for content_type in extra
+                if re.match(r"^application\/vnd\..+\+json$", content_type)
+            )
+
+    def _body(self, raw: bytes, policy, max_size: int):
+        truncated = policy.cap_body(raw)
+        if truncated is not None:
+            return truncated
+        try:
+            body = json.loads(raw) if raw else ""
+        except ValueError:
+            return ""
+        # Upstream's size limits, on the decoded body
+        if max_size > -1 and sys.getsizeof(body) > max_size:
+            return ""
+        return body
+
+    def _request_body(self, request, policy):
+        # Like upstream, any body that decodes as JSON is logged. Multipart
+        # never does, so uploads are not read into memory for it
+        if request.content_type == "multipart/form-data":
+            return ""
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if policy.max_body_bytes >= 0 and length > policy.max_body_bytes:
+            return f"** {length} bytes not logged **"
+        return self._body(
+            request.body, policy, self.DRF_API_LOGGER_MAX_REQUEST_BODY_SIZE
+        )
+
+    @staticmethod
+    def _raw_host(request) -> str:
+        # The Host as sent, not validated against ALLOWED_HOSTS
+        meta = request.META
+        if settings.USE_X_FORWARDED_HOST and "HTTP_X_FORWARDED_HOST" in meta:
+            return meta["HTTP_X_FORWARDED_HOST"]
+        if "HTTP_HOST" in meta:
+            return meta["HTTP_HOST"]
+        host, port = meta["SERVER_NAME"], str(meta["SERVER_PORT"])
+        default_port = "443" if request.is_secure() else "80"
+        return host if port == default_port else f"{host}:{port}"
+
+    def _api(self, request) -> str:
+        if self.DRF_API_LOGGER_PATH_TYPE == "FULL_PATH":
+            return request.get_full_path()
+        if self.DRF_API_LOGGER_PATH_TYPE == "RAW_URI":
+            # What HttpRequest.get_raw_uri() returned before Django 4.0
+            return (
+                f"{request.scheme}://{self._raw_host(request)}"
+                f"{request.get_full_path()}"
+            )
+        return request.build_absolute_uri()
+
+    def _tracing_id(self, headers) -> Optional[str]:
+        if not self.DRF_API_LOGGER_ENABLE_TRACING:
+            return None
+        tracing_id = None
+        if self.DRF_API_LOGGER_TRACING_ID_HEADER_NAME:
+            tracing_id = headers.get(self.DRF_API_LOGGER_TRACING_ID_HEADER_NAME)
+        if not tracing_id:
+            tracing_id = (
+                self.tracing_func_name()
+                if self.tracing_func_name
+                else str(uuid.uuid4())
+            )
+        return tracing_id
+
+    def __call__(self, request):
+        if self.is_static_or_media_request(request.path) or not (
+            self.DRF_API_LOGGER_DATABASE or self.DRF_API_LOGGER_SIGNAL
+        ):
+            return self.get_response(request)
+
+        policy = get_api_log_policy()
+        if not policy.route_allowed(request.path_info):
+            return self.get_response(request)
+
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            match = None
+        if match is not None and (
+            match.namespace == "admin"
+            or match.url_name in self.DRF_API_LOGGER_SKIP_URL_NAME
+            or match.namespace in self.DRF_API_LOGGER_SKIP_NAMESPACE
+        ):
+            return self.get_response(request)
+
+        start_time = time.time()
+        headers = get_headers(request=request)
+        method = request.method
+        request_body = self._request_body(request, policy)
+        tracing_id = self._tracing_id(headers)
+        if tracing_id:
+            request.tracing_id = tracing_id
+        response = self.get_response(request)
+
+        if (
+            self.DRF_API_LOGGER_STATUS_CODES
+            and response.status_code not in self.DRF_API_LOGGER_STATUS_CODES
+        ):
+            return response
+        if self.DRF_API_LOGGER_METHODS and method not in self.DRF_API_LOGGER_METHODS:
+            return response
+        content_type = response.get("content-type")
+        if content_type not in self.content_types:
+            return response
+        if not policy.should_log(response.status_code):
+            return response
+
+        if content_type in self.PLACEHOLDER_BODIES:
+            response_body = self.PLACEHOLDER_BODIES[content_type]
+        elif getattr(response, "streaming", False):
+            response_body = "** Streaming **"
+        else:
+            response_body = self._body(
+                response.content, policy, self.DRF_API_LOGGER_MAX_RESPONSE_BODY_SIZE
+            )
+
+        mask = get_masker().mask
+        data = dict(
+            api=mask_sensitive_data(self._api(request), mask_api_parameters=True),
+            headers=mask(headers),
+            body=mask(request_body),
+            method=method,
+            client_ip_address=get_client_ip(request),
+            response=mask(response_body),
+            status_code=response.status_code,
+            execution_time=time.time() - start_time,
+            added_on=timezone.now(),
+        )
+        logger_thread = api_logger_apps.LOGGER_THREAD
+        if self.DRF_API_LOGGER_DATABASE and logger_thread:
+            row = data.copy()
+            for key in ("headers", "body", "response"):
+                row[key] = (
+                    json.dumps(row[key], indent=4, ensure_ascii=False)
+                    if row.get(key)
+                    else ""
+                )
+            logger_thread.put_log_data(data=row)
+        if self.DRF_API_LOGGER_SIGNAL:
+            if tracing_id:
+                data["tracing_id"] = tracing_id
+            API_LOGGER_SIGNAL.listen(**data)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Records latency, query count and response size histograms per request,
+    labeled by view, method and status. Exposed by ``MetricsView``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Totals reach METRICS_DIR from a background thread, off the request path
+        registry.start_flusher()
+
+    @staticmethod
+    def view_label(request) -> str:
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<unmatched>"
+        view = getattr(match.func, "cls", None) or getattr(
+            match.func, "view_class", None
+        )
+        if view is not None:
+            return f"{view.__module__}.{view.__name__}"
+        return match.view_name or "<unnamed>"
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        labels = {
+            "view": self.view_label(request),
+            "method": request.method,
+            "status": str(response.status_code),
+        }
+        registry.observe(REQUEST_LATENCY, labels, elapsed)
+        registry.observe(REQUEST_QUERIES, labels, queries[0])
+        if not getattr(response, "streaming", False):
+            registry.observe(RESPONSE_SIZE, labels, len(response.content))
+        return response
+
+
+class QueryProfilerMiddleware:
+    """
+    Debug/CI hook that fingerprints every query of a request and logs query
+    shapes repeated at least ``QUERY_PROFILER_REPEAT_THRESHOLD`` times (the
+    N+1 signature) together with the code lines issuing them. Enabled by
+    ``QUERY_PROFILER_ENABLED``; receivers of ``request_profiled`` get the
+    full profile.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "QUERY_PROFILER_ENABLED", False):
+            return self.get_response(request)
+
+        label = f"{request.method} {request.path}"
+        with QueryProfiler(label) as profile:
+            response = self.get_response(request)
+
+        threshold = getattr(settings, "QUERY_PROFILER_REPEAT_THRESHOLD", 3)
+        if profile.duplicates(threshold):
+            logger.warning("Repeated queries\n%s", profile.report(threshold))
+        request_profiled.send(sender=self.__class__, request=request, profile=profile)
+        return response
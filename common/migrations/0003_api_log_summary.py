@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+SCHEDULE_NAME = "archive-api-logs"
+
+
+def create_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.get_or_create(
+        name=SCHEDULE_NAME,
+        defaults={
+            "func": "common.tasks.archive_api_logs",
+            "schedule_type": "D",
+            "repeats": -1,
+        },
+    )
+
+
+def delete_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(name=SCHEDULE_NAME).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_media_sweep_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiLogDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('total_execution_time', models.FloatField(default=0.0)),
+                ('max_execution_time', models.FloatField(default=0.0)),
+            ],
+            options={
+                'verbose_name': 'API Log Summary',
+                'verbose_name_plural': 'API Log Summaries',
+                'ordering': ('-day', 'method', 'status_code'),
+                'constraints': [models.UniqueConstraint(fields=('day', 'method', 'status_code'), name='unique_api_log_summary_bucket')],
+            },
+        ),
+        migrations.RunPython(create_schedule, delete_schedule),
+    ]
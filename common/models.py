@@ -10,3 +10,54 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ImageProcessingStatus(models.TextChoices):
+    """Lifecycle of an image whose optimization runs in the background."""
+
+    PENDING = "pending", "Pending"
+    READY = "ready", "Ready"
+    FAILED = "failed", "Failed"
+
+
+class MediaBlob(models.Model):
+    """Reference count of a content-addressed media file shared between rows."""
+
+    name = models.CharField(max_length=255, primary_key=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.ref_count})"
+
+
+class ApiLogDailySummary(models.Model):
+    """Per-day request totals kept after raw API log rows are archived."""
+
+    day = models.DateField(db_index=True)
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    request_count = models.PositiveIntegerField(default=0)
+    total_execution_time = models.FloatField(default=0.0)
+    max_execution_time = models.FloatField(default=0.0)
+
+    class Meta:
+        ordering = ("-day", "method", "status_code")
+        verbose_name = "API Log Summary"
+        verbose_name_plural = "API Log Summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "method", "status_code"],
+                name="unique_api_log_summary_bucket",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.method} {self.status_code}: {self.request_count}"
+
+    @property
+    def average_execution_time(self) -> float:
+        if not self.request_count:
+            return 0.0
+        return self.total_execution_time / self.request_count
@@ -0,0 +1,215 @@
+import os
+import gzip
+import json
+import logging
+from pathlib import Path
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from common import config as dyn
+from common.models import ApiLogDailySummary
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = (
+    "id",
+    "added_on",
+    "api",
+    "method",
+    "status_code",
+    "execution_time",
+    "client_ip_address",
+    "headers",
+    "body",
+    "response",
+)
+
+
+class ApiLogArchiver:
+    """Moves drf-api-logger rows past the retention window out of the database.
+
+    Rows are streamed in primary-key order, one batch at a time. A batch is
+    written to gzip-compressed JSON lines files (one per UTC day, named after
+    the batch's first id, e.g. ``2026/10/api-2026-10-01-4001.jsonl.gz``),
+    folded into ``ApiLogDailySummary`` and deleted. Files are written under
+    a ``.part`` name and only published once the delete has committed; a
+    run after a crash publishes or discards what the previous one left, so
+    no row is lost or archived twice.
+
+    Nothing is deleted unless ``API_LOG_ARCHIVE_DIR`` is set; it must point
+    at durable storage.
+    """
+
+    DEFAULT_RETENTION_DAYS = 30
+    BATCH_SIZE = 2000
+    PENDING_SUFFIX = ".part"
+
+    @staticmethod
+    def log_model():
+        from drf_api_logger.utils import database_log_enabled
+
+        if not database_log_enabled():
+            return None
+        from drf_api_logger.models import APILogsModel
+
+        return APILogsModel
+
+    @classmethod
+    def retention_days(cls) -> int:
+        return dyn.get_int("API_LOG_RETENTION_DAYS", cls.DEFAULT_RETENTION_DAYS)
+
+    @staticmethod
+    def archive_dir() -> Optional[Path]:
+        path = getattr(settings, "API_LOG_ARCHIVE_DIR", None)
+        return Path(path) if path else None
+
+    @classmethod
+    def archive_path(cls, day: date, first_id: int) -> Path:
+        return (
+            cls.archive_dir()
+            / f"{day:%Y/%m}"
+            / f"api-{day.isoformat()}-{first_id}.jsonl.gz"
+        )
+
+    @classmethod
+    def archive_paths(cls, day: date) -> List[Path]:
+        """The published archive files of `day`, in primary-key order."""
+        prefix = f"api-{day.isoformat()}-"
+        paths = (cls.archive_dir() / f"{day:%Y/%m}").glob(f"{prefix}*.jsonl.gz")
+        return sorted(
+            paths, key=lambda path: int(path.name[len(prefix) :].split(".", 1)[0])
+        )
+
+    @staticmethod
+    def _day(added_on: datetime) -> date:
+        if timezone.is_aware(added_on):
+            added_on = added_on.astimezone(dt_timezone.utc)
+        return added_on.date()
+
+    @classmethod
+    def _write(cls, rows: List[dict]) -> List[Path]:
+        """Write `rows` to pending files, synced to disk; returns their paths."""
+        by_day: Dict[date, List[dict]] = {}
+        for row in rows:
+            by_day.setdefault(cls._day(row["added_on"]), []).append(row)
+        pending = []
+        for day, day_rows in by_day.items():
+            path = cls.archive_path(day, day_rows[0]["id"])
+            path = path.with_name(path.name + cls.PENDING_SUFFIX)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb") as raw:
+                with gzip.open(raw, "wt", encoding="utf-8") as archive:
+                    for row in day_rows:
+                        archive.write(
+                            json.dumps(row, default=str, separators=(",", ":"))
+                            + "\n"
+                        )
+                raw.flush()
+                os.fsync(raw.fileno())
+            pending.append(path)
+        return pending
+
+    @classmethod
+    def _publish(cls, path: Path) -> None:
+        path.replace(path.with_name(path.name[: -len(cls.PENDING_SUFFIX)]))
+
+    @classmethod
+    def _recover(cls, model) -> None:
+        """Settle the pending files of a run that crashed mid-batch."""
+        for path in cls.archive_dir().glob(f"*/*/*.jsonl.gz{cls.PENDING_SUFFIX}"):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as archive:
+                    ids = [json.loads(line)["id"] for line in archive]
+            except (OSError, EOFError, ValueError):
+                # Cut short while writing, so its batch was never deleted
+                ids = None
+            if ids and not model.objects.filter(id__in=ids).exists():
+                # The batch's delete committed: its rows only live here now
+                cls._publish(path)
+            else:
+                path.unlink()
+
+    @classmethod
+    def _summarize(cls, rows: List[dict]) -> None:
+        buckets: Dict[Tuple[date, str, int], List[float]] = {}
+        for row in rows:
+            key = (cls._day(row["added_on"]), row["method"], row["status_code"])
+            bucket = buckets.setdefault(key, [0, 0.0, 0.0])
+            elapsed = float(row["execution_time"] or 0)
+            bucket[0] += 1
+            bucket[1] += elapsed
+            bucket[2] = max(bucket[2], elapsed)
+        for (day, method, status_code), (count, total, slowest) in buckets.items():
+            summary, _ = ApiLogDailySummary.objects.get_or_create(
+                day=day, method=method, status_code=status_code
+            )
+            ApiLogDailySummary.objects.filter(pk=summary.pk).update(
+                request_count=F("request_count") + count,
+                total_execution_time=F("total_execution_time") + total,
+            )
+            if slowest > summary.max_execution_time:
+                ApiLogDailySummary.objects.filter(
+                    pk=summary.pk, max_execution_time__lt=slowest
+                ).update(max_execution_time=slowest)
+
+    @classmethod
+    def archive(
+        cls,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> int:
+        """Archive and delete rows older than the retention window.
+
+        Returns how many rows were (or, with `dry_run`, would be) archived.
+        """
+        model = cls.log_model()
+        if model is None:
+            return 0
+        retention_days = (
+            cls.retention_days() if retention_days is None else retention_days
+        )
+        cutoff = timezone.now() - timedelta(days=retention_days)
+        expired = model.objects.filter(added_on__lt=cutoff)
+        if dry_run:
+            return expired.count()
+        if cls.archive_dir() is None:
+            logger.warning("API_LOG_ARCHIVE_DIR is not set; keeping expired API logs")
+            return 0
+
+        cls._recover(model)
+        batch_size = batch_size or cls.BATCH_SIZE
+        archived = 0
+        last_id = 0
+        while True:
+            # Walk the primary key index instead of sorting on added_on
+            rows = list(
+                expired.filter(id__gt=last_id)
+                .order_by("id")
+                .values(*ARCHIVED_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            pending = cls._write(rows)
+            try:
+                with transaction.atomic():
+                    cls._summarize(rows)
+                    model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+            except Exception:
+                for path in pending:
+                    path.unlink(missing_ok=True)
+                raise
+            for path in pending:
+                cls._publish(path)
+            archived += len(rows)
+
+        if archived:
+            logger.info(
+                "Archived %s API log rows older than %s days", archived, retention_days
+            )
+        return archived
@@ -0,0 +1,47 @@
+import hashlib
+from django.db.models import F
+from common.models import MediaBlob
+
+
+class BlobStore:
+    """Reference-counted bookkeeping for content-addressed media files.
+
+    A blob is named after the hash of its source bytes and encode parameters,
+    so identical uploads resolve to one stored file. Rows pointing at the file
+    acquire a reference; the file may only be removed once the last reference
+    is released.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    @classmethod
+    def digest(cls, file, *params) -> str:
+        """SHA-256 of the file contents and the parameters that shape the output."""
+        h = hashlib.sha256()
+        for chunk in file.chunks(cls.CHUNK_SIZE):
+            h.update(chunk)
+        file.seek(0)
+        h.update(repr(params).encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def acquire(name: str, digest: str) -> None:
+        blob, created = MediaBlob.objects.get_or_create(
+            name=name, defaults={"digest": digest}
+        )
+        if not created:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+
+    @staticmethod
+    def release(name: str) -> bool:
+        """Drop one reference; True when nothing points at the file anymore.
+
+        Files that were never registered as blobs are always releasable.
+        """
+        shared = MediaBlob.objects.filter(name=name, ref_count__gt=1).update(
+            ref_count=F("ref_count") - 1
+        )
+        if shared:
+            return False
+        MediaBlob.objects.filter(name=name).delete()
+        return True
@@ -0,0 +1,152 @@
+import os
+import time
+import uuid
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def check_database() -> None:
+    """Check out a connection and run a trivial statement."""
+    connection = connections["default"]
+    try:
+        connection.close_if_unusable_or_obsolete()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        # Probe threads are long-lived; never keep a connection in a bad state
+        if connection.errors_occurred:
+            connection.close()
+
+
+def check_cache() -> None:
+    """Round-trip a unique value through the default cache."""
+    key = f"health:probe:{os.getpid()}"
+    token = uuid.uuid4().hex
+    cache.set(key, token, timeout=30)
+    if cache.get(key) != token:
+        raise RuntimeError("cache did not return the value just written")
+
+
+def check_media() -> None:
+    """Create and remove a file in MEDIA_ROOT."""
+    media_root = settings.MEDIA_ROOT
+    os.makedirs(media_root, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=media_root, prefix=".health-") as probe:
+        probe.write(b"ok")
+        probe.flush()
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    name: str
+    ok: bool
+    latency_ms: float
+    error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        data = {"ok": self.ok, "latency_ms": round(self.latency_ms, 2)}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class ReadinessProbe:
+    """Runs dependency checks in parallel, each within its own timeout.
+
+    Results are cached for `ttl` seconds and concurrent callers share a single
+    run, so however often orchestrators and load balancers probe, every
+    dependency sees at most one check per process per TTL. A check that hangs
+    past its timeout is reported as failed while its worker finishes in the
+    background.
+    """
+
+    CHECKS: Dict[str, Callable[[], None]] = {
+        "database": check_database,
+        "cache": check_cache,
+        "media": check_media,
+    }
+
+    def __init__(self, checks: Optional[Dict[str, Callable[[], None]]] = None):
+        self.checks = dict(checks or self.CHECKS)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[float, bool, Dict[str, CheckResult]]] = None
+
+    @property
+    def ttl(self) -> float:
+        return getattr(settings, "HEALTH_CHECK_CACHE_TTL", 5.0)
+
+    @property
+    def timeout(self) -> float:
+        return getattr(settings, "HEALTH_CHECK_TIMEOUT", 2.0)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._pid != os.getpid():
+            # A forked worker inherits the executor but not its threads
+            self._executor = ThreadPoolExecutor(
+                max_workers=2 * len(self.checks), thread_name_prefix="health-probe"
+            )
+            self._pid = os.getpid()
+        return self._executor
+
+    @staticmethod
+    def _timed(name: str, check: Callable[[], None]) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            check()
+        except Exception as exc:
+            elapsed = (time.perf_counter() - start) * 1000
+            logger.warning("Health check %s failed: %s", name, exc)
+            return CheckResult(name, False, elapsed, f"{type(exc).__name__}: {exc}")
+        return CheckResult(name, True, (time.perf_counter() - start) * 1000)
+
+    def _run(self) -> Dict[str, CheckResult]:
+        pool = self._pool()
+        futures = {
+            name: pool.submit(self._timed, name, check)
+            for name, check in self.checks.items()
+        }
+        deadline = time.perf_counter() + self.timeout
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(
+                    timeout=max(deadline - time.perf_counter(), 0)
+                )
+            except FutureTimeout:
+                results[name] = CheckResult(
+                    name, False, self.timeout * 1000, "timed out"
+                )
+        return results
+
+    def status(self) -> Tuple[bool, Dict[str, CheckResult]]:
+        """Whether every dependency is healthy, and the per-check results."""
+        cached = self._cached
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1], cached[2]
+        with self._lock:
+            cached = self._cached
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1], cached[2]
+            results = self._run()
+            healthy = all(result.ok for result in results.values())
+            self._cached = (time.monotonic() + self.ttl, healthy, results)
+            return healthy, results
+
+    def reset(self) -> None:
+        self._cached = None
+
+
+readiness = ReadinessProbe()
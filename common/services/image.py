@@ -1,16 +1,20 @@
 import os
-import io
 import logging
+import tempfile
 from PIL import Image
 from django.conf import settings
-from typing import Optional, Tuple
-from django.core.files.base import ContentFile
+from typing import Dict, Iterable, Optional, Tuple
+from django.core.files.base import File
 import pillow_avif  # noqa (Required for AVIF support)
 
 
 logger = logging.getLogger(__name__)
 
 
+class ImageTooLargeError(ValueError):
+    """Raised when an image declares more pixels than IMAGE_MAX_PIXELS."""
+
+
 class ImageOptimizer:
     """Utility class for image optimization and conversion"""
 
@@ -18,24 +22,139 @@ class ImageOptimizer:
     DEFAULT_FORMAT = "webp"
     DEFAULT_QUALITY = 75
     MAX_DIMENSIONS = (1920, 1080)
+    # ~200 MB of RGBA once decoded; anything larger is treated as a bomb
+    MAX_PIXELS = 50_000_000
+    # Encoded output above this size spills from memory to a temporary file
+    SPOOL_MAX_MEMORY = 1024 * 1024
+    DEFAULT_VARIANTS: Dict[str, Tuple[int, int]] = {
+        "thumbnail": (64, 64),
+        "small": (256, 256),
+        "medium": (768, 768),
+    }
+    VARIANT_FORMATS = ("avif", "webp")
 
     @classmethod
-    def optimize_image(
+    def check_pixels(cls, size: Tuple[int, int]) -> None:
+        """Reject images whose header declares too many pixels to decode."""
+        max_pixels = getattr(settings, "IMAGE_MAX_PIXELS", cls.MAX_PIXELS)
+        if size[0] * size[1] > max_pixels:
+            raise ImageTooLargeError(
+                f"Image of {size[0]}x{size[1]} exceeds the {max_pixels} pixel limit."
+            )
+
+    @classmethod
+    def open_bounded(
+        cls, image_file, target: Optional[Tuple[int, int]] = None
+    ) -> Image.Image:
+        """
+        Opens an image without decoding more pixels than needed.
+
+        Only the header is read to enforce the pixel limit. For JPEGs, draft
+        mode lets the decoder DCT-scale by 1/2, 1/4 or 1/8 while the result
+        still covers `target`, so large photos never decode at full size.
+        """
+        img = Image.open(image_file)
+        cls.check_pixels(img.size)
+        if target and img.format == "JPEG":
+            img.draft(None, target)
+        bands = len(img.getbands())
+        logger.debug(
+            "Decoding %s at %sx%s (~%.1f MB)",
+            getattr(image_file, "name", "image"),
+            img.size[0],
+            img.size[1],
+            img.size[0] * img.size[1] * bands / (1024 * 1024),
+        )
+        return img
+
+    @classmethod
+    def _spool(cls, img: Image.Image, name: str, **save_kwargs) -> File:
+        """Encode into a temporary file instead of a double-buffered BytesIO."""
+        spool = tempfile.SpooledTemporaryFile(max_size=cls.SPOOL_MAX_MEMORY)
+        img.save(spool, **save_kwargs)
+        spool.seek(0)
+        return File(spool, name=name)
+
+    @classmethod
+    def variant_sizes(
+        cls, variants: Optional[Dict[str, Tuple[int, int]]] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        return variants or getattr(settings, "IMAGE_VARIANTS", cls.DEFAULT_VARIANTS)
+
+    @staticmethod
+    def variant_name(name: str, variant: str, format: str) -> str:
+        """Deterministic storage path of a variant, e.g. logos/acme.webp.small.avif
+
+        The full source name is kept so an original and its optimized
+        replacement never share variant paths.
+        """
+        return f"{name}.{variant}.{format}"
+
+    @classmethod
+    def generate_variants(
         cls,
-        image_field,
-        format: Optional[str] = None,
+        image_file,
+        name: str,
+        variants: Optional[Dict[str, Tuple[int, int]]] = None,
+        formats: Iterable[str] = VARIANT_FORMATS,
         quality: Optional[int] = None,
-        max_dimensions: Optional[Tuple[int, int]] = None,
-    ) -> ContentFile:
+    ) -> Dict[str, File]:
         """
-        Optimizes and converts images while preserving quality and transparency.
+        Renders every size variant of an image in each format.
 
         Args:
-            image_field: The uploaded image file
-            format: Output format (webp/avif)
+            image_file: The source image file
+            name: Storage name the variant paths derive from
+            variants: Mapping of variant name to bounding (width, height)
+            formats: Output formats (avif/webp)
             quality: Compression quality (1-100)
-            max_dimensions: Maximum (width, height) tuple
+
+        Returns a mapping of variant storage name to file content.
         """
+        quality = quality or getattr(
+            settings, "IMAGE_CONVERSION_QUALITY", cls.DEFAULT_QUALITY
+        )
+        sizes = sorted(
+            cls.variant_sizes(variants).items(),
+            key=lambda item: item[1][0] * item[1][1],
+            reverse=True,
+        )
+        img = cls.open_bounded(image_file, target=sizes[0][1] if sizes else None)
+        img = (
+            img.convert("RGBA")
+            if img.mode in ("RGBA", "LA", "P")
+            else img.convert("RGB")
+        )
+        outputs: Dict[str, File] = {}
+        # Largest first so each variant is downscaled from the previous one
+        for variant, box in sizes:
+            if img.size[0] > box[0] or img.size[1] > box[1]:
+                img.thumbnail(box, Image.Resampling.LANCZOS)
+            for format in formats:
+                variant_name = cls.variant_name(name, variant, format)
+                if format == "avif":
+                    outputs[variant_name] = cls._spool(
+                        img, variant_name, format="AVIF", quality=quality, speed=8
+                    )
+                else:
+                    outputs[variant_name] = cls._spool(
+                        img,
+                        variant_name,
+                        format="WEBP",
+                        quality=quality,
+                        method=4,
+                        lossless=img.mode == "RGBA",
+                    )
+        return outputs
+
+    @classmethod
+    def resolve_options(
+        cls,
+        format: Optional[str] = None,
+        quality: Optional[int] = None,
+        max_dimensions: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[str, int, Tuple[int, int]]:
+        """Fill in encode options from settings and class defaults."""
         format = (
             format or getattr(settings, "IMAGE_CONVERSION_FORMAT", cls.DEFAULT_FORMAT)
         ).lower()
@@ -48,9 +167,34 @@ class ImageOptimizer:
 
         if format not in cls.ALLOWED_FORMATS:
             format = cls.DEFAULT_FORMAT
+        return format, quality, tuple(max_dimensions)
+
+    @classmethod
+    def optimize_image(
+        cls,
+        image_field,
+        format: Optional[str] = None,
+        quality: Optional[int] = None,
+        max_dimensions: Optional[Tuple[int, int]] = None,
+    ) -> File:
+        """
+        Optimizes and converts images while preserving quality and transparency.
+
+        Args:
+            image_field: The uploaded image file
+            format: Output format (webp/avif)
+            quality: Compression quality (1-100)
+            max_dimensions: Maximum (width, height) tuple
+
+        Raises ImageTooLargeError for images above IMAGE_MAX_PIXELS; any other
+        failure returns the original file unchanged.
+        """
+        format, quality, max_dimensions = cls.resolve_options(
+            format, quality, max_dimensions
+        )
 
         try:
-            img = Image.open(image_field)
+            img = cls.open_bounded(image_field, target=max_dimensions)
 
             # Preserve color profile and metadata
             icc_profile = img.info.get("icc_profile")
@@ -67,9 +211,6 @@ class ImageOptimizer:
             if img.size[0] > max_dimensions[0] or img.size[1] > max_dimensions[1]:
                 img.thumbnail(max_dimensions, Image.Resampling.LANCZOS)
 
-            # Prepare buffer for saving
-            buffer = io.BytesIO()
-
             # Save with appropriate format and settings
             save_kwargs = {
                 "quality": quality,
@@ -81,21 +222,21 @@ class ImageOptimizer:
             if exif:
                 save_kwargs["exif"] = exif
 
-            if format == "avif":
-                save_kwargs["speed"] = 6  # Balance between speed and compression
-                img.save(buffer, format="AVIF", **save_kwargs)
-            else:
-                save_kwargs["method"] = 6  # Best compression
-                save_kwargs["lossless"] = (
-                    img.mode == "RGBA"
-                )  # Use lossless for transparent images
-                img.save(buffer, format="WEBP", **save_kwargs)
-
             # Generate filename without nesting directories
             filename = f"{os.path.splitext(image_field.name)[0]}.{format}"
 
-            return ContentFile(buffer.getvalue(), name=filename)
+            if format == "avif":
+                save_kwargs["speed"] = 6  # Balance between speed and compression
+                return cls._spool(img, filename, format="AVIF", **save_kwargs)
+
+            save_kwargs["method"] = 6  # Best compression
+            save_kwargs["lossless"] = (
+                img.mode == "RGBA"
+            )  # Use lossless for transparent images
+            return cls._spool(img, filename, format="WEBP", **save_kwargs)
 
+        except ImageTooLargeError:
+            raise
         except Exception as e:
             logger.error(f"Error processing image: {e}")
             return image_field
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy:
+    DROP = "drop"
+    BLOCK = "block"
+
+
+# Upper bound on how long the ``block`` policy holds a caller, in seconds
+DEFAULT_BLOCK_TIMEOUT = 5.0
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One compact JSON object per record; dict messages become top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+        }
+        if isinstance(record.msg, dict):
+            entry.update(record.msg)
+        else:
+            entry["message"] = record.getMessage()
+        return json.dumps(entry, default=str, separators=(",", ":"))
+
+
+class BatchFileHandler(logging.FileHandler):
+    """A FileHandler that writes a whole batch of records with one flush."""
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        with self.lock:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+
+class BatchingQueueListener:
+    """Drains a queue on a background thread and hands records over in batches.
+
+    A batch is written once `batch_size` records are waiting or
+    `flush_interval` seconds have passed since the first of them arrived.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        record_queue: queue.Queue,
+        handler: BatchFileHandler,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        self.queue = record_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="api-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            record = self.queue.get()
+            if record is self._sentinel:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stopping = True
+                    break
+                batch.append(record)
+            try:
+                self.handler.emit_batch(batch)
+            except Exception:
+                logger.exception("Failed to write %s API log records", len(batch))
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Non-blocking handoff of log records to a `BatchingQueueListener`.
+
+    Records are queued as-is: formatting and file I/O happen on the writer
+    thread, so the caller only pays for a queue put. The queue is bounded;
+    when it is full the record is dropped (counted in `dropped`) or, with the
+    ``block`` policy, the caller blocks until the writer makes room. A
+    blocked caller gives up after `block_timeout` seconds
+    (``API_LOG_BLOCK_TIMEOUT``) and drops the record, so a stuck disk cannot
+    hang requests forever.
+    The writer thread is started lazily per process, so the handler survives
+    forking web servers.
+    """
+
+    def __init__(
+        self,
+        handler: BatchFileHandler,
+        max_size: int = 10_000,
+        overflow: str = OverflowPolicy.DROP,
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        super().__init__(queue.Queue(max_size))
+        self.target = handler
+        self.max_size = max_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self.listener: Optional[BatchingQueueListener] = None
+
+    def _ensure_listener(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # A forked child inherits neither the thread nor pending records
+            self.queue = queue.Queue(self.max_size)
+            self.listener = BatchingQueueListener(
+                self.queue, self.target, self.batch_size, self.flush_interval
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self._ensure_listener()
+        try:
+            if self.overflow == OverflowPolicy.BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+        self._pid = None
+        self.target.close()
+        super().close()
+
+
+def build_queue_handler(
+    path: str,
+    max_size: int = 10_000,
+    overflow: str = OverflowPolicy.DROP,
+    batch_size: int = 256,
+    flush_interval: float = 1.0,
+    block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+) -> BoundedQueueHandler:
+    """A queue-backed JSON lines writer for `path`, flushed at interpreter exit."""
+    target = BatchFileHandler(path, delay=True)
+    target.setFormatter(JsonLinesFormatter())
+    handler = BoundedQueueHandler(
+        target,
+        max_size=max_size,
+        overflow=overflow,
+        block_timeout=block_timeout,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+    )
+    atexit.register(handler.close)
+    return handler
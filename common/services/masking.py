@@ -0,0 +1,148 @@
+import json
+from typing import Any, Dict, Iterable, Optional
+
+
+MASK = "***FILTERED***"
+TRUNCATED = "***TRUNCATED***"
+
+# First characters of a string that may hold a JSON object or array
+_JSON_START = frozenset("{[ \t\r\n")
+
+
+class _Frame:
+    """A container being walked; copied only once a child actually changes."""
+
+    __slots__ = ("node", "changes", "parent", "key", "depth", "encoded")
+
+    def __init__(self, node, parent=None, key=None, depth=0, encoded=False):
+        self.node = node
+        self.changes: Optional[Dict[Any, Any]] = None
+        self.parent = parent
+        self.key = key
+        self.depth = depth
+        # The node was decoded from a JSON string and is re-encoded if changed
+        self.encoded = encoded
+
+    def change(self, key, value) -> None:
+        if self.changes is None:
+            self.changes = {}
+        self.changes[key] = value
+
+    def result(self):
+        if self.changes is None:
+            return self.node
+        if isinstance(self.node, dict):
+            out = {**self.node, **self.changes}
+        else:
+            out = list(self.node)
+            for index, value in self.changes.items():
+                out[index] = value
+        return json.dumps(out) if self.encoded else out
+
+
+class SensitiveDataMasker:
+    """Masks values of sensitive keys anywhere in a payload.
+
+    The key set is compiled once. Nested dicts, lists and JSON-encoded string
+    bodies are walked iteratively (no recursion limit) within a depth and
+    node budget; containers without sensitive keys are returned as-is, so
+    clean payloads are never copied. Whatever lies beyond the budget is
+    replaced rather than logged unmasked.
+    """
+
+    # Per-key verdict cache, so each distinct key is lowercased once
+    KEY_CACHE_MAX = 4096
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        max_depth: int = 32,
+        max_nodes: int = 10_000,
+        max_json_length: int = 256 * 1024,
+    ):
+        self.keys = frozenset(key.lower() for key in keys)
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_json_length = max_json_length
+        self._verdicts: Dict[str, bool] = {}
+
+    def is_sensitive(self, key: Any) -> bool:
+        if not isinstance(key, str):
+            return False
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = key.lower() in self.keys
+            if len(self._verdicts) < self.KEY_CACHE_MAX:
+                self._verdicts[key] = verdict
+        return verdict
+
+    def _decode(self, value: str):
+        """The container a JSON string body encodes, or None."""
+        if not value or value[0] not in _JSON_START or len(value) > self.max_json_length:
+            return None
+        if value[0] not in "{[" and value.lstrip()[:1] not in ("{", "["):
+            return None
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            return None
+        return decoded if isinstance(decoded, (dict, list)) else None
+
+    def mask(self, data: Any) -> Any:
+        """Return `data` with sensitive values masked, sharing untouched parts."""
+        original, encoded = data, False
+        if isinstance(data, str):
+            decoded = self._decode(data)
+            if decoded is None:
+                return data
+            data, encoded = decoded, True
+        elif not isinstance(data, (dict, list)):
+            return data
+
+        is_sensitive = self.is_sensitive
+        verdicts = self._verdicts
+        decode = self._decode
+        # Breadth-first walk: every frame is queued after its parent
+        frames = [_Frame(data, encoded=encoded)]
+        nodes = 0
+        index = 0
+        while index < len(frames):
+            frame = frames[index]
+            index += 1
+            node = frame.node
+            is_dict = isinstance(node, dict)
+            nodes += len(node)
+            for key, child in node.items() if is_dict else enumerate(node):
+                if is_dict:
+                    sensitive = verdicts.get(key)
+                    if sensitive is None:
+                        sensitive = is_sensitive(key)
+                    if sensitive:
+                        frame.change(key, MASK)
+                        continue
+                if isinstance(child, (dict, list)):
+                    child_encoded = False
+                elif child.__class__ is str:
+                    # Cheap reject before attempting to decode a JSON body
+                    if not child or child[0] not in _JSON_START:
+                        continue
+                    child = decode(child)
+                    if child is None:
+                        continue
+                    child_encoded = True
+                else:
+                    continue
+                if nodes > self.max_nodes or frame.depth >= self.max_depth:
+                    frame.change(key, TRUNCATED)
+                    continue
+                frames.append(_Frame(child, frame, key, frame.depth + 1, child_encoded))
+
+        # Children come after their parents, so rebuild bottom-up
+        for frame in reversed(frames[1:]):
+            value = frame.result()
+            if value is not frame.node:
+                frame.parent.change(frame.key, value)
+        result = frames[0].result()
+
+        # Nothing masked in a JSON string body: hand back the original string
+        return original if encoded and result is data else result
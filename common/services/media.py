@@ -0,0 +1,161 @@
+import logging
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional, Set
+from django.apps import apps
+from django.db import transaction
+from django.db.models import FileField
+from django.utils import timezone
+from django.core.files.storage import Storage, default_storage
+from common.models import MediaBlob
+
+
+logger = logging.getLogger(__name__)
+
+
+class MediaCleanup:
+    """Off-request removal of stored media files.
+
+    Deletions requested while saving or deleting rows are queued once the
+    transaction commits and executed by a django-q2 worker through the
+    storage API, so a rollback never loses a file still referenced by a row.
+    ``sweep`` catches whatever slips through (crashed workers, files written
+    by aborted requests).
+    """
+
+    # Files younger than this may belong to a transaction still in flight
+    SWEEP_GRACE_PERIOD = timedelta(hours=6)
+
+    @staticmethod
+    def defer(field, names: Iterable[str], blob: Optional[str] = None) -> None:
+        """Delete `names` from the storage of `field` after commit.
+
+        `blob` names a deduplicated file: the deletion is skipped if a row
+        acquired it again before the worker ran.
+        """
+        names = [name for name in names if name]
+        if not names:
+            return
+        args = (names, field.model._meta.label, field.name, blob)
+
+        def enqueue():
+            from django_q.tasks import async_task
+
+            async_task("common.tasks.delete_media_files", *args)
+
+        transaction.on_commit(enqueue)
+
+    @staticmethod
+    def storage_for(model_label: Optional[str], field_name: Optional[str]) -> Storage:
+        if not model_label or not field_name:
+            return default_storage
+        return apps.get_model(model_label)._meta.get_field(field_name).storage
+
+    @staticmethod
+    def delete(
+        storage: Storage, names: Iterable[str], blob: Optional[str] = None
+    ) -> int:
+        """Remove files from storage; returns how many were deleted."""
+        if blob and MediaBlob.objects.filter(name=blob).exists():
+            return 0
+        deleted = 0
+        for name in names:
+            try:
+                if storage.exists(name):
+                    storage.delete(name)
+                    deleted += 1
+            except OSError as e:
+                logger.warning("Error deleting media file %s: %s", name, e)
+        return deleted
+
+    @staticmethod
+    def managed_fields() -> list:
+        """Concrete file fields that clean up after themselves."""
+        from common.fields import AutoCleanupFieldMixin
+
+        return [
+            field
+            for model in apps.get_models()
+            for field in model._meta.concrete_fields
+            if isinstance(field, AutoCleanupFieldMixin)
+        ]
+
+    @classmethod
+    def referenced_names(cls) -> Set[str]:
+        """Every stored name a row, a shared blob or a variant still points at."""
+        names: Set[str] = set()
+        variant_fields = []
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if not isinstance(field, FileField):
+                    continue
+                stored = (
+                    model._base_manager.exclude(**{field.attname: ""})
+                    .exclude(**{f"{field.attname}__isnull": True})
+                    .values_list(field.attname, flat=True)
+                    .iterator()
+                )
+                variant_names = getattr(field, "variant_names", None)
+                if variant_names and field.variant_sizes():
+                    variant_fields.append(field)
+                for name in stored:
+                    names.add(name)
+                    if variant_names:
+                        names.update(variant_names(name))
+        # A shared blob keeps its rendered variants alive even with no row
+        # currently pointing at it; blobs don't record their field, so every
+        # variant-rendering field's naming is applied
+        for name in MediaBlob.objects.values_list("name", flat=True).iterator():
+            names.add(name)
+            for field in variant_fields:
+                names.update(field.variant_names(name))
+        return names
+
+    @classmethod
+    def walk(cls, storage: Storage, path: str = "") -> Iterator[str]:
+        directories, files = storage.listdir(path)
+        for name in files:
+            yield f"{path}/{name}" if path else name
+        for directory in directories:
+            yield from cls.walk(storage, f"{path}/{directory}" if path else directory)
+
+    @classmethod
+    def sweep(
+        cls, grace: Optional[timedelta] = None, dry_run: bool = False
+    ) -> List[str]:
+        """Delete files under managed upload directories that nothing references.
+
+        Only directories that an auto-cleanup field uploads into are scanned,
+        and files newer than the grace period are left alone. Returns the
+        orphaned names (deleted unless `dry_run`).
+        """
+        grace = cls.SWEEP_GRACE_PERIOD if grace is None else grace
+        cutoff = timezone.now() - grace
+        referenced = cls.referenced_names()
+
+        roots = {}
+        for field in cls.managed_fields():
+            if isinstance(field.upload_to, str):
+                roots.setdefault(field.upload_to.strip("/"), field.storage)
+
+        orphans: List[str] = []
+        for root, storage in roots.items():
+            try:
+                candidates = list(cls.walk(storage, root))
+            except FileNotFoundError:
+                continue
+            found = []
+            for name in candidates:
+                if name in referenced:
+                    continue
+                try:
+                    if storage.get_modified_time(name) > cutoff:
+                        continue
+                except (NotImplementedError, OSError):
+                    continue
+                found.append(name)
+            if found and not dry_run:
+                cls.delete(storage, found)
+            orphans.extend(found)
+        if orphans:
+            logger.info("Swept %s orphaned media files", len(orphans))
+        return orphans
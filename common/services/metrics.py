@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import uuid
+import bisect
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+from django.conf import settings
+
+
+# Fixed bucket upper bounds; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request, by view, method and status.",
+    LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per request.",
+    QUERY_COUNT_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of the response body.",
+    RESPONSE_SIZE_BUCKETS,
+)
+HISTOGRAMS = {h.name: h for h in (REQUEST_LATENCY, REQUEST_QUERIES, RESPONSE_SIZE)}
+
+# Series: [per-bucket counts..., +Inf count, sum, count]
+Series = List[float]
+
+
+def _series_key(name: str, labels: Mapping[str, str]) -> str:
+    return json.dumps([name, sorted(labels.items())], separators=(",", ":"))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+
+
+class MetricsRegistry:
+    """Histogram counters shared by every worker process through files.
+
+    Each thread records into its own shard, so observing never takes a lock
+    or touches the disk. A daemon thread per process (started by
+    `start_flusher`) writes the merged totals of its shards every
+    ``METRICS_FLUSH_INTERVAL`` seconds to its own file in ``METRICS_DIR``
+    (atomically, via rename); the exposition sums the files of all workers.
+
+    Files of workers that are gone are deleted rather than summed: a file
+    whose pid is no longer alive, or that a newer process with the same pid
+    superseded. Their counters drop out of the totals, which Prometheus
+    treats as a counter reset.
+
+    Liveness is judged by pid, so the directory is per host and container:
+    ``/metrics/`` reports the workers of the container that answers, and
+    every replica has to be scraped on its own. Never share ``METRICS_DIR``
+    between containers.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[str, Series]] = []
+        self._shards_lock = threading.Lock()
+        self._pid = None
+        self._token = None
+        self._last_flush = 0.0
+        # Bumped by every observation; the flusher skips idle intervals
+        self._generation = 0
+        self._flushed_generation = 0
+        self._autoflush = False
+        self._flusher_pid = None
+
+    @property
+    def directory(self) -> Path:
+        return Path(
+            getattr(settings, "METRICS_DIR", Path(settings.BASE_DIR) / "_metrics")
+        )
+
+    @property
+    def flush_interval(self) -> float:
+        return getattr(settings, "METRICS_FLUSH_INTERVAL", 5.0)
+
+    def _shard(self) -> Dict[str, Series]:
+        pid = os.getpid()
+        if self._pid != pid:
+            # Fresh counters after a fork; the parent's totals are its own
+            with self._shards_lock:
+                if self._pid != pid:
+                    self._shards = []
+                    self._local = threading.local()
+                    self._token = uuid.uuid4().hex[:8]
+                    self._pid = pid
+            if self._autoflush:
+                self.start_flusher()
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, histogram: Histogram, labels: Mapping[str, str], value: float):
+        shard = self._shard()
+        key = _series_key(histogram.name, labels)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = [0] * (len(histogram.buckets) + 3)
+        series[bisect.bisect_left(histogram.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+        self._generation += 1
+
+    def snapshot(self) -> Dict[str, Series]:
+        """Totals of this process, merged across thread shards."""
+        self._shard()
+        merged: Dict[str, Series] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, series in shard.copy().items():
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(series)
+                else:
+                    for i, value in enumerate(series):
+                        total[i] += value
+        return merged
+
+    def _path(self) -> Path:
+        return self.directory / f"metrics-{os.getpid()}-{self._token}.json"
+
+    def start_flusher(self) -> None:
+        """Flush this process' totals from a background thread from now on.
+
+        Idempotent, and re-armed automatically in a forked child on its
+        first observation.
+        """
+        self._autoflush = True
+        pid = os.getpid()
+        with self._shards_lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(
+            target=self._flush_loop, args=(pid,), name="metrics-flush", daemon=True
+        ).start()
+
+    def _flush_loop(self, pid: int) -> None:
+        while self._flusher_pid == pid == os.getpid():
+            time.sleep(self.flush_interval)
+            if self._generation != self._flushed_generation:
+                try:
+                    self.flush(force=True)
+                except OSError:
+                    # Retried next interval; metrics never fail a worker
+                    continue
+
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        generation = self._generation
+        snapshot = self.snapshot()
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        path = self._path()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snapshot, separators=(",", ":")))
+        os.replace(tmp, path)
+        self._flushed_generation = generation
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        return True
+
+    def _is_stale(self, path: Path) -> bool:
+        """Whether `path` belongs to a worker that is gone."""
+        try:
+            _, pid, token = path.stem.split("-", 2)
+            pid = int(pid)
+        except ValueError:
+            return True
+        if pid == os.getpid():
+            # Our pid, another token: a dead predecessor the pid was recycled from
+            return token != self._token
+        return not self._pid_alive(pid)
+
+    def collect(self) -> Dict[str, Series]:
+        """Totals of all live worker processes; files of dead ones are removed."""
+        self.flush(force=True)
+        totals: Dict[str, Series] = {}
+        for path in self.directory.glob("metrics-*.json"):
+            if self._is_stale(path):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for key, series in data.items():
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(series)
+                elif len(total) == len(series):
+                    for i, value in enumerate(series):
+                        total[i] += value
+        return totals
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4)."""
+        by_metric: Dict[str, List[Tuple[list, Series]]] = {}
+        for key, series in self.collect().items():
+            name, labels = json.loads(key)
+            by_metric.setdefault(name, []).append((labels, series))
+
+        lines: List[str] = []
+        for name, histogram in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {histogram.documentation}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, series in sorted(by_metric.get(name, ()), key=str):
+                cumulative = 0
+                bounds = [*(repr(float(b)) for b in histogram.buckets), "+Inf"]
+                for bound, count in zip(bounds, series):
+                    cumulative += count
+                    bucket_labels = _format_labels([*labels, ("le", bound)])
+                    lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative:g}")
+                label_text = _format_labels(labels)
+                lines.append(f"{name}_sum{{{label_text}}} {series[-2]}")
+                lines.append(f"{name}_count{{{label_text}}} {series[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
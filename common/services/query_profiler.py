@@ -0,0 +1,144 @@
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from contextlib import ExitStack
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+
+# Sent by QueryProfilerMiddleware with `request` and `profile` once a
+# profiled request has finished
+request_profiled = Signal()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_SAVEPOINT = re.compile(r'"s\d+_x\d+"')
+_WHITESPACE = re.compile(r"\s+")
+
+# Frames from these files are never reported as the origin of a query: the
+# profiler itself, the middleware wrapping requests in execute wrappers and
+# installed packages
+_SKIPPED_FILES = frozenset(
+    {__file__, str(Path(__file__).resolve().parents[1] / "middleware.py")}
+)
+_INTERNAL = (os.sep + "site-packages" + os.sep, os.sep + "dist-packages" + os.sep)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """The shape of a statement: literals become ``?`` and IN lists collapse.
+
+    Two queries that differ only by parameters (including the length of an
+    ``IN (...)`` list) share a fingerprint.
+    """
+    shape = _SAVEPOINT.sub('"?"', sql)
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDERS.sub("(...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryShape:
+    sql: str
+    count: int = 0
+    duration: float = 0.0
+    origins: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class QueryProfile:
+    """Queries executed inside one `QueryProfiler` block, grouped by shape."""
+
+    label: str = ""
+    total: int = 0
+    duration: float = 0.0
+    shapes: Dict[str, QueryShape] = field(default_factory=dict)
+
+    def record(self, sql: str, duration: float, origin: Optional[str]) -> None:
+        key = fingerprint(sql)
+        shape = self.shapes.get(key)
+        if shape is None:
+            shape = self.shapes[key] = QueryShape(sql=key)
+        shape.count += 1
+        shape.duration += duration
+        if origin is not None:
+            shape.origins[origin] = shape.origins.get(origin, 0) + 1
+        self.total += 1
+        self.duration += duration
+
+    @property
+    def max_repeats(self) -> int:
+        return max((shape.count for shape in self.shapes.values()), default=0)
+
+    def duplicates(self, threshold: int = 2) -> List[QueryShape]:
+        """Shapes executed at least `threshold` times, most repeated first."""
+        repeated = [s for s in self.shapes.values() if s.count >= threshold]
+        return sorted(repeated, key=lambda shape: (-shape.count, -shape.duration))
+
+    def report(self, threshold: int = 2) -> str:
+        lines = [
+            f"{self.label or 'block'}: {self.total} queries "
+            f"in {self.duration * 1000:.1f}ms, {len(self.shapes)} distinct"
+        ]
+        for shape in self.duplicates(threshold):
+            lines.append(f"  {shape.count}x {shape.sql}")
+            for origin, count in sorted(shape.origins.items(), key=lambda o: -o[1]):
+                lines.append(f"      {count}x at {origin}")
+        return "\n".join(lines)
+
+
+class QueryProfiler:
+    """Context manager recording every query on every database connection.
+
+    Each query is fingerprinted and attributed to the innermost project frame
+    that issued it (library and profiler frames are skipped), so repeated
+    shapes point at the serializer or view line causing an N+1.
+    """
+
+    def __init__(self, label: str = "", with_origins: bool = True):
+        self.profile = QueryProfile(label=label)
+        self.with_origins = with_origins
+        self._root = str(settings.BASE_DIR) + os.sep
+        self._stack: Optional[ExitStack] = None
+
+    def _origin(self) -> Optional[str]:
+        frame = sys._getframe(2)
+        root = self._root
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if (
+                filename.startswith(root)
+                and filename not in _SKIPPED_FILES
+                and not any(part in filename for part in _INTERNAL)
+            ):
+                path = filename[len(root) :]
+                return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        return None
+
+    def __call__(self, execute, sql, params, many, context):
+        origin = self._origin() if self.with_origins else None
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.profile.record(sql, time.perf_counter() - start, origin)
+
+    def __enter__(self) -> QueryProfile:
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self.profile
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+        return False
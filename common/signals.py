@@ -1,6 +1,18 @@
+import re
+import random
 import logging
 from pathlib import Path
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Pattern, Tuple
+from django.conf import settings
+from common import config as dyn
+from common.services.masking import SensitiveDataMasker
+from common.services.log_writer import (
+    DEFAULT_BLOCK_TIMEOUT,
+    BoundedQueueHandler,
+    OverflowPolicy,
+    build_queue_handler,
+)
 
 
 SENSITIVE_KEYS = {
@@ -28,19 +40,141 @@ def _api_log_path() -> Path:
     return api_log
 
 
+_masker: Optional[SensitiveDataMasker] = None
+
+
+def get_masker() -> SensitiveDataMasker:
+    """The masker compiled from SENSITIVE_KEYS and DRF_API_LOGGER_EXCLUDE_KEYS."""
+    global _masker
+    if _masker is None:
+        _masker = SensitiveDataMasker(
+            SENSITIVE_KEYS | set(getattr(settings, "DRF_API_LOGGER_EXCLUDE_KEYS", ()))
+        )
+    return _masker
+
+
 def _mask_sensitive(data: Dict[str, Any]) -> Dict[str, Any]:
-    # Shallow mask on well-known keys at top level
-    out: Dict[str, Any] = {}
-    for k, v in data.items():
-        if isinstance(k, str) and k.lower() in SENSITIVE_KEYS:
-            out[k] = "***FILTERED***"
-        else:
-            out[k] = v
-    return out
+    # Masks nested dicts, lists and JSON string bodies at any depth
+    return get_masker().mask(data)
+
+
+# --- API log policy ---
+
+
+@dataclass(frozen=True)
+class ApiLogPolicy:
+    """Decides which API requests are logged and how much of their bodies.
+
+    Routes must match an include pattern (when any are set) and no exclude
+    pattern. Sampling rates are keyed by exact status code ("404") or status
+    class ("2xx"); unlisted statuses are always logged.
+    """
+
+    include: Tuple[Pattern, ...] = ()
+    exclude: Tuple[Pattern, ...] = ()
+    sample_rates: Dict[str, float] = field(default_factory=dict)
+    max_body_bytes: int = -1
+    skip_not_modified: bool = True
+
+    def route_allowed(self, path: str) -> bool:
+        if self.include and not any(p.search(path) for p in self.include):
+            return False
+        return not any(p.search(path) for p in self.exclude)
+
+    def sample_rate(self, status_code: int) -> float:
+        rate = self.sample_rates.get(str(status_code))
+        if rate is None:
+            rate = self.sample_rates.get(f"{status_code // 100}xx", 1.0)
+        return rate
+
+    def should_log(self, status_code: int) -> bool:
+        if status_code == 304 and self.skip_not_modified:
+            return False
+        rate = self.sample_rate(status_code)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def cap_body(self, raw: bytes) -> Optional[str]:
+        """A truncated preview when `raw` exceeds the cap, else None."""
+        if self.max_body_bytes < 0 or len(raw) <= self.max_body_bytes:
+            return None
+        preview = raw[: self.max_body_bytes].decode("utf-8", errors="replace")
+        return f"{preview}... [truncated {len(raw)} bytes]"
+
+
+def _split_setting(value: Any) -> list:
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in re.split(r"[,\n]", str(value)) if part.strip()]
+
+
+def _parse_sample_rates(value: Any) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for item in _split_setting(value):
+        key, _, rate = item.partition("=")
+        try:
+            rates[key.strip().lower()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def build_api_log_policy(
+    include: Any = None,
+    exclude: Any = None,
+    sample_rates: Any = None,
+    max_body_bytes: int = -1,
+    skip_not_modified: bool = True,
+) -> ApiLogPolicy:
+    return ApiLogPolicy(
+        include=tuple(re.compile(p) for p in _split_setting(include)),
+        exclude=tuple(re.compile(p) for p in _split_setting(exclude)),
+        sample_rates=_parse_sample_rates(sample_rates),
+        max_body_bytes=max_body_bytes,
+        skip_not_modified=skip_not_modified,
+    )
+
+
+_policy_cache: Dict[str, Any] = {"key": None, "policy": None}
+
+
+def get_api_log_policy() -> ApiLogPolicy:
+    """The current policy from Constance/env, recompiled only when it changes.
+
+    Settings come from the in-process Constance snapshot, so building the key
+    costs a few dict reads and an admin change applies on the next request.
+    """
+    key = (
+        dyn.get("API_LOG_INCLUDE_PATHS", ""),
+        dyn.get("API_LOG_EXCLUDE_PATHS", ""),
+        dyn.get("API_LOG_SAMPLE_RATES", ""),
+        dyn.get_int("API_LOG_MAX_BODY_BYTES", -1),
+        dyn.get_bool("API_LOG_SKIP_NOT_MODIFIED", True),
+    )
+    if key != _policy_cache["key"]:
+        try:
+            _policy_cache["policy"] = build_api_log_policy(*key)
+        except re.error as e:
+            logging.getLogger(__name__).error("Invalid API log route pattern: %s", e)
+            _policy_cache["policy"] = _policy_cache["policy"] or ApiLogPolicy()
+        _policy_cache["key"] = key
+    return _policy_cache["policy"]
+
+
+def _api_log_handler() -> BoundedQueueHandler:
+    return build_queue_handler(
+        str(_api_log_path()),
+        max_size=getattr(settings, "API_LOG_QUEUE_SIZE", 10_000),
+        overflow=getattr(settings, "API_LOG_OVERFLOW", OverflowPolicy.DROP),
+        batch_size=getattr(settings, "API_LOG_BATCH_SIZE", 256),
+        flush_interval=getattr(settings, "API_LOG_FLUSH_INTERVAL", 1.0),
+        block_timeout=getattr(settings, "API_LOG_BLOCK_TIMEOUT", DEFAULT_BLOCK_TIMEOUT),
+    )
 
 
 def setup_api_logger_signal() -> bool:
-    """Subscribe a listener to API_LOGGER_SIGNAL and configure a file handler.
+    """Subscribe a listener to API_LOGGER_SIGNAL and attach a queued JSON lines writer.
     Returns True if subscription is successful, otherwise False.
     """
     try:
@@ -50,18 +184,9 @@ def setup_api_logger_signal() -> bool:
 
     api_logger = logging.getLogger("api_logger")
 
-    # Ensure file handler to _logs/api.log
-    file_handler = logging.FileHandler(str(_api_log_path()))
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s %(levelname)s %(message)s")
-    )
-    if not any(
-        isinstance(h, logging.FileHandler)
-        and getattr(h, "baseFilename", None) == file_handler.baseFilename
-        for h in api_logger.handlers
-    ):
-        api_logger.addHandler(file_handler)
+    # Queue records for a background writer appending to _logs/api.log
+    if not any(isinstance(h, BoundedQueueHandler) for h in api_logger.handlers):
+        api_logger.addHandler(_api_log_handler())
         api_logger.setLevel(logging.INFO)
         api_logger.propagate = False
 
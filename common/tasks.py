@@ -0,0 +1,36 @@
+from django.apps import apps
+from common.services.api_logs import ApiLogArchiver
+from common.services.media import MediaCleanup
+
+
+def optimize_image_field(
+    model_label: str, pk: str, field_name: str, source_name: str
+) -> bool:
+    """django-q2 task: optimize an image stored by an async OptimizedImageField."""
+    model = apps.get_model(model_label)
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is None:
+        return False
+    field = model._meta.get_field(field_name)
+    # Skip if the image was replaced or cleared after the task was queued
+    if getattr(instance, field.attname).name != source_name:
+        return False
+    return field.optimize_stored_file(instance)
+
+
+def delete_media_files(
+    names: list, model_label: str = None, field_name: str = None, blob: str = None
+) -> int:
+    """django-q2 task: remove files discarded by a committed transaction."""
+    storage = MediaCleanup.storage_for(model_label, field_name)
+    return MediaCleanup.delete(storage, names, blob=blob)
+
+
+def sweep_orphaned_media() -> int:
+    """django-q2 schedule: delete unreferenced files under managed upload paths."""
+    return len(MediaCleanup.sweep())
+
+
+def archive_api_logs() -> int:
+    """django-q2 schedule: archive API log rows past the retention window."""
+    return ApiLogArchiver.archive()
@@ -1,10 +1,27 @@
 import pytest
 from rest_framework.test import APIClient
+from common import config as dyn
 
 
 # --- Fixures ---
 
 
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    """Keep request metrics files out of the project directory."""
+    settings.METRICS_DIR = tmp_path / "metrics"
+    settings.METRICS_TOKEN = None
+    return settings.METRICS_DIR
+
+
+@pytest.fixture(autouse=True)
+def constance_snapshot():
+    """Reload dynamic settings from each test's own database state."""
+    dyn._snapshot.update(values=None, version=None, expires=0.0)
+    yield
+    dyn._snapshot.update(values=None, version=None, expires=0.0)
+
+
 @pytest.fixture
 def api_client():
     """
@@ -0,0 +1,88 @@
+import gzip
+import json
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from drf_api_logger.models import APILogsModel
+from common.models import ApiLogDailySummary
+from common.services.api_logs import ARCHIVED_FIELDS, ApiLogArchiver
+
+
+def _log(days_ago: int, status_code: int = 200, execution_time: str = "0.01000"):
+    return APILogsModel.objects.create(
+        added_on=timezone.now() - timedelta(days=days_ago),
+        api="http://testserver/api/common/health/",
+        headers="{}",
+        body="",
+        method="GET",
+        client_ip_address="127.0.0.1",
+        response='{"message": "System is healthy"}',
+        status_code=status_code,
+        execution_time=execution_time,
+    )
+
+
+def _archived_ids(day) -> list:
+    ids = []
+    for path in ApiLogArchiver.archive_paths(day):
+        with gzip.open(path, "rt") as archive:
+            ids.extend(json.loads(line)["id"] for line in archive)
+    return ids
+
+
+@pytest.mark.django_db
+class TestApiLogArchiver:
+    def test_archives_expired_rows_and_keeps_summaries(self, settings, tmp_path):
+        settings.API_LOG_ARCHIVE_DIR = tmp_path
+        old = [_log(40), _log(40, 500, "0.20000"), _log(40)]
+        recent = _log(1)
+
+        assert ApiLogArchiver.archive(retention_days=30, dry_run=True) == 3
+        assert ApiLogArchiver.archive(retention_days=30, batch_size=2) == 3
+
+        assert list(APILogsModel.objects.values_list("pk", flat=True)) == [recent.pk]
+        day = ApiLogArchiver._day(old[0].added_on)
+        assert _archived_ids(day) == sorted(log.pk for log in old)
+
+        ok = ApiLogDailySummary.objects.get(day=day, status_code=200)
+        assert ok.request_count == 2
+        error = ApiLogDailySummary.objects.get(day=day, status_code=500)
+        assert error.max_execution_time == pytest.approx(0.2)
+
+    def test_keeps_rows_without_an_archive_dir(self, settings):
+        settings.API_LOG_ARCHIVE_DIR = None
+        _log(40)
+
+        assert ApiLogArchiver.archive(retention_days=30) == 0
+        assert APILogsModel.objects.count() == 1
+
+    def test_failed_batch_leaves_nothing_behind(self, settings, tmp_path, monkeypatch):
+        settings.API_LOG_ARCHIVE_DIR = tmp_path
+        _log(40)
+
+        def crash(rows):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(ApiLogArchiver, "_summarize", crash)
+        with pytest.raises(RuntimeError):
+            ApiLogArchiver.archive(retention_days=30)
+
+        assert APILogsModel.objects.count() == 1
+        assert not list(tmp_path.rglob("*.gz*"))
+
+    def test_crashed_runs_are_settled_without_duplicates(self, settings, tmp_path):
+        settings.API_LOG_ARCHIVE_DIR = tmp_path
+        first, second = _log(40), _log(40)
+        ids = [first.pk, second.pk]
+        day = ApiLogArchiver._day(first.added_on)
+        rows = list(APILogsModel.objects.order_by("id").values(*ARCHIVED_FIELDS))
+        # One run crashed before its delete committed, another right after
+        ApiLogArchiver._write(rows)
+        ApiLogArchiver._write(rows[1:])
+        second.delete()
+
+        assert ApiLogArchiver.archive(retention_days=30) == 1
+
+        assert not APILogsModel.objects.exists()
+        assert _archived_ids(day) == ids
+        assert not list(tmp_path.rglob("*.part"))
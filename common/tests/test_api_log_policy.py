@@ -0,0 +1,82 @@
+import pytest
+from constance import config
+from drf_api_logger import API_LOGGER_SIGNAL
+from django.urls import reverse
+from common import signals
+from common.signals import build_api_log_policy
+
+
+@pytest.fixture
+def fresh_policy():
+    signals._policy_cache.update(key=None, policy=None)
+    yield
+    signals._policy_cache.update(key=None, policy=None)
+
+
+@pytest.fixture
+def logged():
+    calls = []
+
+    def listener(**payload):
+        calls.append(payload)
+
+    API_LOGGER_SIGNAL.listen += listener
+    yield calls
+    API_LOGGER_SIGNAL.listen -= listener
+
+
+class TestApiLogPolicy:
+    def test_routes_and_sampling(self):
+        policy = build_api_log_policy(
+            include=r"^/api/",
+            exclude="^/api/common/health/\n^/api/schema/",
+            sample_rates="5xx=1, 2xx=0, 404=0.5",
+        )
+        assert policy.route_allowed("/api/workspace/")
+        assert not policy.route_allowed("/api/common/health/")
+        assert not policy.route_allowed("/admin/")
+
+        assert policy.should_log(500)
+        assert not policy.should_log(200)
+        assert not policy.should_log(304)
+        assert policy.should_log(401)
+        assert policy.sample_rate(404) == 0.5
+
+    def test_body_cap(self):
+        policy = build_api_log_policy(max_body_bytes=8)
+        assert policy.cap_body(b"short") is None
+        assert policy.cap_body(b"0123456789abc").startswith("01234567...")
+
+
+@pytest.mark.django_db
+class TestApiLogMiddleware:
+    def test_health_probes_are_not_logged(self, api_client, fresh_policy, logged):
+        api_client.get(reverse("health_check"))
+        assert logged == []
+
+    def test_policy_changes_apply_at_runtime(
+        self, api_client, fresh_policy, logged
+    ):
+        config.API_LOG_EXCLUDE_PATHS = "^/nothing/"
+        api_client.get(reverse("health_check"))
+        assert [call["status_code"] for call in logged] == [200]
+
+        config.API_LOG_SAMPLE_RATES = "2xx=0"
+        api_client.get(reverse("health_check"))
+        assert len(logged) == 1
+
+    def test_path_type_and_bodies_follow_upstream(
+        self, api_client, settings, fresh_policy, logged
+    ):
+        config.API_LOG_EXCLUDE_PATHS = "^/nothing/"
+        settings.DRF_API_LOGGER_PATH_TYPE = "RAW_URI"
+        url = reverse("health_check")
+
+        # Upstream logs any body that decodes as JSON, whatever its type
+        api_client.generic(
+            "GET", f"{url}?probe=1", '{"probe": true}', content_type="text/plain"
+        )
+
+        [call] = logged
+        assert call["api"] == f"http://testserver{url}?probe=1"
+        assert call["body"] == {"probe": True}
@@ -0,0 +1,46 @@
+import pytest
+from constance import config
+from django.core.cache import cache
+from common import config as dyn
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_snapshot_loads_all_keys_in_one_query(django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert dyn.get("FRONTEND_URL") == "http://localhost/"
+        assert dyn.get_int("API_LOG_RETENTION_DAYS") == 30
+        assert dyn.get_bool("STRIPE_LIVE_MODE") is False
+        assert dyn.get("NOT_A_CONSTANCE_KEY", "fallback") == "fallback"
+    with django_assert_num_queries(0):
+        dyn.get("FRONTEND_URL")
+
+
+@pytest.mark.django_db
+def test_update_invalidates_snapshot():
+    assert dyn.get_int("API_LOG_RETENTION_DAYS") == 30
+    config.API_LOG_RETENTION_DAYS = 7
+    assert dyn.get_int("API_LOG_RETENTION_DAYS") == 7
+
+
+@pytest.mark.django_db
+def test_version_bump_from_another_process_reloads(settings):
+    settings.CONSTANCE_SNAPSHOT_TTL = 0
+    config.API_LOG_RETENTION_DAYS = 7
+    assert dyn.get_int("API_LOG_RETENTION_DAYS") == 7
+
+    # Another worker saved a new value: only the shared stamp tells us
+    from constance.models import Constance
+    from constance.codecs import dumps
+
+    Constance.objects.filter(key="API_LOG_RETENTION_DAYS").update(value=dumps(14))
+    assert dyn.get_int("API_LOG_RETENTION_DAYS") == 7
+    cache.set(dyn.VERSION_KEY, "bumped-elsewhere", None)
+    assert dyn.get_int("API_LOG_RETENTION_DAYS") == 14
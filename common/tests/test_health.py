@@ -1,6 +1,9 @@
+import time
 import pytest
 from django.urls import reverse
 from rest_framework import status
+from common import config as dyn
+from common.services.health import readiness
 
 
 @pytest.mark.django_db
@@ -14,3 +17,56 @@ class TestHealthCheckView:
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data["message"] == "System is healthy"
+
+
+@pytest.fixture
+def probe(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.HEALTH_CHECK_TIMEOUT = 0.5
+    readiness.reset()
+    yield readiness
+    readiness.reset()
+
+
+@pytest.mark.django_db
+def test_liveness_touches_no_dependency(api_client, django_assert_num_queries):
+    dyn.snapshot()  # dynamic settings are loaded once per worker
+    with django_assert_num_queries(0):
+        response = api_client.get(reverse("health_live"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.django_db
+def test_readiness_reports_each_dependency(api_client, probe, tmp_path):
+    response = api_client.get(reverse("health_ready"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["status"] == "ok"
+    assert set(response.data["checks"]) == {"database", "cache", "media"}
+    assert all(check["ok"] for check in response.data["checks"].values())
+    assert not list(tmp_path.iterdir())
+
+
+def test_readiness_fails_on_timeout_and_caches_result(monkeypatch, probe):
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(1)
+
+    def broken():
+        raise ConnectionError("refused")
+
+    monkeypatch.setattr(
+        probe, "checks", {"slow": slow, "broken": broken, "fine": lambda: None}
+    )
+    healthy, results = probe.status()
+
+    assert not healthy
+    assert results["slow"].error == "timed out"
+    assert results["broken"].error == "ConnectionError: refused"
+    assert results["fine"].ok
+    # Probes within the TTL reuse the result instead of re-running the checks
+    assert probe.status() == (healthy, results)
+    assert len(calls) == 1
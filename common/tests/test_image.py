@@ -0,0 +1,46 @@
+import io
+import pytest
+from PIL import Image
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from common.fields import validate_image_pixels
+from common.services.image import ImageOptimizer, ImageTooLargeError
+
+
+def _upload(format="JPEG", size=(2000, 1600), name="photo.jpg"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "#c33").save(buffer, format=format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class TestImageOptimizer:
+    """Test cases for memory-bounded image decoding."""
+
+    def test_jpeg_is_dct_scaled_before_decode(self):
+        img = ImageOptimizer.open_bounded(_upload(), target=(200, 200))
+        # 2000x1600 draft-decoded at 1/8 still covers a 200x200 box
+        assert img.size == (250, 200)
+
+    def test_optimize_image_spools_output(self):
+        optimized = ImageOptimizer.optimize_image(
+            _upload(), format="webp", max_dimensions=(200, 200)
+        )
+        assert optimized.name == "photo.webp"
+        with Image.open(optimized) as img:
+            assert img.format == "WEBP"
+            assert max(img.size) <= 200
+
+    def test_pixel_limit_rejects_before_decode(self, settings):
+        settings.IMAGE_MAX_PIXELS = 1000
+        with pytest.raises(ImageTooLargeError):
+            ImageOptimizer.optimize_image(_upload(format="PNG", name="bomb.png"))
+
+    def test_pixel_validator(self, settings):
+        settings.IMAGE_MAX_PIXELS = 1000
+        upload = _upload(format="PNG", size=(64, 48), name="bomb.png")
+        with pytest.raises(ValidationError):
+            validate_image_pixels(upload)
+        assert upload.tell() == 0
+
+        settings.IMAGE_MAX_PIXELS = 10_000
+        validate_image_pixels(upload)
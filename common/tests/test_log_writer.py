@@ -0,0 +1,76 @@
+import json
+import logging
+import threading
+import time
+from common.services.log_writer import OverflowPolicy, build_queue_handler
+
+
+def _logger(handler) -> logging.Logger:
+    logger = logging.getLogger(f"test_api_logger.{id(handler)}")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+class TestQueuedLogWriter:
+    def test_writes_json_lines_in_batches(self, tmp_path):
+        path = tmp_path / "api.log"
+        handler = build_queue_handler(str(path), batch_size=50, flush_interval=5)
+        logger = _logger(handler)
+
+        for i in range(120):
+            logger.info({"api": f"/api/items/{i}/", "status_code": 200})
+        handler.close()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 120
+        entry = json.loads(lines[7])
+        assert entry["api"] == "/api/items/7/"
+        assert entry["status_code"] == 200
+        assert entry["level"] == "INFO"
+
+    def test_drop_policy_bounds_the_queue(self, tmp_path):
+        path = tmp_path / "api.log"
+        handler = build_queue_handler(
+            str(path), max_size=10, overflow=OverflowPolicy.DROP, batch_size=1
+        )
+        logger = _logger(handler)
+        # Hold the writer so the queue fills up
+        with handler.target.lock:
+            for i in range(200):
+                logger.info({"n": i})
+        handler.close()
+
+        written = len(path.read_text().splitlines())
+        assert handler.dropped > 0
+        assert written + handler.dropped == 200
+
+    def test_block_policy_waits_for_room(self, tmp_path):
+        path = tmp_path / "api.log"
+        handler = build_queue_handler(
+            str(path),
+            max_size=10,
+            overflow=OverflowPolicy.BLOCK,
+            batch_size=1,
+            block_timeout=5,
+        )
+        logger = _logger(handler)
+        held = threading.Event()
+
+        def hold_writer():
+            # Longer than a short wait would cover
+            with handler.target.lock:
+                held.set()
+                time.sleep(0.3)
+
+        holder = threading.Thread(target=hold_writer)
+        holder.start()
+        held.wait()
+        for i in range(50):
+            logger.info({"n": i})
+        holder.join()
+        handler.close()
+
+        assert handler.dropped == 0
+        assert len(path.read_text().splitlines()) == 50
@@ -0,0 +1,38 @@
+import json
+from common.services.masking import MASK, TRUNCATED, SensitiveDataMasker
+
+
+masker = SensitiveDataMasker({"password", "api_key", "authorization"}, max_depth=4)
+
+
+class TestSensitiveDataMasker:
+    def test_masks_nested_dicts_lists_and_json_bodies(self):
+        payload = {
+            "headers": {"AUTHORIZATION": "Bearer abc"},
+            "body": {"organization": {"name": "Acme", "api_key": "k"}},
+            "items": [{"password": "p"}, {"ok": 1}],
+            "response": json.dumps({"user": {"password": "p", "id": 1}}),
+        }
+        masked = masker.mask(payload)
+
+        assert masked["headers"]["AUTHORIZATION"] == MASK
+        assert masked["body"]["organization"] == {"name": "Acme", "api_key": MASK}
+        assert masked["items"][0]["password"] == MASK
+        assert json.loads(masked["response"]) == {"user": {"password": MASK, "id": 1}}
+        # The input is never mutated
+        assert payload["body"]["organization"]["api_key"] == "k"
+
+    def test_clean_subtrees_are_shared_not_copied(self):
+        clean = {"name": "Acme", "tags": ["a", "b"]}
+        payload = {"clean": clean, "auth": {"password": "p"}}
+        masked = masker.mask(payload)
+        assert masked["clean"] is clean
+
+        body = json.dumps(clean)
+        assert masker.mask(body) is body
+        assert masker.mask(clean) is clean
+
+    def test_depth_budget_truncates_instead_of_leaking(self):
+        deep = {"a": {"b": {"c": {"d": {"e": {"password": "p"}}}}}}
+        masked = masker.mask(deep)
+        assert masked["a"]["b"]["c"]["d"]["e"] == TRUNCATED
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from django.urls import reverse
+from common.services.metrics import REQUEST_LATENCY, MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_histogram_buckets_are_cumulative(self, metrics_dir):
+        registry = MetricsRegistry()
+        labels = {"view": "v", "method": "GET", "status": "200"}
+        for value in (0.001, 0.02, 0.02, 30):
+            registry.observe(REQUEST_LATENCY, labels, value)
+
+        text = registry.render()
+        prefix = (
+            'http_request_duration_seconds_bucket{method="GET",status="200",view="v"'
+        )
+        assert f'{prefix},le="0.005"}} 1' in text
+        assert f'{prefix},le="0.025"}} 3' in text
+        assert f'{prefix},le="+Inf"}} 4' in text
+
+    def test_workers_are_summed_from_their_files(self, metrics_dir):
+        labels = {"view": "v", "method": "GET", "status": "200"}
+        first, second = MetricsRegistry(), MetricsRegistry()
+        first.observe(REQUEST_LATENCY, labels, 0.1)
+        first.flush(force=True)
+        second.observe(REQUEST_LATENCY, labels, 0.2)
+        # Stands in for another live worker process writing its own file
+        second._path = lambda: metrics_dir / f"metrics-{os.getppid()}-other.json"
+        second.flush(force=True)
+
+        assert len(list(metrics_dir.glob("metrics-*.json"))) == 2
+        assert (
+            'http_request_duration_seconds_count{method="GET",status="200",view="v"} 2'
+            in first.render()
+        )
+
+    def test_files_of_gone_workers_are_dropped(self, metrics_dir):
+        labels = {"view": "v", "method": "GET", "status": "200"}
+        registry = MetricsRegistry()
+        registry.observe(REQUEST_LATENCY, labels, 0.1)
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        stale = [
+            metrics_dir / f"metrics-{dead.pid}-gone.json",
+            # Same pid as this process: a predecessor the pid was recycled from
+            metrics_dir / f"metrics-{os.getpid()}-predecessor.json",
+        ]
+        for path in stale:
+            path.write_text('{"x": [1]}')
+
+        text = registry.render()
+
+        assert not any(path.exists() for path in stale)
+        assert [path.name for path in metrics_dir.glob("metrics-*.json")] == [
+            registry._path().name
+        ]
+        assert (
+            'http_request_duration_seconds_count{method="GET",status="200",view="v"} 1'
+            in text
+        )
+
+    def test_flusher_writes_off_the_request_path(self, metrics_dir, settings):
+        settings.METRICS_FLUSH_INTERVAL = 0.01
+        registry = MetricsRegistry()
+        registry.start_flusher()
+        registry.observe(
+            REQUEST_LATENCY, {"view": "v", "method": "GET", "status": "200"}, 0.1
+        )
+        for _ in range(200):
+            if registry._path().exists():
+                break
+            time.sleep(0.01)
+        assert registry._path().exists()
+        registry._flusher_pid = None  # stop the thread
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_requests(api_client, metrics_dir, settings):
+    api_client.get(reverse("health_check"))
+    response = api_client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    body = response.content.decode()
+    assert 'view="common.api.HealthCheckView"' in body
+    assert "http_request_db_queries_bucket" in body
+
+    settings.METRICS_TOKEN = "s3cret"
+    assert api_client.get(reverse("metrics")).status_code == 403
+    authorized = api_client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer s3cret")
+    assert authorized.status_code == 200
@@ -148,6 +148,7 @@ UNFOLD_CONFIG = {
         {
             "models": [
                 "drf_api_logger.apilogsmodel",
+                "common.apilogdailysummary",
                 "sites.site",
                 "constance.config",
             ],
@@ -159,6 +160,13 @@ UNFOLD_CONFIG = {
                     ),
                     "permission": lambda r: r.user.is_staff,
                 },
+                {
+                    "title": "API Log Summary",
+                    "link": reverse_lazy(
+                        "admin:common_apilogdailysummary_changelist"
+                    ),
+                    "permission": lambda r: r.user.is_staff,
+                },
                 {
                     "title": "Sites",
                     "link": reverse_lazy("admin:sites_site_changelist"),
@@ -1,6 +1,9 @@
 from django.urls import path
-from common.api import HealthCheckView
+from common.api import HealthCheckView, MetricsView, ReadinessView, liveness
 
 urlpatterns = [
     path("health/", HealthCheckView.as_view(), name="health_check"),
+    path("health/live/", liveness, name="health_live"),
+    path("health/ready/", ReadinessView.as_view(), name="health_ready"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
@@ -98,6 +98,7 @@ THIRD_PARTY_APPS = [
     "simple_history",
     "import_export",
     "djstripe",
+    "django_q",
     # Constance settings in admin using the database backend
     "constance",
     "constance.backends.database",
@@ -114,6 +115,8 @@ INSTALLED_APPS = UNFOLD_APPS + DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # --- MIDDLEWARE ---
 MIDDLEWARE = [
+    "common.middleware.MetricsMiddleware",
+    "common.middleware.QueryProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -124,7 +127,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware",
+    "common.middleware.APILogPolicyMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
 ]
 
@@ -178,6 +181,20 @@ DATABASES = {
     "default": dj_database_url.parse(DATABASE_URL, conn_max_age=600),
 }
 
+# --- CACHE CONFIGURATION ---
+# File-based by default so version stamps are shared by all gunicorn workers.
+# The django-q2 worker invalidates entries too, so every process must see the
+# same cache: one directory on a shared volume (see docker-compose.yml), or a
+# network backend such as Redis when containers run on several hosts
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "_cache")),
+    }
+}
+
 # --- AUTH USER MODEL ---
 AUTH_USER_MODEL = "workspace.User"
 
@@ -322,6 +339,8 @@ CONSTANCE_BACKEND = "constance.backends.database.DatabaseBackend"
 CONSTANCE_ADDITIONAL_FIELDS = {
     **UNFOLD_CONSTANCE_ADDITIONAL_FIELDS,
 }
+# Seconds between version checks of the in-process snapshot (common.config)
+CONSTANCE_SNAPSHOT_TTL = float(os.getenv("CONSTANCE_SNAPSHOT_TTL", 5.0))
 
 # Primary settings to expose in Admin. Keep sensitive values plain for now.
 # TODO: Plug encrypt/decrypt for sensitive settings before production.
@@ -345,6 +364,28 @@ CONSTANCE_CONFIG = {
     "STRIPE_PRICE_PRO": ("", "Fallback Price ID for PRO (no interval)."),
     "STRIPE_PRICE_BUSINESS": ("", "Fallback Price ID for BUSINESS (no interval)."),
     "STRIPE_PRICE_FREE": ("", "Optional Price ID for FREE plan, if applicable."),
+    # API logging
+    "API_LOG_INCLUDE_PATHS": (
+        r"^/api/",
+        "Regexes (comma or newline separated); only matching paths are logged.",
+    ),
+    "API_LOG_EXCLUDE_PATHS": (
+        r"^/api/common/(health|metrics)/",
+        "Regexes (comma or newline separated) of paths never logged.",
+    ),
+    "API_LOG_SAMPLE_RATES": (
+        "",
+        "Share of requests logged per status, e.g. 5xx=1,4xx=1,2xx=0.01,304=0.",
+    ),
+    "API_LOG_MAX_BODY_BYTES": (
+        65536,
+        "Request/response bodies above this size are not logged in full.",
+    ),
+    "API_LOG_SKIP_NOT_MODIFIED": (True, "Do not log 304 Not Modified responses."),
+    "API_LOG_RETENTION_DAYS": (
+        30,
+        "API log rows older than this are archived to API_LOG_ARCHIVE_DIR and deleted.",
+    ),
 }
 
 # Optional grouping in Admin for better UX
@@ -363,6 +404,14 @@ CONSTANCE_CONFIG_FIELDSETS = {
         "STRIPE_PRICE_FREE",
     ),
     "Frontend": ("FRONTEND_URL",),
+    "API Logging": (
+        "API_LOG_INCLUDE_PATHS",
+        "API_LOG_EXCLUDE_PATHS",
+        "API_LOG_SAMPLE_RATES",
+        "API_LOG_MAX_BODY_BYTES",
+        "API_LOG_SKIP_NOT_MODIFIED",
+        "API_LOG_RETENTION_DAYS",
+    ),
 }
 
 REST_FRAMEWORK = {
@@ -449,6 +498,51 @@ DRF_API_LOGGER_EXCLUDE_KEYS = [
     "api_key",
     "client_secret",
 ]
+# Signal listener writing JSON lines to _logs/api.log from a background thread
+API_LOG_QUEUE_SIZE = int(os.getenv("API_LOG_QUEUE_SIZE", 10_000))
+# When the queue is full: "drop" the record, or "block" the request until the
+# writer makes room, for at most API_LOG_BLOCK_TIMEOUT seconds, then drop it
+API_LOG_OVERFLOW = os.getenv("API_LOG_OVERFLOW", "drop")
+API_LOG_BLOCK_TIMEOUT = float(os.getenv("API_LOG_BLOCK_TIMEOUT", 5.0))
+API_LOG_BATCH_SIZE = int(os.getenv("API_LOG_BATCH_SIZE", 256))
+API_LOG_FLUSH_INTERVAL = float(os.getenv("API_LOG_FLUSH_INTERVAL", 1.0))
+# Daily gzip archives of API log rows past API_LOG_RETENTION_DAYS. Rows are
+# only deleted once archived here, so unset keeps them all; point it at
+# durable storage (the api_log_archive volume in docker-compose.yml)
+API_LOG_ARCHIVE_DIR = (
+    Path(os.environ["API_LOG_ARCHIVE_DIR"])
+    if os.getenv("API_LOG_ARCHIVE_DIR")
+    else None
+)
+
+# --- METRICS ---
+# Per-worker histogram files summed by /api/common/metrics/; empty on deploy.
+# The totals cover one container: scrape each replica separately, and keep
+# the directory private to its container (a tmpfs in docker-compose.yml)
+METRICS_DIR = Path(os.getenv("METRICS_DIR", BASE_DIR / "_metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5.0))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# --- HEALTH CHECKS ---
+# Readiness results are shared by all probes of a worker for the TTL
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 2.0))
+HEALTH_CHECK_CACHE_TTL = float(os.getenv("HEALTH_CHECK_CACHE_TTL", 5.0))
+
+# --- QUERY PROFILER ---
+# Logs repeated query shapes (N+1) per request with the lines issuing them
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "False") == "True"
+QUERY_PROFILER_REPEAT_THRESHOLD = int(os.getenv("QUERY_PROFILER_REPEAT_THRESHOLD", 3))
+
+# --- DJANGO Q2 ---
+# Background task cluster (run with `python manage.py qcluster`)
+Q_CLUSTER = {
+    "name": "oppora",
+    "orm": "default",
+    "workers": int(os.getenv("Q_CLUSTER_WORKERS", 2)),
+    "timeout": 300,
+    "retry": 600,
+    "sync": os.getenv("Q_CLUSTER_SYNC", "False") == "True",
+}
 
 # --- STRIPE ---
 STRIPE_LIVE_MODE = os.getenv("STRIPE_LIVE_MODE", "False") == "True"
@@ -459,5 +553,21 @@ STRIPE_SECRET_KEY = (
 )
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 DJSTRIPE_FOREIGN_KEY_TO_FIELD = "id"
+# Pooled API clients (workspace.services.stripe_client); STRIPE_API_BASE
+# redirects them, e.g. to a local fake server
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE") or None
+STRIPE_CONNECT_TIMEOUT = float(os.getenv("STRIPE_CONNECT_TIMEOUT", 5.0))
+STRIPE_READ_TIMEOUT = float(os.getenv("STRIPE_READ_TIMEOUT", 30.0))
+STRIPE_MAX_NETWORK_RETRIES = int(os.getenv("STRIPE_MAX_NETWORK_RETRIES", 2))
+STRIPE_HTTP_POOL_SIZE = int(os.getenv("STRIPE_HTTP_POOL_SIZE", 10))
+# Verified webhooks are mirrored by dj-stripe in the request; the plan change
+# is queued for a django-q2 worker (workspace.signals). Triggers dj-stripe
+# failed to process are retried by the "redrive-stripe-webhooks" schedule
+STRIPE_WEBHOOK_REDRIVE_AFTER = timedelta(
+    minutes=int(os.getenv("STRIPE_WEBHOOK_REDRIVE_AFTER_MINUTES", 10))
+)
+STRIPE_WEBHOOK_REDRIVE_MAX_AGE = timedelta(
+    hours=int(os.getenv("STRIPE_WEBHOOK_REDRIVE_MAX_AGE_HOURS", 72))
+)
 if DEBUG and not STRIPE_SECRET_KEY:
     log.warning("Stripe secret key is not set. Checkout endpoints will fail.")
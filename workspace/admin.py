@@ -30,6 +30,17 @@ class WorkspaceAdmin(ImportExportModelAdmin, SimpleHistoryAdmin, BaseModelAdmin)
 class WorkspaceRoleAdmin(SimpleHistoryAdmin, BaseModelAdmin):
     list_display = ("workspace", "name", "is_system")
 
+    # Shared system role templates are immutable; workspaces customize copies
+    def has_change_permission(self, request, obj=None):
+        if obj is not None and obj.workspace_id is None:
+            return False
+        return super().has_change_permission(request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        if obj is not None and obj.workspace_id is None:
+            return False
+        return super().has_delete_permission(request, obj)
+
 
 @admin.register(WorkspaceMembership)
 class WorkspaceMembershipAdmin(SimpleHistoryAdmin, BaseModelAdmin):
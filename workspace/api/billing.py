@@ -42,7 +42,13 @@ class CreateCheckoutSessionView(WorkspaceHeaderResolverMixin, APIView):
             raise serializers.ValidationError(
                 "Workspace not resolved. Provide X-Workspace-ID header."
             )
-        if not has_workspace_permission(request.user, ws, "subscription", "change"):
+        if not has_workspace_permission(
+            request.user,
+            ws,
+            "subscription",
+            "change",
+            membership=self.get_membership(request),
+        ):
             return Response({"detail": "Insufficient permissions."}, status=403)
 
         req = CheckoutRequestSerializer(data=request.data)
@@ -85,7 +91,13 @@ class ConfirmCheckoutSessionView(WorkspaceHeaderResolverMixin, APIView):
             raise serializers.ValidationError(
                 "Workspace not resolved. Provide X-Workspace-ID header."
             )
-        if not has_workspace_permission(request.user, ws, "subscription", "change"):
+        if not has_workspace_permission(
+            request.user,
+            ws,
+            "subscription",
+            "change",
+            membership=self.get_membership(request),
+        ):
             return Response({"detail": "Insufficient permissions."}, status=403)
 
         data_in = {
@@ -9,6 +9,7 @@ from workspace.services.access_control import (
     WorkspaceHeaderResolverMixin,
     WorkspaceRBACPermission,
 )
+from workspace.services.role_templates import workspace_role
 from workspace.serializers.invites import (
     InviteCreateSerializer,
     InviteSerializer,
@@ -72,7 +73,7 @@ class InviteAcceptView(generics.GenericAPIView):
             return Response({"detail": "Invalid token"}, status=400)
         ws = invite.workspace
         # Default role: Member (if not provided)
-        role = invite.role or ws.roles.filter(name="Member").first()
+        role = invite.role or workspace_role(ws, "Member")
         WorkspaceMembership.objects.get_or_create(
             workspace=ws, user=request.user, defaults={"role": role}
         )
@@ -96,7 +97,7 @@ class InviteAcceptView(generics.GenericAPIView):
         except WorkspaceInvite.DoesNotExist:
             return Response({"detail": "Invalid token"}, status=400)
         ws = invite.workspace
-        role = invite.role or ws.roles.filter(name="Member").first()
+        role = invite.role or workspace_role(ws, "Member")
         WorkspaceMembership.objects.get_or_create(
             workspace=ws, user=request.user, defaults={"role": role}
         )
@@ -1,8 +1,10 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.response import Response
+from django.utils.http import parse_etags
 from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.permissions import IsAuthenticated
+from workspace.services.profile_cache import get_profile_snapshot
 from workspace.serializers.profile import (
     UserProfileSerializer,
     UserProfileUpdateSerializer,
@@ -22,15 +24,29 @@ class UserProfileView(generics.RetrieveAPIView):
     @extend_schema(
         operation_id="get_user_profile",
         summary="Get user profile",
-        description="Retrieve the current user's profile information including permissions",
+        description=(
+            "Retrieve the current user's profile information including permissions. "
+            "Responses carry a strong ETag; send it back in If-None-Match to get "
+            "a 304 when nothing changed."
+        ),
         responses={
             200: OpenApiResponse(
                 response=UserProfileSerializer, description="User profile data"
             ),
+            304: OpenApiResponse(description="Profile unchanged since the given ETag"),
         },
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        snapshot = get_profile_snapshot(
+            request.user, lambda: self.get_serializer(self.get_object()).data
+        )
+        headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            etags = [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+            if "*" in etags or snapshot.etag in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(snapshot.data, headers=headers)
 
 
 class UserProfileUpdateView(generics.UpdateAPIView):
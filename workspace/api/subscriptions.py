@@ -70,7 +70,13 @@ class SubscriptionView(WorkspaceHeaderResolverMixin, generics.RetrieveUpdateAPIV
         sub = self.get_object()
         ws = sub.workspace
         # Require subscription.change
-        if not has_workspace_permission(request.user, ws, "subscription", "change"):
+        if not has_workspace_permission(
+            request.user,
+            ws,
+            "subscription",
+            "change",
+            membership=self.get_membership(request),
+        ):
             return Response({"detail": "Insufficient permissions."}, status=403)
         # Only allow setting pending_plan, renew_interval, auto_renew
         serializer = SubscriptionUpdateSerializer(sub, data=request.data, partial=True)
@@ -1,11 +1,7 @@
 from django.db import transaction
 from rest_framework import generics
 from rest_framework.response import Response
-from workspace.config.plans import limits_for
 from rest_framework.permissions import IsAuthenticated
-from workspace.services.onboarding import choose_plan
-from workspace.services.roles import seed_workspace_roles
-from workspace.models import WorkspaceMembership, Subscription
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from workspace.services.access_control import WorkspaceHeaderResolverMixin
 from workspace.models import Workspace
@@ -26,9 +22,13 @@ class WorkspaceListCreateView(WorkspaceHeaderResolverMixin, generics.ListCreateA
         responses={200: WorkspaceSerializer(many=True)},
     )
     def get(self, request, *args, **kwargs):
-        qs = Workspace.objects.filter(
-            memberships__user=request.user, memberships__is_active=True
-        ).distinct()
+        qs = (
+            Workspace.objects.filter(
+                memberships__user=request.user, memberships__is_active=True
+            )
+            .select_related("organization")
+            .distinct()
+        )
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -44,31 +44,9 @@ class WorkspaceListCreateView(WorkspaceHeaderResolverMixin, generics.ListCreateA
         )
         data_s.is_valid(raise_exception=True)
         with transaction.atomic():
+            # Roles, owner membership and subscription (pending a paid plan)
+            # are created along with the workspace
             ws = data_s.save()
-            # Seed roles if needed
-            if ws.roles.count() == 0:
-                seed_workspace_roles(ws)
-            # Ensure creator is Owner member
-            if not WorkspaceMembership.objects.filter(
-                workspace=ws, user=request.user, is_active=True
-            ).exists():
-                owner_role = ws.roles.filter(name="Owner").first()
-                WorkspaceMembership.objects.create(
-                    workspace=ws, user=request.user, role=owner_role
-                )
-            # Ensure subscription exists
-            try:
-                _ = ws.subscription
-            except Subscription.DoesNotExist:
-                Subscription.objects.create(
-                    workspace=ws,
-                    plan="free",
-                    status="trial",
-                    limits=limits_for("free"),
-                )
-            desired = data_s.validated_data.get("plan")
-            if desired and desired != "free":
-                choose_plan(ws, desired)
         return Response(WorkspaceSerializer(ws).data, status=201)
 
     @extend_schema(
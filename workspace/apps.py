@@ -6,4 +6,10 @@ class WorkspaceConfig(AppConfig):
     name = "workspace"
 
     def ready(self):
-        return
+        from . import signals  # noqa: F401
+        from .config.registry import reload_permissions_registry
+        from .services.role_templates import template_grants
+
+        # Fail at startup, not on the first permission check, on a bad module
+        reload_permissions_registry()
+        template_grants()
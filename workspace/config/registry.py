@@ -1,29 +1,137 @@
-from typing import Dict
-from django.conf import settings
+import hashlib
+import threading
+from types import MappingProxyType
 from importlib import import_module
+from collections.abc import Mapping
+from typing import Iterable, Iterator, NamedTuple, Optional
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from workspace.models.permission import PermissionScope
 
 
-def get_permissions_registry() -> Dict[str, PermissionScope]:
-    modules = getattr(
-        settings,
-        "WORKSPACE_PERMISSION_MODULES",
-        ["workspace.config.permissions"],
-    )
-    registry: Dict[str, PermissionScope] = {}
+DEFAULT_PERMISSION_MODULES = ["workspace.config.permissions"]
+# Permission bitmasks are stored in signed 64-bit columns
+MAX_PERMISSIONS = 63
+
+
+class PermissionDef(NamedTuple):
+    code: str
+    resource: str
+    action: str
+    scope: PermissionScope
+    # Position in the registry; the permission's flag in a bitmask is 1 << bit
+    bit: int = 0
+
+    @property
+    def mask(self) -> int:
+        return 1 << self.bit
+
+
+class PermissionRegistry(Mapping):
+    """Frozen code -> `PermissionDef` map, also indexed by (resource, action).
+
+    Bits follow registration order. `signature` identifies that assignment,
+    so bitmasks stored under another registry can be told apart.
+    """
+
+    def __init__(self, perms: Iterable[PermissionDef]):
+        perms = tuple(perm._replace(bit=bit) for bit, perm in enumerate(perms))
+        self.signature = hashlib.sha1(
+            "\n".join(perm.code for perm in perms).encode()
+        ).hexdigest()[:16]
+        self._by_code = MappingProxyType({perm.code: perm for perm in perms})
+        self._by_action = MappingProxyType(
+            {(perm.resource, perm.action): perm for perm in perms}
+        )
+
+    def __getitem__(self, code: str) -> PermissionDef:
+        return self._by_code[code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_code)
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def lookup(self, resource: str, action: str) -> Optional[PermissionDef]:
+        return self._by_action.get((resource, action))
+
+
+_lock = threading.Lock()
+_registry: Optional[PermissionRegistry] = None
+
+
+def _normalize(module: str, key, scope) -> PermissionDef:
+    code = key.value if hasattr(key, "value") else key  # Enum or str
+    if not isinstance(code, str):
+        raise ImproperlyConfigured(f"{module}: permission code {key!r} is not a string")
+    resource, sep, action = code.partition(".")
+    if not sep or not resource or not action or "." in action:
+        raise ImproperlyConfigured(
+            f"{module}: permission code {code!r} must look like 'resource.action'"
+        )
+    if not isinstance(scope, PermissionScope):
+        raise ImproperlyConfigured(
+            f"{module}: scope of {code!r} must be a PermissionScope"
+        )
+    return PermissionDef(code, resource, action, scope)
+
+
+def build_permissions_registry(
+    modules: Optional[Iterable[str]] = None,
+) -> PermissionRegistry:
+    """Import every permission module and validate its ``PERMS``.
+
+    Raises ImproperlyConfigured for a module that fails to import, lacks a
+    ``PERMS`` dict, or declares a malformed or conflicting permission.
+    """
+    if modules is None:
+        modules = getattr(
+            settings, "WORKSPACE_PERMISSION_MODULES", DEFAULT_PERMISSION_MODULES
+        )
+    perms: dict[str, PermissionDef] = {}
     for mod in modules:
         try:
             m = import_module(mod)
-            perms = getattr(m, "PERMS", None)
-            if isinstance(perms, dict):
-                normalized: Dict[str, PermissionScope] = {}
-                for k, v in perms.items():
-                    key = k.value if hasattr(k, "value") else k  # Enum or str
-                    if not isinstance(v, PermissionScope):
-                        raise ValueError("Permission scope must be a PermissionScope")
-                    if isinstance(key, str):
-                        normalized[key] = v
-                registry.update(normalized)
-        except Exception:
-            continue
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                f"Cannot import permission module {mod!r}: {exc}"
+            ) from exc
+        declared = getattr(m, "PERMS", None)
+        if not isinstance(declared, dict):
+            raise ImproperlyConfigured(f"{mod}: PERMS must be a dict")
+        for key, scope in declared.items():
+            perm = _normalize(mod, key, scope)
+            known = perms.get(perm.code)
+            if known is not None and known != perm:
+                raise ImproperlyConfigured(
+                    f"{mod}: {perm.code!r} is already registered with scope "
+                    f"{known.scope!r}"
+                )
+            perms[perm.code] = perm
+    if len(perms) > MAX_PERMISSIONS:
+        raise ImproperlyConfigured(
+            f"At most {MAX_PERMISSIONS} permissions fit a permission bitmask"
+        )
+    return PermissionRegistry(perms.values())
+
+
+def reload_permissions_registry(
+    modules: Optional[Iterable[str]] = None,
+) -> PermissionRegistry:
+    """Rebuild the registry; called at app startup and by tests."""
+    global _registry
+    registry = build_permissions_registry(modules)
+    with _lock:
+        _registry = registry
     return registry
+
+
+def get_permissions_registry() -> PermissionRegistry:
+    """The registry built when the ``workspace`` app became ready."""
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = build_permissions_registry()
+    return _registry
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from workspace.services.permission_masks import resync_masks
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode role and membership permission masks stored before the "
+        "permission registry or the role templates changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows read and updated per batch.",
+        )
+
+    def handle(self, *args, batch_size=500, **options):
+        count = resync_masks(batch_size=batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f"Re-encoded {count} permission mask row(s).")
+        )
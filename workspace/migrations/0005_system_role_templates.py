@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:57
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of workspace.services.role_templates at the time of writing
+SYSTEM_ROLE_NAMESPACE = uuid.UUID("6f1c0f4e-2b7a-4d5e-9a43-0c3d2f8e7b11")
+SYSTEM_ROLE_NAMES = ("Owner", "Editor", "Member")
+
+
+def create_system_role_templates(apps, schema_editor):
+    WorkspaceRole = apps.get_model("workspace", "WorkspaceRole")
+    WorkspaceRole.objects.bulk_create(
+        [
+            WorkspaceRole(
+                id=uuid.uuid5(SYSTEM_ROLE_NAMESPACE, name), name=name, is_system=True
+            )
+            for name in SYSTEM_ROLE_NAMES
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0004_organization_logo_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workspacerole',
+            name='workspace',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='roles', to='workspace.workspace'),
+        ),
+        migrations.AddConstraint(
+            model_name='workspacerole',
+            constraint=models.UniqueConstraint(condition=models.Q(('workspace__isnull', True)), fields=('name',), name='uniq_system_role_template_name'),
+        ),
+        migrations.RunPython(create_system_role_templates, migrations.RunPython.noop),
+    ]
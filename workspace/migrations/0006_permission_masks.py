@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+def encode_masks(apps, schema_editor):
+    from workspace.services.permission_masks import resync_masks
+
+    resync_masks(
+        apps.get_model("workspace", "WorkspaceRole"),
+        apps.get_model("workspace", "WorkspaceMembership"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0005_system_role_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workspacemembership',
+            name='all_scope_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workspacemembership',
+            name='masks_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='workspacemembership',
+            name='own_scope_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workspacerole',
+            name='all_scope_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workspacerole',
+            name='masks_version',
+            field=models.CharField(blank=True, default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='workspacerole',
+            name='own_scope_mask',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(encode_masks, migrations.RunPython.noop),
+    ]
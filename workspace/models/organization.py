@@ -4,6 +4,7 @@ from django.conf import settings
 from common.models import TimeStampedModel
 from safedelete.models import SafeDeleteModel
 from common.fields import OptimizedImageField
+from common.models import ImageProcessingStatus
 from safedelete import SOFT_DELETE_CASCADE
 from simple_history.models import HistoricalRecords
 
@@ -17,13 +18,33 @@ class Organization(SafeDeleteModel, TimeStampedModel):
         related_name="organizations",
     )
     name = models.CharField(max_length=200)
-    logo = OptimizedImageField(upload_to="org_logos/", null=True, blank=True)
+    logo = OptimizedImageField(
+        upload_to="org_logos/",
+        null=True,
+        blank=True,
+        optimize_async=True,
+        status_field="logo_status",
+        variants=True,
+        deduplicate=True,
+    )
+    logo_status = models.CharField(
+        max_length=10,
+        choices=ImageProcessingStatus.choices,
+        default=ImageProcessingStatus.READY,
+    )
     brand = models.JSONField(default=dict, blank=True)
     history = HistoricalRecords()
 
     def __str__(self) -> str:
         return self.name
 
+    @property
+    def logo_variants(self) -> dict | None:
+        """Variant -> format -> URL of the resized logos, once processed."""
+        if self.logo_status != ImageProcessingStatus.READY:
+            return None
+        return self._meta.get_field("logo").variant_urls(self.logo)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
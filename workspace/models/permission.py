@@ -7,6 +7,26 @@ class PermissionScope(models.TextChoices):
     ALL = "all", "All"
 
 
+class PermissionMaskFields(models.Model):
+    """Denormalized permission bitmasks, kept in sync on write.
+
+    Bit positions come from the permission registry; `masks_version` stamps
+    the registry and role templates the masks were encoded from. See
+    `workspace.services.permission_masks`.
+    """
+
+    MASK_FIELDS = ["all_scope_mask", "own_scope_mask", "masks_version"]
+
+    all_scope_mask = models.BigIntegerField(default=0, editable=False)
+    own_scope_mask = models.BigIntegerField(default=0, editable=False)
+    masks_version = models.CharField(
+        max_length=16, blank=True, default="", editable=False
+    )
+
+    class Meta:
+        abstract = True
+
+
 class RolePermission(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     role = models.ForeignKey(
@@ -2,6 +2,7 @@ import uuid
 from django.db import models
 from common.models import TimeStampedModel
 from workspace.models.organization import Organization
+from workspace.models.permission import PermissionMaskFields
 from simple_history.models import HistoricalRecords
 from safedelete.models import SafeDeleteModel
 from safedelete import SOFT_DELETE_CASCADE
@@ -37,24 +38,44 @@ class Workspace(SafeDeleteModel, TimeStampedModel):
         ]
 
 
-class WorkspaceRole(SafeDeleteModel, TimeStampedModel):
+class WorkspaceRole(SafeDeleteModel, TimeStampedModel, PermissionMaskFields):
+    """A role of one workspace, or a shared system role template.
+
+    Templates have no workspace and their grants live in code
+    (`workspace.services.role_templates`); a workspace gets its own row only
+    once it customizes a role.
+    """
+
     _safedelete_policy = SOFT_DELETE_CASCADE
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     workspace = models.ForeignKey(
-        Workspace, on_delete=models.CASCADE, related_name="roles"
+        Workspace,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="roles",
     )
     name = models.CharField(max_length=50)
     is_system = models.BooleanField(default=False)
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=PermissionMaskFields.MASK_FIELDS)
 
     class Meta:
         unique_together = ("workspace", "name")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=models.Q(workspace__isnull=True),
+                name="uniq_system_role_template_name",
+            )
+        ]
 
     def __str__(self) -> str:
-        return f"{self.workspace}:{self.name}"
+        return f"{self.workspace or 'system'}:{self.name}"
 
 
-class WorkspaceMembership(SafeDeleteModel, TimeStampedModel):
+class WorkspaceMembership(
+    SafeDeleteModel, TimeStampedModel, PermissionMaskFields
+):
     _safedelete_policy = SOFT_DELETE_CASCADE
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     workspace = models.ForeignKey(
@@ -71,7 +92,7 @@ class WorkspaceMembership(SafeDeleteModel, TimeStampedModel):
         related_name="members",
     )
     is_active = models.BooleanField(default=True)
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=PermissionMaskFields.MASK_FIELDS)
 
     class Meta:
         unique_together = ("workspace", "user")
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from workspace.models import User
+from workspace.services.permission_cache import compile_permissions
+from workspace.services.role_templates import role_grants
 
 
 class WorkspaceSubscriptionSnapshotSerializer(serializers.Serializer):
@@ -67,6 +69,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "workspace",
             "role",
             "workspace__organization",
+            "workspace__subscription",
         ).prefetch_related("role__permissions", "overrides")
         items = []
         for m in memberships:
@@ -87,21 +90,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
                 else None
             )
             # Effective permissions: union of role permissions and allow=True overrides, highest scope wins
-            eff: dict[str, str] = {}
-            if m.role:
-                for rp in m.role.permissions.all():
-                    prev = eff.get(rp.code)
-                    if prev != "all":
-                        eff[rp.code] = rp.scope
-            for ov in m.overrides.all():
-                if not getattr(ov, "allow", True):
-                    continue
-                prev = eff.get(ov.code)
-                # Promote to "all" if any source grants ALL
-                if ov.scope == "all" or prev == "all":
-                    eff[ov.code] = "all"
-                else:
-                    eff.setdefault(ov.code, ov.scope)
+            eff = compile_permissions(role_grants(m.role), m.overrides.all())
             permissions = [
                 {"code": code, "scope": scope} for code, scope in sorted(eff.items())
             ]
@@ -119,6 +108,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
                     "id": o.id,
                     "name": o.name,
                     "logo": logo_url,
+                    "logo_variants": o.logo_variants if logo_url else None,
                     "brand": o.brand,
                 }
 
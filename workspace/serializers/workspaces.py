@@ -1,20 +1,43 @@
+from django.db import IntegrityError
 from rest_framework import serializers
+from drf_spectacular.utils import extend_schema_field
 from workspace.models import Workspace, Organization
 from workspace.config.plans import PLAN_CHOICES
+from workspace.services.onboarding import create_workspace_with_defaults
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
+    logo_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Organization
         fields = [
             "id",
             "name",
             "logo",
+            "logo_status",
+            "logo_variants",
             "brand",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = ["id", "logo_status", "created_at", "updated_at"]
+
+    @extend_schema_field(
+        serializers.DictField(
+            child=serializers.DictField(child=serializers.CharField()),
+            allow_null=True,
+        )
+    )
+    def get_logo_variants(self, obj) -> dict | None:
+        variants = obj.logo_variants
+        request = self.context.get("request")
+        if not variants or not request:
+            return variants
+        return {
+            name: {fmt: request.build_absolute_uri(url) for fmt, url in urls.items()}
+            for name, urls in variants.items()
+        }
 
 
 class WorkspaceSerializer(serializers.ModelSerializer):
@@ -52,21 +75,13 @@ class WorkspaceCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Provide either organization_id or organization, not both."
             )
-        # Enforce unique workspace name per owner (creator)
-        request = self.context.get("request")
-        name = attrs.get("name")
-        if request and name:
-            exists = Workspace.objects.filter(owner=request.user, name=name).exists()
-            if exists:
-                raise serializers.ValidationError(
-                    {"name": "You already have a workspace with this name."}
-                )
+        # Unique names per owner are enforced by the database in create()
         return attrs
 
     def create(self, validated_data):
         org_id = validated_data.pop("organization_id", None)
         org_data = validated_data.pop("organization", None)
-        validated_data.pop("plan", None)
+        plan = validated_data.pop("plan", None)
         request = self.context.get("request")
         org = None
         if org_id:
@@ -84,9 +99,14 @@ class WorkspaceCreateSerializer(serializers.ModelSerializer):
                 org = existing or Organization.objects.create(owner=owner, **org_data)
             else:
                 org = Organization.objects.create(**org_data)
-        ws = Workspace.objects.create(
-            owner=request.user if request else None,
-            organization=org,
-            **validated_data,
-        )
-        return ws
+        try:
+            return create_workspace_with_defaults(
+                request.user if request else None,
+                validated_data["name"],
+                organization=org,
+                plan=plan,
+            )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"name": "You already have a workspace with this name."}
+            )
@@ -1,9 +1,14 @@
-from typing import Optional
+from typing import Iterable, Optional
 from dataclasses import dataclass
 from django.http import HttpRequest
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.exceptions import ParseError
+from workspace.config.registry import get_permissions_registry
 from workspace.models import Workspace, WorkspaceMembership, PermissionScope
+from workspace.services.permission_cache import get_effective_permissions
+from workspace.services.permission_masks import stored_masks
 
 
 def permission_code(resource: str, action: str) -> str:
@@ -21,74 +26,230 @@ class PermissionContext:
     has_own: bool
 
 
-def _membership_for(user, workspace: Workspace) -> Optional[WorkspaceMembership]:
+@dataclass
+class WorkspaceContext:
+    """Workspace and active membership resolved once per request."""
+
+    workspace: Optional[Workspace] = None
+    membership: Optional[WorkspaceMembership] = None
+
+
+def load_workspace_context(user, workspace_id) -> WorkspaceContext:
+    """Load the workspace and the user's membership, preferring a single query.
+
+    The membership row carries its workspace, organization, subscription and
+    role via select_related. Role grants and overrides are left lazy: the
+    compiled permission cache serves them on the warm path and reads them from
+    this membership on a miss.
+    """
     try:
-        return WorkspaceMembership.objects.select_related("role").get(
-            workspace=workspace, user=user, is_active=True
+        if user is not None and user.is_authenticated:
+            membership = (
+                WorkspaceMembership.objects.select_related(
+                    "workspace",
+                    "workspace__organization",
+                    "workspace__subscription",
+                    "role",
+                )
+                .filter(workspace_id=workspace_id, user=user, is_active=True)
+                .first()
+            )
+            if membership is not None:
+                return WorkspaceContext(membership.workspace, membership)
+        workspace = (
+            Workspace.objects.select_related("organization", "subscription")
+            .filter(pk=workspace_id)
+            .first()
         )
-    except WorkspaceMembership.DoesNotExist:
-        return None
+    except (ValueError, ValidationError):
+        return WorkspaceContext()
+    return WorkspaceContext(workspace, None)
 
 
-def has_workspace_permission(
+def permission_scope(
     user,
-    workspace: Workspace,
+    workspace: Optional[Workspace],
     resource: str,
     action: str,
-    owner_id: Optional[int | str] = None,
-) -> bool:
+    membership: Optional[WorkspaceMembership] = None,
+) -> Optional[PermissionScope]:
+    """The highest scope `user` holds for `resource.action`: ALL, OWN or None."""
     if user.is_superuser:
+        return PermissionScope.ALL
+    if workspace is None:
+        return None
+    perm = get_permissions_registry().lookup(resource, action)
+    if perm is not None and membership is not None:
+        # Stale masks fall through to the compiled cache: checks never write,
+        # `sync_permission_masks` re-encodes them after a deploy
+        masks = stored_masks(membership)
+        if masks is not None:
+            if masks.all & perm.mask:
+                return PermissionScope.ALL
+            if masks.own & perm.mask:
+                return PermissionScope.OWN
+            return None
+
+    perms = get_effective_permissions(user, workspace, membership=membership)
+    if perms is None:
+        return None
+    # Overrides may grant codes no module registers
+    code = perm.code if perm is not None else permission_code(resource, action)
+    scope = perms.get(code)
+    return PermissionScope(scope) if scope else None
+
+
+def _is_owner(scope: Optional[PermissionScope], owner_id, user) -> bool:
+    if scope == PermissionScope.ALL:
         return True
-    membership = _membership_for(user, workspace)
-    if not membership:
-        return False
-    code = permission_code(resource, action)
-
-    # Role grants
-    role_perms = (
-        membership.role.permissions.filter(code=code) if membership.role else []
-    )
-    has_all = any(p.scope == PermissionScope.ALL for p in role_perms)
-    has_own = any(p.scope == PermissionScope.OWN for p in role_perms)
-
-    # Overrides (allow = True only)
-    overrides = membership.overrides.filter(code=code, allow=True)
-    has_all = has_all or any(o.scope == PermissionScope.ALL for o in overrides)
-    has_own = has_own or any(o.scope == PermissionScope.OWN for o in overrides)
-
-    if has_all:
-        return True
-    if has_own and owner_id is not None:
+    if scope == PermissionScope.OWN and owner_id is not None:
         return str(owner_id) == str(user.id)
     return False
 
 
+def has_workspace_permission(
+    user,
+    workspace: Optional[Workspace],
+    resource: str,
+    action: str,
+    owner_id: Optional[int | str] = None,
+    membership: Optional[WorkspaceMembership] = None,
+) -> bool:
+    scope = permission_scope(user, workspace, resource, action, membership)
+    return _is_owner(scope, owner_id, user)
+
+
+def authorize_many(
+    user,
+    workspace: Optional[Workspace],
+    resource: str,
+    action: str,
+    objects: Iterable,
+    owner_field: str = "created_by",
+    membership: Optional[WorkspaceMembership] = None,
+) -> list[bool]:
+    """Authorize every object at once; one flag per object, in order.
+
+    The scope is resolved once, then OWN is decided by comparing each
+    object's `owner_field` foreign key with the user.
+    """
+    scope = permission_scope(user, workspace, resource, action, membership)
+    attname = f"{owner_field}_id"
+    return [_is_owner(scope, getattr(obj, attname, None), user) for obj in objects]
+
+
+def scope_queryset(
+    queryset: QuerySet,
+    user,
+    workspace: Optional[Workspace],
+    resource: str,
+    action: str,
+    owner_field: str = "created_by",
+    membership: Optional[WorkspaceMembership] = None,
+) -> QuerySet:
+    """Narrow `queryset` to the objects `user` may act on, in SQL.
+
+    ALL keeps the queryset, OWN filters on `owner_field`, and anything else
+    empties it. `queryset` must already be limited to `workspace`.
+    """
+    scope = permission_scope(user, workspace, resource, action, membership)
+    if scope == PermissionScope.ALL:
+        return queryset
+    if scope == PermissionScope.OWN:
+        return queryset.filter(**{f"{owner_field}_id": user.pk})
+    return queryset.none()
+
+
 class WorkspaceHeaderResolverMixin:
-    """Resolve workspace from header or url kwarg `workspace_id`."""
+    """Resolve workspace from header or url kwarg `workspace_id`.
+
+    Resolution happens at most once per request; the result is exposed as
+    `request.workspace` and `request.membership` for permissions and views.
+    """
 
     workspace_kwarg = "workspace_id"
 
-    def get_workspace(self, request: HttpRequest) -> Optional[Workspace]:
+    def get_workspace_id(self, request: HttpRequest) -> Optional[str]:
         ws_id = request.headers.get("X-Workspace-ID") or request.query_params.get(
             "workspace_id"
         )
         if not ws_id and hasattr(self, "kwargs"):
             ws_id = self.kwargs.get(self.workspace_kwarg)
-        if not ws_id:
-            return None
-        try:
-            return Workspace.objects.get(pk=ws_id)
-        except Workspace.DoesNotExist:
-            return None
+        return ws_id or None
+
+    def get_workspace_context(self, request: HttpRequest) -> WorkspaceContext:
+        context = getattr(request, "_workspace_context", None)
+        if context is None:
+            ws_id = self.get_workspace_id(request)
+            context = (
+                load_workspace_context(getattr(request, "user", None), ws_id)
+                if ws_id
+                else WorkspaceContext()
+            )
+            request._workspace_context = context
+            request.workspace = context.workspace
+            request.membership = context.membership
+        return context
+
+    def get_workspace(self, request: HttpRequest) -> Optional[Workspace]:
+        return self.get_workspace_context(request).workspace
+
+    def get_membership(self, request: HttpRequest) -> Optional[WorkspaceMembership]:
+        return self.get_workspace_context(request).membership
+
+
+class WorkspaceScopedQuerysetMixin(WorkspaceHeaderResolverMixin):
+    """List only the objects the requester may act on.
+
+    Holders of the ALL scope see the whole queryset, holders of OWN only the
+    rows whose `owner_field` is them, filtered in the list query itself.
+    Set `resource` (and optionally `action_code`) like for
+    `WorkspaceRBACPermission`; `get_queryset` must limit rows to the workspace.
+    """
+
+    owner_field = "created_by"
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        request = self.request
+        action = getattr(self, "action_code", None) or resolve_action(request.method)
+        return scope_queryset(
+            queryset,
+            request.user,
+            self.get_workspace(request),
+            self.resource,
+            action,
+            owner_field=self.owner_field,
+            membership=self.get_membership(request),
+        )
 
 
 class WorkspaceRBACPermission(BasePermission):
     """DRF permission enforcing workspace membership and resource/action checks.
 
     Set view attributes: `resource = "content"` and optionally `action` (for custom actions).
-    Otherwise action is inferred from the method.
+    Otherwise action is inferred from the method. Views with an `owner_field`
+    (see `WorkspaceScopedQuerysetMixin`) also admit holders of the OWN scope,
+    whose objects are then checked or filtered by owner.
     """
 
+    @staticmethod
+    def _scope(request, workspace, resource, action) -> Optional[PermissionScope]:
+        # Resolved once per request, however many objects are checked
+        scopes = getattr(request, "_workspace_scopes", None)
+        if scopes is None:
+            scopes = request._workspace_scopes = {}
+        key = (resource, action)
+        if key not in scopes:
+            scopes[key] = permission_scope(
+                request.user,
+                workspace,
+                resource,
+                action,
+                membership=getattr(request, "membership", None),
+            )
+        return scopes[key]
+
     def has_permission(self, request, view) -> bool:
         if not request.user or not request.user.is_authenticated:
             return False
@@ -110,7 +271,11 @@ class WorkspaceRBACPermission(BasePermission):
             raise ParseError("Missing X-Workspace-ID header.")
 
         action = getattr(view, "action_code", None) or resolve_action(request.method)
-        return has_workspace_permission(request.user, workspace, resource, action)
+        scope = self._scope(request, workspace, resource, action)
+        if scope == PermissionScope.ALL:
+            return True
+        owner_scoped = bool(getattr(view, "owner_field", None))
+        return scope == PermissionScope.OWN and owner_scoped
 
     def has_object_permission(self, request, view, obj) -> bool:
         workspace = getattr(request, "workspace", None)
@@ -118,7 +283,7 @@ class WorkspaceRBACPermission(BasePermission):
         if not resource:
             return True
         action = getattr(view, "action_code", None) or resolve_action(request.method)
-        owner_id = getattr(obj, "created_by_id", None)
-        return has_workspace_permission(
-            request.user, workspace, resource, action, owner_id=owner_id
-        )
+        owner_field = getattr(view, "owner_field", None) or "created_by"
+        owner_id = getattr(obj, f"{owner_field}_id", None)
+        scope = self._scope(request, workspace, resource, action)
+        return _is_owner(scope, owner_id, request.user)
@@ -1,11 +1,52 @@
-from typing import Any, Dict
-from django.conf import settings
+from typing import Any, Dict, Mapping, Optional
 from urllib.parse import urljoin
+from django.core.cache import cache
 from rest_framework import serializers
 from workspace.services.onboarding import choose_plan, confirm_plan
+from workspace.services.stripe_client import stripe_clients, stripe_mode
 from common import config as dyn
 
 
+PAID_STATUSES = frozenset({"paid", "no_payment_required"})
+
+CHECKOUT_CACHE_PREFIX = "billing:checkout"
+CHECKOUT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def session_workspace_id(session: Mapping[str, Any]) -> Optional[str]:
+    return session.get("client_reference_id") or (
+        (session.get("metadata") or {}).get("workspace_id")
+    )
+
+
+def remember_checkout_session(session: Mapping[str, Any]) -> None:
+    """Keep what confirming a checkout needs, so it can skip Stripe."""
+    cache.set(
+        f"{CHECKOUT_CACHE_PREFIX}:{session['id']}",
+        {
+            "id": session["id"],
+            "payment_status": session.get("payment_status"),
+            "client_reference_id": session.get("client_reference_id"),
+            "metadata": dict(session.get("metadata") or {}),
+        },
+        CHECKOUT_CACHE_TIMEOUT,
+    )
+
+
+def _local_checkout_session(session_id: str) -> Optional[Mapping[str, Any]]:
+    """The session as last seen by a webhook: cached, else dj-stripe's copy."""
+    session = cache.get(f"{CHECKOUT_CACHE_PREFIX}:{session_id}")
+    if session is not None:
+        return session
+    from djstripe.models import Session as CheckoutSession
+
+    return (
+        CheckoutSession.objects.filter(id=session_id)
+        .values_list("stripe_data", flat=True)
+        .first()
+    )
+
+
 def _price_for_plan(plan: str, renew_interval: str | None = None) -> str:
     # Try plan + interval first (e.g., STRIPE_PRICE_PRO_YEARLY), then fallback to plan-only
     key = (
@@ -25,25 +66,55 @@ def _price_for_plan(plan: str, renew_interval: str | None = None) -> str:
     return price
 
 
+def _stripe_customer_id(client, user, livemode: bool) -> str:
+    """The user's Stripe customer in `livemode`, created through `client` if new.
+
+    Mirrors ``djstripe Customer.create``, but goes through the pooled client
+    so the key and mode configured in Constance (and ``STRIPE_API_BASE``)
+    apply instead of dj-stripe's settings.
+    """
+    from djstripe.models import Customer
+    from djstripe.settings import djstripe_settings
+
+    customer_id = (
+        Customer.objects.filter(subscriber=user, livemode=livemode)
+        .values_list("id", flat=True)
+        .first()
+    )
+    if customer_id:
+        return customer_id
+
+    metadata = {}
+    subscriber_key = djstripe_settings.SUBSCRIBER_CUSTOMER_KEY
+    if subscriber_key not in ("", None):
+        metadata[subscriber_key] = str(user.pk)
+    params = {"email": user.email, "metadata": metadata}
+    if user.get_full_name():
+        params["name"] = user.get_full_name()
+    idempotency_key = djstripe_settings.get_idempotency_key(
+        "customer", f"create:{user.pk}", livemode=livemode
+    )
+    stripe_customer = client.v1.customers.create(
+        params=params, options={"idempotency_key": idempotency_key}
+    )
+    Customer.objects.get_or_create(
+        id=stripe_customer.id,
+        defaults={"subscriber": user, "livemode": stripe_customer.livemode},
+    )
+    return stripe_customer.id
+
+
 def create_checkout_session(*, user, workspace, plan: str) -> Dict[str, Any]:
     """Persist pending plan and create a Stripe Checkout Session for subscription.
     Returns { url } to redirect the user.
     """
-    if not settings.STRIPE_SECRET_KEY and not dyn.get_secret("STRIPE_TEST_SECRET_KEY") and not dyn.get_secret("STRIPE_LIVE_SECRET_KEY"):
-        raise serializers.ValidationError("Stripe not configured. Add keys in Admin (Constance) or env.")
+    # Keyed, pooled client for the configured mode (live/test)
+    client = stripe_clients.get()
+    live, _ = stripe_mode()
 
     # Record the user's selection; payment confirmation will finalize
     choose_plan(workspace, plan)
 
-    import stripe
-    from djstripe.models import Customer
-
-    # Choose API key based on live mode, with Constance/env fallback
-    live = dyn.get_bool("STRIPE_LIVE_MODE", getattr(settings, "STRIPE_LIVE_MODE", False))
-    secret = (
-        dyn.get_secret("STRIPE_LIVE_SECRET_KEY") if live else dyn.get_secret("STRIPE_TEST_SECRET_KEY")
-    ) or settings.STRIPE_SECRET_KEY
-    stripe.api_key = secret
     # Use workspace preference if present to select monthly/yearly price
     renew_interval = (
         getattr(workspace, "subscription", None)
@@ -58,39 +129,47 @@ def create_checkout_session(*, user, workspace, plan: str) -> Dict[str, Any]:
     )
     cancel_url = urljoin(frontend_base, "billing/cancel")
 
-    customer, _ = Customer.get_or_create(subscriber=user)
-
-    session = stripe.checkout.Session.create(
-        mode="subscription",
-        customer=customer.id,
-        line_items=[{"price": price_id, "quantity": 1}],
-        success_url=success_url,
-        cancel_url=cancel_url,
-        allow_promotion_codes=True,
-        metadata={"workspace_id": str(workspace.id), "plan": plan},
-        client_reference_id=str(workspace.id),
-        automatic_tax={"enabled": True},
+    customer_id = _stripe_customer_id(client, user, live)
+
+    session = client.v1.checkout.sessions.create(
+        params={
+            "mode": "subscription",
+            "customer": customer_id,
+            "line_items": [{"price": price_id, "quantity": 1}],
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "allow_promotion_codes": True,
+            "metadata": {"workspace_id": str(workspace.id), "plan": plan},
+            "client_reference_id": str(workspace.id),
+            "automatic_tax": {"enabled": True},
+        }
     )
     return {"url": session.url}
 
 
 def confirm_checkout_session(*, workspace, session_id: str) -> Dict[str, Any]:
-    """Verify the session with Stripe and finalize the plan locally; returns subscription data dict."""
-    if not settings.STRIPE_SECRET_KEY and not dyn.get_secret("STRIPE_TEST_SECRET_KEY") and not dyn.get_secret("STRIPE_LIVE_SECRET_KEY"):
-        raise serializers.ValidationError("Stripe not configured. Add keys in Admin (Constance) or env.")
+    """Verify the session and finalize the plan locally; returns subscription data.
 
-    import stripe
-    from djstripe.models import CheckoutSession
+    A paid session already delivered by webhook is confirmed from local state;
+    Stripe is only asked when the webhook has not arrived (or was unpaid).
+    """
     from workspace.serializers.subscriptions import SubscriptionSerializer
 
-    live = dyn.get_bool("STRIPE_LIVE_MODE", getattr(settings, "STRIPE_LIVE_MODE", False))
-    secret = (
-        dyn.get_secret("STRIPE_LIVE_SECRET_KEY") if live else dyn.get_secret("STRIPE_TEST_SECRET_KEY")
-    ) or settings.STRIPE_SECRET_KEY
-    stripe.api_key = secret
-    sess = stripe.checkout.Session.retrieve(session_id, expand=["subscription"])  # type: ignore
-
-    if sess.get("payment_status") not in {"paid", "no_payment_required"}:
+    sess = _local_checkout_session(session_id)
+    if sess is None or sess.get("payment_status") not in PAID_STATUSES:
+        client = stripe_clients.get()
+        sess = client.v1.checkout.sessions.retrieve(
+            session_id, params={"expand": ["subscription"]}
+        )
+        from djstripe.models import Session as CheckoutSession
+
+        try:
+            CheckoutSession.sync_from_stripe_data(sess)
+        except Exception:
+            pass
+        remember_checkout_session(sess)
+
+    if sess.get("payment_status") not in PAID_STATUSES:
         raise serializers.ValidationError("Payment not completed.")
 
     sid = str(workspace.id)
@@ -99,10 +178,5 @@ def confirm_checkout_session(*, workspace, session_id: str) -> Dict[str, Any]:
     if sid not in {sess_ws, meta_ws}:
         raise serializers.ValidationError("Session does not match workspace.")
 
-    try:
-        CheckoutSession.sync_from_stripe_data(sess)
-    except Exception:
-        pass
-
     sub = confirm_plan(workspace)
     return SubscriptionSerializer(sub).data
@@ -0,0 +1,161 @@
+import logging
+from datetime import timedelta
+from traceback import format_exc
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from workspace.models import Subscription, Workspace
+from workspace.services.onboarding import confirm_plan
+from workspace.services.billing import (
+    PAID_STATUSES,
+    remember_checkout_session,
+    session_workspace_id,
+)
+from workspace.services.stripe_client import stripe_mode
+
+
+logger = logging.getLogger(__name__)
+
+# Events that settle a pending plan chosen at checkout
+CHECKOUT_EVENTS = frozenset(
+    {"checkout.session.completed", "checkout.session.async_payment_succeeded"}
+)
+
+
+def enqueue_webhook(sender, instance, valid: bool, **kwargs) -> None:
+    """``djstripe.signals.webhook_post_validate`` receiver: defer the plan change.
+
+    dj-stripe has stored the raw event and verified its signature; it then
+    mirrors the event into its own tables within the request. Settling the
+    plan is left to a worker, which only needs the stored trigger row, so
+    it happens even when that mirroring fails.
+    """
+    if not valid:
+        return
+    from django_q.tasks import async_task
+
+    trigger_id = instance.pk
+    transaction.on_commit(
+        lambda: async_task("workspace.tasks.apply_stripe_webhook", trigger_id)
+    )
+
+
+def apply_checkout_event(event: Dict[str, Any]) -> bool:
+    """Confirm the pending plan of the workspace a paid checkout belongs to."""
+    if event.get("type") not in CHECKOUT_EVENTS:
+        return False
+    session = (event.get("data") or {}).get("object") or {}
+    if session.get("payment_status") not in PAID_STATUSES:
+        return False
+    remember_checkout_session(session)
+    workspace_id = session_workspace_id(session)
+    if not workspace_id or not Workspace.objects.filter(pk=workspace_id).exists():
+        logger.warning("Checkout %s has no known workspace", session.get("id"))
+        return False
+    subscription = (
+        Subscription.objects.select_related("workspace")
+        .filter(workspace_id=workspace_id)
+        .first()
+    )
+    if subscription is None:
+        # Nothing is pending without a subscription; retrying cannot help
+        logger.warning(
+            "Checkout %s paid for workspace %s, which has no subscription",
+            session.get("id"),
+            workspace_id,
+        )
+        return False
+    # Only settle the plan this checkout paid for: a redelivered event must
+    # neither repeat the change nor confirm a plan chosen since
+    plan = (session.get("metadata") or {}).get("plan")
+    if plan and subscription.pending_plan != plan:
+        return False
+    confirm_plan(subscription.workspace)
+    return True
+
+
+def apply_webhook(trigger_id: int) -> bool:
+    """Apply the plan change a stored, verified webhook carries, if any."""
+    from djstripe.models import WebhookEventTrigger
+
+    trigger = WebhookEventTrigger.objects.filter(pk=trigger_id, valid=True).first()
+    if trigger is None:
+        return False
+    return apply_checkout_event(trigger.json_body)
+
+
+def process_webhook(trigger_id: int) -> bool:
+    """Apply a stored webhook, then mirror it into dj-stripe's tables.
+
+    The trigger row is locked while it is handled and skipped once
+    processed, and a plan is only confirmed while it is still the one the
+    checkout paid for, so duplicate runs and Stripe redeliveries change
+    nothing. A failure to mirror the event is recorded on the trigger like
+    dj-stripe does; the plan change it carried is kept.
+    """
+    from djstripe.models import WebhookEventTrigger
+
+    with transaction.atomic():
+        trigger = (
+            WebhookEventTrigger.objects.select_for_update()
+            .filter(pk=trigger_id, valid=True, processed=False)
+            .first()
+        )
+        if trigger is None:
+            return False
+        event = trigger.json_body
+        applied = apply_checkout_event(event)
+
+        live, secret = stripe_mode()
+        api_key = secret if live == bool(event.get("livemode")) else None
+        try:
+            with transaction.atomic():
+                trigger.process(save=False, api_key=api_key)
+        except Exception as exc:
+            logger.error(
+                "Failed to sync Stripe event %s (trigger %s), retried by the "
+                "next re-drive: %s",
+                event.get("id"),
+                trigger.pk,
+                exc,
+            )
+            max_length = WebhookEventTrigger._meta.get_field("exception").max_length
+            trigger.exception = str(exc)[:max_length]
+            trigger.traceback = format_exc()
+        trigger.save()
+    return applied
+
+
+def redrive_webhooks(
+    older_than: Optional[timedelta] = None, max_age: Optional[timedelta] = None
+) -> int:
+    """Reprocess verified triggers dj-stripe failed to process.
+
+    Triggers between `older_than` (``STRIPE_WEBHOOK_REDRIVE_AFTER``) and
+    `max_age` (``STRIPE_WEBHOOK_REDRIVE_MAX_AGE``) are retried; older ones
+    are left for manual inspection. Returns how many are still failing.
+    """
+    from djstripe.models import WebhookEventTrigger
+
+    if older_than is None:
+        older_than = getattr(
+            settings, "STRIPE_WEBHOOK_REDRIVE_AFTER", timedelta(minutes=10)
+        )
+    if max_age is None:
+        max_age = getattr(settings, "STRIPE_WEBHOOK_REDRIVE_MAX_AGE", timedelta(days=3))
+    now = timezone.now()
+    stuck = WebhookEventTrigger.objects.filter(
+        valid=True,
+        processed=False,
+        created__lte=now - older_than,
+        created__gte=now - max_age,
+    ).values_list("pk", flat=True)
+    failing = 0
+    for trigger_id in list(stuck):
+        process_webhook(trigger_id)
+        if WebhookEventTrigger.objects.filter(pk=trigger_id, processed=False).exists():
+            failing += 1
+    if failing:
+        logger.error("%s Stripe webhook(s) still unprocessed after re-drive", failing)
+    return failing
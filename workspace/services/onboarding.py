@@ -1,23 +1,62 @@
 from django.db import transaction
-from workspace.models import Workspace, WorkspaceMembership, Subscription, Organization
+from workspace.models import (
+    Workspace,
+    WorkspaceMembership,
+    Subscription,
+    Organization,
+)
 from workspace.config.plans import limits_for
-from .roles import seed_workspace_roles
+from workspace.services.permission_cache import invalidate_workspace_permissions
+from workspace.services.profile_cache import invalidate_profiles
+from .permission_masks import role_masks
+from .role_templates import ensure_system_roles, system_role
 
 
 @transaction.atomic
 def create_workspace_with_defaults(
-    owner, name: str, organization: Organization | None = None
+    owner,
+    name: str,
+    organization: Organization | None = None,
+    plan: str | None = None,
 ) -> Workspace:
-    ws = Workspace.objects.create(owner=owner, name=name, organization=organization)
-    seed_workspace_roles(ws)
-    owner_role = ws.roles.get(name="Owner")
-    WorkspaceMembership.objects.create(workspace=ws, user=owner, role=owner_role)
-    Subscription.objects.create(
+    """Create a workspace with its owner membership and subscription.
+
+    The workspace references the shared system role templates instead of
+    getting roles of its own. Every row is built in memory and written with
+    one bulk insert per table plus one per history table, a fixed number of
+    statements with no re-reads. A paid `plan` is recorded as pending until
+    payment confirms it. The returned workspace has its subscription cached.
+    """
+    ensure_system_roles()
+    ws = Workspace(owner=owner, name=name, organization=organization)
+    owner_role = system_role("Owner")
+    membership = WorkspaceMembership(
+        workspace=ws,
+        user=owner,
+        role=owner_role,
+        **role_masks(owner_role).as_fields(),
+    )
+    subscription = Subscription(
         workspace=ws,
         plan="free",
+        pending_plan=plan if plan and plan != "free" else None,
         status="trial",
         limits=limits_for("free"),
     )
+
+    Workspace.objects.bulk_create([ws])
+    WorkspaceMembership.objects.bulk_create([membership])
+    Subscription.objects.bulk_create([subscription])
+    for model, objs in (
+        (Workspace, [ws]),
+        (WorkspaceMembership, [membership]),
+        (Subscription, [subscription]),
+    ):
+        model.history.bulk_history_create(objs)
+
+    # bulk_create bypasses post_save, so the cache signals are replayed here
+    invalidate_workspace_permissions(ws.pk)
+    invalidate_profiles([owner.pk])
     return ws
 
 
@@ -0,0 +1,120 @@
+import uuid
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+from django.db import transaction
+from django.core.cache import cache
+from workspace.models import Workspace, WorkspaceMembership, PermissionScope
+from workspace.services.role_templates import role_grants
+
+
+# Effective permissions of a membership: permission code -> highest granted scope
+EffectivePermissions = Mapping[str, str]
+
+CACHE_PREFIX = "rbac"
+CACHE_TIMEOUT = 60 * 60
+LOCAL_CACHE_MAX_ENTRIES = 10_000
+
+# In-process layer: (workspace_id, user_id) -> (version, permissions or None)
+_local: dict[tuple[str, str], tuple[str, Optional[EffectivePermissions]]] = {}
+
+
+def _version_key(workspace_id: str) -> str:
+    return f"{CACHE_PREFIX}:ver:{workspace_id}"
+
+
+def _perms_key(workspace_id: str, user_id: str) -> str:
+    return f"{CACHE_PREFIX}:perms:{workspace_id}:{user_id}"
+
+
+def _new_stamp() -> str:
+    return uuid.uuid4().hex
+
+
+def compile_permissions(
+    role_permissions: Iterable, overrides: Iterable = ()
+) -> EffectivePermissions:
+    """Merge role grants and allow-overrides into a frozen code -> scope map.
+
+    Any source granting ALL wins over OWN for the same code.
+    """
+    eff: dict[str, str] = {}
+    for grant in (*role_permissions, *overrides):
+        if not getattr(grant, "allow", True):
+            continue
+        if eff.get(grant.code) != PermissionScope.ALL:
+            eff[grant.code] = str(grant.scope)
+    return MappingProxyType(eff)
+
+
+def _compile_membership(
+    membership: Optional[WorkspaceMembership],
+) -> Optional[EffectivePermissions]:
+    if membership is None:
+        return None
+    return compile_permissions(role_grants(membership.role), membership.overrides.all())
+
+
+def _load_membership(workspace_id: str, user_id) -> Optional[WorkspaceMembership]:
+    return (
+        WorkspaceMembership.objects.select_related("role")
+        .prefetch_related("role__permissions", "overrides")
+        .filter(workspace_id=workspace_id, user_id=user_id, is_active=True)
+        .first()
+    )
+
+
+def invalidate_workspace_permissions(workspace_id) -> None:
+    """Bump the version stamp so every compiled set of the workspace goes stale."""
+    if workspace_id is None:
+        return
+    key = _version_key(str(workspace_id))
+    cache.set(key, _new_stamp(), None)
+    # Bump again after commit: a concurrent request may have compiled from pre-commit rows
+    transaction.on_commit(lambda: cache.set(key, _new_stamp(), None))
+
+
+def get_effective_permissions(
+    user,
+    workspace: Workspace | str,
+    membership: Optional[WorkspaceMembership] = None,
+) -> Optional[EffectivePermissions]:
+    """Return the compiled permissions of `user` in `workspace`.
+
+    Returns None when the user has no active membership. The warm path costs a
+    single cache round-trip (version stamp + shared entry) and no queries. Pass
+    an already-loaded `membership` with prefetched role permissions and
+    overrides to compile without querying on a miss.
+    """
+    workspace_id = str(getattr(workspace, "pk", workspace))
+    user_id = str(user.pk)
+    ver_key = _version_key(workspace_id)
+    perms_key = _perms_key(workspace_id, user_id)
+
+    values = cache.get_many([ver_key, perms_key])
+    version = values.get(ver_key)
+    if version is None:
+        version = _new_stamp()
+        if not cache.add(ver_key, version, None):
+            version = cache.get(ver_key) or version
+
+    local = _local.get((workspace_id, user_id))
+    if local is not None and local[0] == version:
+        return local[1]
+
+    stored = values.get(perms_key)
+    if stored is not None and stored[0] == version:
+        perms = None if stored[1] is None else MappingProxyType(stored[1])
+    else:
+        if membership is None:
+            membership = _load_membership(workspace_id, user.pk)
+        perms = _compile_membership(membership)
+        cache.set(
+            perms_key,
+            (version, None if perms is None else dict(perms)),
+            CACHE_TIMEOUT,
+        )
+
+    if len(_local) >= LOCAL_CACHE_MAX_ENTRIES:
+        _local.clear()
+    _local[(workspace_id, user_id)] = (version, perms)
+    return perms
@@ -0,0 +1,185 @@
+import hashlib
+from typing import Callable, Iterable, NamedTuple, Optional
+from django.db.models import QuerySet
+from workspace.config.registry import get_permissions_registry
+from workspace.models import (
+    WorkspaceRole,
+    WorkspaceMembership,
+    PermissionScope,
+)
+from workspace.models.permission import PermissionMaskFields
+from workspace.services.role_templates import (
+    is_template,
+    role_grants,
+    template_grants,
+)
+
+
+class ScopeMasks(NamedTuple):
+    """Registry bits granted at ALL scope, and those granted only at OWN."""
+
+    all: int = 0
+    own: int = 0
+
+    def merge(self, other: "ScopeMasks") -> "ScopeMasks":
+        # Any source granting ALL wins over OWN for the same permission
+        granted_all = self.all | other.all
+        return ScopeMasks(granted_all, (self.own | other.own) & ~granted_all)
+
+    def as_fields(self) -> dict:
+        return {
+            "all_scope_mask": self.all,
+            "own_scope_mask": self.own,
+            "masks_version": masks_version(),
+        }
+
+
+EMPTY = ScopeMasks()
+
+# The registry the entries below were derived from, the version stamp of
+# stored masks, and template role id -> masks
+_template_masks: dict = {"registry": None, "version": None, "masks": {}}
+
+
+def _templates_state() -> dict:
+    registry = get_permissions_registry()
+    if _template_masks["registry"] is not registry:
+        _template_masks.update(registry=registry, version=None, masks={})
+    return _template_masks
+
+
+def masks_version() -> str:
+    """Stamp of what stored masks were encoded from.
+
+    Covers the registry's bit assignment and the template roles' grants and
+    scopes, so masks stored before either changed are no longer trusted.
+    """
+    state = _templates_state()
+    if state["version"] is None:
+        parts = [state["registry"].signature]
+        for role_id, grants in sorted(template_grants().items()):
+            parts.extend(f"{role_id}:{grant.code}:{grant.scope}" for grant in grants)
+        state["version"] = hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+    return state["version"]
+
+
+def encode(grants: Iterable) -> ScopeMasks:
+    """Encode role grants or overrides; unregistered codes are left out."""
+    registry = get_permissions_registry()
+    granted_all = granted_own = 0
+    for grant in grants:
+        if not getattr(grant, "allow", True):
+            continue
+        perm = registry.get(grant.code)
+        if perm is None:
+            continue
+        if grant.scope == PermissionScope.ALL:
+            granted_all |= perm.mask
+        else:
+            granted_own |= perm.mask
+    return ScopeMasks(granted_all, granted_own & ~granted_all)
+
+
+def stored_masks(
+    obj: WorkspaceRole | WorkspaceMembership,
+) -> Optional[ScopeMasks]:
+    """The denormalized masks of `obj`, or None if encoded from other grants.
+
+    See `masks_version`; stale rows are re-encoded by `resync_masks`.
+    """
+    if obj.masks_version != masks_version():
+        return None
+    return ScopeMasks(obj.all_scope_mask, obj.own_scope_mask)
+
+
+def role_masks(role: Optional[WorkspaceRole]) -> ScopeMasks:
+    if role is None:
+        return EMPTY
+    if is_template(role):
+        cached = _templates_state()["masks"]
+        masks = cached.get(role.pk)
+        if masks is None:
+            masks = cached[role.pk] = encode(role_grants(role))
+        return masks
+    masks = stored_masks(role)
+    return masks if masks is not None else encode(role.permissions.all())
+
+
+def membership_masks(membership: WorkspaceMembership) -> ScopeMasks:
+    """Compute the masks of `membership` from its role and overrides."""
+    masks = role_masks(membership.role)
+    if not membership._state.adding:
+        masks = masks.merge(encode(membership.overrides.all()))
+    return masks
+
+
+def sync_membership_masks(memberships: Iterable[WorkspaceMembership]) -> None:
+    """Recompute and store the masks of `memberships` where they changed."""
+    stale = []
+    for membership in memberships:
+        fields = membership_masks(membership).as_fields()
+        if any(getattr(membership, name) != value for name, value in fields.items()):
+            for name, value in fields.items():
+                setattr(membership, name, value)
+            stale.append(membership)
+    if stale:
+        WorkspaceMembership.all_objects.bulk_update(
+            stale, WorkspaceMembership.MASK_FIELDS
+        )
+
+
+def sync_role_masks(role: WorkspaceRole) -> None:
+    """Re-encode `role` from its grants, then every membership holding it."""
+    fields = encode(role.permissions.all()).as_fields()
+    WorkspaceRole.all_objects.filter(pk=role.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(role, name, value)
+    sync_membership_masks(
+        WorkspaceMembership.all_objects.filter(role=role)
+        .select_related("role")
+        .prefetch_related("overrides")
+    )
+
+
+def _reencode(
+    queryset: QuerySet, masks_of: Callable[..., ScopeMasks], batch_size: int
+) -> int:
+    manager = queryset.model._base_manager
+    batch: list = []
+    count = 0
+    for obj in queryset.iterator(chunk_size=batch_size):
+        for name, value in masks_of(obj).as_fields().items():
+            setattr(obj, name, value)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            manager.bulk_update(batch, PermissionMaskFields.MASK_FIELDS)
+            count, batch = count + len(batch), []
+    if batch:
+        manager.bulk_update(batch, PermissionMaskFields.MASK_FIELDS)
+    return count + len(batch)
+
+
+def resync_masks(role_model=None, membership_model=None, batch_size: int = 500) -> int:
+    """Re-encode every role and membership whose masks are stale.
+
+    Permission checks only read the masks and fall back to the compiled
+    permission cache for stale rows; this runs after migrating (see the
+    ``sync_permission_masks`` command) and from migrations, which pass
+    their historical models. Returns how many rows were rewritten.
+    """
+    role_model = role_model or WorkspaceRole
+    membership_model = membership_model or WorkspaceMembership
+    version = masks_version()
+    # Roles first: memberships are encoded from their role's fresh masks
+    roles = (
+        role_model._base_manager.filter(workspace__isnull=False)
+        .exclude(masks_version=version)
+        .prefetch_related("permissions")
+    )
+    count = _reencode(roles, lambda role: encode(role.permissions.all()), batch_size)
+    memberships = (
+        membership_model._base_manager.exclude(masks_version=version)
+        .select_related("role")
+        .prefetch_related("overrides")
+    )
+    return count + _reencode(memberships, membership_masks, batch_size)
@@ -0,0 +1,76 @@
+import json
+import uuid
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+from django.db import transaction
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+CACHE_PREFIX = "profile"
+CACHE_TIMEOUT = 60 * 60
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    etag: str
+    data: Any
+
+
+def _version_key(user_id) -> str:
+    return f"{CACHE_PREFIX}:ver:{user_id}"
+
+
+def _snapshot_key(user_id) -> str:
+    return f"{CACHE_PREFIX}:snap:{user_id}"
+
+
+def _new_stamp() -> str:
+    return uuid.uuid4().hex
+
+
+def compute_etag(data: Any) -> str:
+    """Strong ETag over the canonical JSON form of the profile payload."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return '"%s"' % hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def invalidate_profiles(user_ids: Iterable) -> None:
+    """Drop the cached profile snapshot of every given user."""
+    keys = {_version_key(user_id) for user_id in user_ids if user_id is not None}
+    if not keys:
+        return
+
+    def bump():
+        stamp = _new_stamp()
+        cache.set_many({key: stamp for key in keys}, None)
+
+    bump()
+    # Bump again after commit: a concurrent request may have rebuilt from pre-commit rows
+    transaction.on_commit(bump)
+
+
+def get_profile_snapshot(user, build: Callable[[], Any]) -> ProfileSnapshot:
+    """Return the cached profile snapshot of `user`, building it on a miss.
+
+    The warm path is a single cache round-trip with no queries and no
+    serialization.
+    """
+    ver_key = _version_key(user.pk)
+    snap_key = _snapshot_key(user.pk)
+    values = cache.get_many([ver_key, snap_key])
+    version = values.get(ver_key)
+    if version is None:
+        version = _new_stamp()
+        if not cache.add(ver_key, version, None):
+            version = cache.get(ver_key) or version
+
+    stored = values.get(snap_key)
+    if stored is not None and stored[0] == version:
+        return stored[1]
+
+    data = build()
+    snapshot = ProfileSnapshot(etag=compute_etag(data), data=data)
+    cache.set(snap_key, (version, snapshot), CACHE_TIMEOUT)
+    return snapshot
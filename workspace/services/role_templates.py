@@ -0,0 +1,123 @@
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F, Q
+from workspace.config.registry import get_permissions_registry
+from workspace.config.types import PermissionCode as PC
+from workspace.models import Workspace, WorkspaceRole, PermissionScope
+
+
+DEFAULT_ROLE_DEFS: Dict[str, Iterable[tuple[PC, PermissionScope]]] = {
+    "Owner": [
+        (PC.WORKSPACE_USERS_VIEW, PermissionScope.ALL),
+        (PC.WORKSPACE_USERS_CHANGE, PermissionScope.ALL),
+        (PC.ROLES_VIEW, PermissionScope.ALL),
+        (PC.ROLES_CHANGE, PermissionScope.ALL),
+        (PC.SUBSCRIPTION_VIEW, PermissionScope.ALL),
+        (PC.SUBSCRIPTION_CHANGE, PermissionScope.ALL),
+        (PC.INVITES_VIEW, PermissionScope.ALL),
+        (PC.INVITES_CHANGE, PermissionScope.ALL),
+        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
+        (PC.ORGANIZATION_CHANGE, PermissionScope.ALL),
+    ],
+    "Editor": [
+        (PC.INVITES_VIEW, PermissionScope.ALL),
+        (PC.INVITES_CHANGE, PermissionScope.ALL),
+        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
+        (PC.ORGANIZATION_CHANGE, PermissionScope.ALL),
+    ],
+    "Member": [
+        (PC.INVITES_VIEW, PermissionScope.ALL),
+        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
+    ],
+}
+
+# Template ids are derived from the role name, so every process (and the
+# migration that creates the rows) agrees on them without a lookup
+SYSTEM_ROLE_NAMESPACE = uuid.UUID("6f1c0f4e-2b7a-4d5e-9a43-0c3d2f8e7b11")
+
+# Whether this process has made sure the template rows exist
+_templates_ready = False
+# The registry the in-memory grant table was built from, and the table
+_templates: Optional[tuple[object, Mapping[uuid.UUID, tuple]]] = None
+
+
+@dataclass(frozen=True)
+class TemplateGrant:
+    code: str
+    scope: str
+
+
+def system_role_id(name: str) -> uuid.UUID:
+    return uuid.uuid5(SYSTEM_ROLE_NAMESPACE, name)
+
+
+def system_role(name: str) -> WorkspaceRole:
+    """An in-memory instance of template `name`, to reference without a query."""
+    role = WorkspaceRole(id=system_role_id(name), name=name, is_system=True)
+    role._state.adding = False
+    return role
+
+
+def template_grants() -> Mapping[uuid.UUID, tuple[TemplateGrant, ...]]:
+    """Template id -> grants, rebuilt only when the permission registry is reloaded."""
+    global _templates
+    registry = get_permissions_registry()
+    templates = _templates
+    if templates is not None and templates[0] is registry:
+        return templates[1]
+    table: dict[uuid.UUID, tuple[TemplateGrant, ...]] = {}
+    for name, perms in DEFAULT_ROLE_DEFS.items():
+        for code, _ in perms:
+            if code.value not in registry:
+                raise ImproperlyConfigured(
+                    f"System role {name!r} grants unregistered permission "
+                    f"{code.value!r}"
+                )
+        table[system_role_id(name)] = tuple(
+            TemplateGrant(code.value, str(scope)) for code, scope in perms
+        )
+    _templates = (registry, MappingProxyType(table))
+    return _templates[1]
+
+
+def is_template(role: WorkspaceRole) -> bool:
+    return role.workspace_id is None
+
+
+def role_grants(role: Optional[WorkspaceRole]) -> Iterable:
+    """Grants of `role`: in-memory for shared templates, rows for workspace roles."""
+    if role is None:
+        return ()
+    if is_template(role):
+        return template_grants().get(role.pk, ())
+    return role.permissions.all()
+
+
+def ensure_system_roles() -> None:
+    """Create the shared template rows once per process if they are missing."""
+    global _templates_ready
+    if _templates_ready:
+        return
+    WorkspaceRole.objects.bulk_create(
+        [
+            WorkspaceRole(id=system_role_id(name), name=name, is_system=True)
+            for name in DEFAULT_ROLE_DEFS
+        ],
+        ignore_conflicts=True,
+    )
+    _templates_ready = True
+
+
+def workspace_role(workspace: Workspace, name: str) -> Optional[WorkspaceRole]:
+    """The role `name` of `workspace`: its customized copy, else the template."""
+    ensure_system_roles()
+    return (
+        WorkspaceRole.objects.filter(
+            Q(workspace=workspace) | Q(workspace__isnull=True), name=name
+        )
+        .order_by(F("workspace_id").asc(nulls_last=True))
+        .first()
+    )
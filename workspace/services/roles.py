@@ -1,50 +1,109 @@
 from typing import Dict, Iterable
+from django.db import transaction
 from workspace.config.registry import get_permissions_registry
-from workspace.models import Workspace, WorkspaceRole, RolePermission, PermissionScope
+from workspace.models import (
+    Workspace,
+    WorkspaceRole,
+    WorkspaceMembership,
+    WorkspaceInvite,
+    RolePermission,
+    PermissionScope,
+)
 from workspace.config.types import PermissionCode as PC
+from workspace.services.permission_cache import invalidate_workspace_permissions
+from workspace.services.profile_cache import invalidate_profiles
+from workspace.services.permission_masks import encode, role_masks
+from workspace.services.role_templates import (
+    DEFAULT_ROLE_DEFS,
+    is_template,
+    role_grants,
+    workspace_role,
+)
 
 
-DEFAULT_ROLE_DEFS: Dict[str, Iterable[tuple[PC, PermissionScope]]] = {
-    "Owner": [
-        (PC.WORKSPACE_USERS_VIEW, PermissionScope.ALL),
-        (PC.WORKSPACE_USERS_CHANGE, PermissionScope.ALL),
-        (PC.ROLES_VIEW, PermissionScope.ALL),
-        (PC.ROLES_CHANGE, PermissionScope.ALL),
-        (PC.SUBSCRIPTION_VIEW, PermissionScope.ALL),
-        (PC.SUBSCRIPTION_CHANGE, PermissionScope.ALL),
-        (PC.INVITES_VIEW, PermissionScope.ALL),
-        (PC.INVITES_CHANGE, PermissionScope.ALL),
-        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
-        (PC.ORGANIZATION_CHANGE, PermissionScope.ALL),
-    ],
-    "Editor": [
-        (PC.INVITES_VIEW, PermissionScope.ALL),
-        (PC.INVITES_CHANGE, PermissionScope.ALL),
-        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
-        (PC.ORGANIZATION_CHANGE, PermissionScope.ALL),
-    ],
-    "Member": [
-        (PC.INVITES_VIEW, PermissionScope.ALL),
-        (PC.ORGANIZATION_VIEW, PermissionScope.ALL),
-    ],
-}
-
-
-def seed_workspace_roles(
+def build_workspace_roles(
     workspace: Workspace,
     role_defs: Dict[str, Iterable[tuple[PC, PermissionScope]]] | None = None,
-) -> None:
+) -> tuple[Dict[str, WorkspaceRole], list[RolePermission]]:
+    """Unsaved roles of `workspace` and their grants, ready to bulk insert."""
     # Validate against centralized registry to avoid typos and keep consistency
     registry = get_permissions_registry()
     defs = role_defs or DEFAULT_ROLE_DEFS
+    roles: Dict[str, WorkspaceRole] = {}
+    grants: list[RolePermission] = []
     for role_name, perms in defs.items():
-        role = WorkspaceRole.objects.create(
+        role = roles[role_name] = WorkspaceRole(
             workspace=workspace, name=role_name, is_system=True
         )
-        valid_perms = [(code, scope) for code, scope in perms if code.value in registry]
-        RolePermission.objects.bulk_create(
-            [
-                RolePermission(role=role, code=code.value, scope=scope)
-                for code, scope in valid_perms
-            ]
-        )
+        granted = [
+            RolePermission(role=role, code=code.value, scope=scope)
+            for code, scope in perms
+            if code.value in registry
+        ]
+        for name, value in encode(granted).as_fields().items():
+            setattr(role, name, value)
+        grants.extend(granted)
+    return roles, grants
+
+
+def seed_workspace_roles(
+    workspace: Workspace,
+    role_defs: Dict[str, Iterable[tuple[PC, PermissionScope]]] | None = None,
+) -> Dict[str, WorkspaceRole]:
+    """Materialize workspace-specific roles.
+
+    New workspaces do not need this: they reference the shared system role
+    templates until a role is customized (see `customize_role`).
+    """
+    roles, grants = build_workspace_roles(workspace, role_defs)
+    WorkspaceRole.objects.bulk_create(roles.values())
+    WorkspaceRole.history.bulk_history_create(roles.values())
+    RolePermission.objects.bulk_create(grants)
+    # bulk_create bypasses post_save, so stale compiled sets are dropped here
+    invalidate_workspace_permissions(workspace.pk)
+    return roles
+
+
+@transaction.atomic
+def customize_role(workspace: Workspace, name: str) -> WorkspaceRole:
+    """Return an editable role `name` of `workspace`, copying the template on first use.
+
+    The copy starts with the template's grants, and the workspace's members
+    and pending invites holding the template are moved onto it, so nothing
+    changes for them until the copy is edited. Other workspaces keep
+    referencing the template.
+    """
+    # Serialize copies of the same workspace's roles
+    Workspace.objects.select_for_update().filter(pk=workspace.pk).first()
+    template = workspace_role(workspace, name)
+    if template is None:
+        raise WorkspaceRole.DoesNotExist(f"Unknown role: {name}")
+    if not is_template(template):
+        return template
+
+    role = WorkspaceRole.objects.create(
+        workspace=workspace,
+        name=template.name,
+        is_system=True,
+        **role_masks(template).as_fields(),
+    )
+    RolePermission.objects.bulk_create(
+        RolePermission(role=role, code=grant.code, scope=grant.scope)
+        for grant in role_grants(template)
+    )
+    members = list(
+        WorkspaceMembership.objects.filter(workspace=workspace, role=template)
+    )
+    for membership in members:
+        membership.role = role
+    # Same grants as the template, so the members' masks stay as they are
+    WorkspaceMembership.objects.bulk_update(members, ["role"])
+    WorkspaceMembership.history.bulk_history_create(members, update=True)
+    WorkspaceInvite.objects.filter(workspace=workspace, role=template).update(
+        role=role
+    )
+
+    # bulk writes bypass post_save, so the cache signals are replayed here
+    invalidate_workspace_permissions(workspace.pk)
+    invalidate_profiles([membership.user_id for membership in members])
+    return role
@@ -0,0 +1,104 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from django.conf import settings
+from rest_framework import serializers
+from common import config as dyn
+
+
+def stripe_mode() -> Tuple[bool, Optional[str]]:
+    """Whether live mode is on, and the secret key for that mode."""
+    live = dyn.get_bool(
+        "STRIPE_LIVE_MODE", getattr(settings, "STRIPE_LIVE_MODE", False)
+    )
+    secret = (
+        dyn.get_secret("STRIPE_LIVE_SECRET_KEY")
+        if live
+        else dyn.get_secret("STRIPE_TEST_SECRET_KEY")
+    ) or settings.STRIPE_SECRET_KEY
+    return live, secret
+
+
+class StripeClientPool:
+    """One keep-alive `stripe.StripeClient` per mode (live/test) and process.
+
+    Each client owns a pooled HTTP session, so checkout calls reuse warm TLS
+    connections instead of dialing Stripe every time. Clients carry their own
+    API key (the module-level ``stripe.api_key`` is never touched), a connect
+    and read timeout, and Stripe's network retries with exponential backoff.
+    A client is rebuilt when its key changes in Constance.
+
+    ``STRIPE_API_BASE`` points the clients at another server, such as a local
+    fake in tests; `override` swaps in a prepared client altogether.
+    """
+
+    def __init__(self):
+        self._clients: Dict[bool, Tuple[str, object]] = {}
+        self._override = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _timeout() -> Tuple[float, float]:
+        return (
+            getattr(settings, "STRIPE_CONNECT_TIMEOUT", 5.0),
+            getattr(settings, "STRIPE_READ_TIMEOUT", 30.0),
+        )
+
+    def _build(self, secret: str):
+        import stripe
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        pool_size = getattr(settings, "STRIPE_HTTP_POOL_SIZE", 10)
+        session = requests.Session()
+        session.mount(
+            "https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        )
+        base = getattr(settings, "STRIPE_API_BASE", None)
+        return stripe.StripeClient(
+            secret,
+            http_client=stripe.RequestsClient(
+                timeout=self._timeout(), session=session
+            ),
+            max_network_retries=getattr(settings, "STRIPE_MAX_NETWORK_RETRIES", 2),
+            base_addresses={"api": base} if base else {},
+        )
+
+    def get(self):
+        """The client for the current mode; raises if Stripe is not configured."""
+        if self._override is not None:
+            return self._override
+        live, secret = stripe_mode()
+        if not secret:
+            raise serializers.ValidationError(
+                "Stripe not configured. Add keys in Admin (Constance) or env."
+            )
+        with self._lock:
+            if self._pid != os.getpid():
+                # Sockets must not be shared with the parent after a fork
+                self._clients = {}
+                self._pid = os.getpid()
+            entry = self._clients.get(live)
+            if entry is None or entry[0] != secret:
+                entry = self._clients[live] = (secret, self._build(secret))
+            return entry[1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clients = {}
+
+    @contextmanager
+    def override(self, client) -> Iterator[None]:
+        previous, self._override = self._override, client
+        try:
+            yield
+        finally:
+            self._override = previous
+
+
+stripe_clients = StripeClientPool()
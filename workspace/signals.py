@@ -0,0 +1,136 @@
+from django.dispatch import receiver
+from djstripe.signals import webhook_post_validate
+from django.db.models.signals import post_save, post_delete
+from workspace.models import (
+    User,
+    Workspace,
+    WorkspaceRole,
+    WorkspaceMembership,
+    RolePermission,
+    UserPermissionOverride,
+    Subscription,
+    Organization,
+)
+from workspace.services.permission_cache import invalidate_workspace_permissions
+from workspace.services.profile_cache import invalidate_profiles
+from workspace.services.permission_masks import sync_membership_masks, sync_role_masks
+from workspace.services.billing_webhooks import enqueue_webhook
+
+
+def _workspace_member_ids(workspace_ids):
+    return WorkspaceMembership.all_objects.filter(
+        workspace_id__in=workspace_ids
+    ).values_list("user_id", flat=True)
+
+
+# --- RBAC permission cache invalidation ---
+
+
+@receiver([post_save, post_delete], sender=WorkspaceRole)
+@receiver([post_save, post_delete], sender=WorkspaceMembership)
+def invalidate_on_workspace_change(sender, instance, **kwargs):
+    invalidate_workspace_permissions(instance.workspace_id)
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def invalidate_on_role_permission_change(sender, instance, **kwargs):
+    try:
+        workspace_id = instance.role.workspace_id
+    except WorkspaceRole.DoesNotExist:
+        return
+    invalidate_workspace_permissions(workspace_id)
+
+
+@receiver([post_save, post_delete], sender=UserPermissionOverride)
+def invalidate_on_override_change(sender, instance, **kwargs):
+    try:
+        workspace_id = instance.membership.workspace_id
+    except WorkspaceMembership.DoesNotExist:
+        return
+    invalidate_workspace_permissions(workspace_id)
+
+
+# --- Denormalized permission masks ---
+
+
+@receiver(post_save, sender=WorkspaceMembership)
+def sync_masks_on_membership_change(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "role" not in update_fields:
+        return
+    sync_membership_masks([instance])
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def sync_masks_on_role_permission_change(sender, instance, **kwargs):
+    try:
+        role = instance.role
+    except WorkspaceRole.DoesNotExist:
+        return
+    sync_role_masks(role)
+
+
+@receiver([post_save, post_delete], sender=UserPermissionOverride)
+def sync_masks_on_override_change(sender, instance, **kwargs):
+    try:
+        membership = instance.membership
+    except WorkspaceMembership.DoesNotExist:
+        return
+    sync_membership_masks([membership])
+
+
+# --- Profile snapshot cache invalidation ---
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_on_user_change(sender, instance, **kwargs):
+    invalidate_profiles([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=WorkspaceMembership)
+def invalidate_profile_on_membership_change(sender, instance, **kwargs):
+    invalidate_profiles([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=UserPermissionOverride)
+def invalidate_profile_on_override_change(sender, instance, **kwargs):
+    try:
+        user_id = instance.membership.user_id
+    except WorkspaceMembership.DoesNotExist:
+        return
+    invalidate_profiles([user_id])
+
+
+@receiver([post_save, post_delete], sender=Workspace)
+def invalidate_profiles_on_workspace_change(sender, instance, **kwargs):
+    invalidate_profiles(_workspace_member_ids([instance.pk]))
+
+
+@receiver([post_save, post_delete], sender=WorkspaceRole)
+@receiver([post_save, post_delete], sender=Subscription)
+def invalidate_profiles_on_workspace_row_change(sender, instance, **kwargs):
+    invalidate_profiles(_workspace_member_ids([instance.workspace_id]))
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def invalidate_profiles_on_role_permission_change(sender, instance, **kwargs):
+    try:
+        workspace_id = instance.role.workspace_id
+    except WorkspaceRole.DoesNotExist:
+        return
+    invalidate_profiles(_workspace_member_ids([workspace_id]))
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def invalidate_profiles_on_organization_change(sender, instance, **kwargs):
+    workspace_ids = Workspace.all_objects.filter(organization=instance).values_list(
+        "pk", flat=True
+    )
+    invalidate_profiles(_workspace_member_ids(workspace_ids))
+
+
+# --- Stripe webhooks ---
+
+
+webhook_post_validate.connect(
+    enqueue_webhook, dispatch_uid="workspace.billing_webhooks.enqueue"
+)
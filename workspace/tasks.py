@@ -0,0 +1,11 @@
+from workspace.services.billing_webhooks import apply_webhook, redrive_webhooks
+
+
+def apply_stripe_webhook(trigger_id: int) -> bool:
+    """django-q2 task: apply a verified Stripe webhook stored by dj-stripe."""
+    return apply_webhook(trigger_id)
+
+
+def redrive_stripe_webhooks() -> int:
+    """django-q2 schedule: reprocess verified webhooks dj-stripe failed on."""
+    return redrive_webhooks()
@@ -1,5 +1,9 @@
 import factory
 import pytest
+from django.core.cache import cache
+from common import config as dyn
+from common.services.query_profiler import request_profiled
+from workspace.services import role_templates
 from django.contrib.auth import get_user_model
 from factory.django import DjangoModelFactory
 from rest_framework.test import APIClient
@@ -39,6 +43,74 @@ class UserFactory(DjangoModelFactory):
 # --- Fixtures ---
 
 
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    """Isolate each test from the shared file-based cache."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    """Keep request metrics files out of the project directory."""
+    settings.METRICS_DIR = tmp_path / "metrics"
+
+
+@pytest.fixture(autouse=True)
+def constance_snapshot():
+    """Reload dynamic settings from each test's own database state."""
+    dyn._snapshot.update(values=None, version=None, expires=0.0)
+    yield
+    dyn._snapshot.update(values=None, version=None, expires=0.0)
+
+
+@pytest.fixture(autouse=True)
+def system_role_templates():
+    """Recreate the shared role templates inside each test's transaction."""
+    role_templates._templates_ready = False
+    yield
+    role_templates._templates_ready = False
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request, settings):
+    """Enforce ``@pytest.mark.query_budget`` on every request the test makes."""
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is None:
+        yield None
+        return
+    budget = dict(zip(("max_queries", "max_repeats"), marker.args), **marker.kwargs)
+    max_queries = budget.get("max_queries")
+    max_repeats = budget.get("max_repeats")
+    settings.QUERY_PROFILER_ENABLED = True
+    profiles = []
+
+    def collect(sender, profile, **kwargs):
+        profiles.append(profile)
+
+    request_profiled.connect(collect, weak=False)
+    try:
+        yield profiles
+    finally:
+        request_profiled.disconnect(collect)
+
+    over = [
+        profile
+        for profile in profiles
+        if (max_queries is not None and profile.total > max_queries)
+        or (max_repeats is not None and profile.max_repeats > max_repeats)
+    ]
+    if over:
+        pytest.fail(
+            f"Query budget exceeded (max_queries={max_queries}, "
+            f"max_repeats={max_repeats}):\n"
+            + "\n".join(profile.report() for profile in over),
+            pytrace=False,
+        )
+
+
 @pytest.fixture
 def api_client():
     """Provides an API client for testing."""
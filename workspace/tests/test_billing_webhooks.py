@@ -0,0 +1,177 @@
+import hmac
+import json
+import time
+import hashlib
+import logging
+from datetime import timedelta
+import pytest
+from django.urls import reverse
+from django_q.conf import Conf
+from safedelete import HARD_DELETE
+from djstripe.models import WebhookEndpoint, WebhookEventTrigger
+from workspace.models import Subscription
+from workspace.services.billing import confirm_checkout_session
+from workspace.services.billing_webhooks import redrive_webhooks
+from workspace.services.onboarding import choose_plan, create_workspace_with_defaults
+from workspace.services.stripe_client import stripe_clients
+
+SECRET = "whsec_test"
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    monkeypatch.setattr(Conf, "SYNC", True)
+    return WebhookEndpoint.objects.create(
+        id="we_test",
+        livemode=False,
+        url="https://example.com/api/stripe/webhook/",
+        secret=SECRET,
+        enabled_events=["checkout.session.completed"],
+    )
+
+
+@pytest.fixture
+def stripe_sync(monkeypatch):
+    """Stand in for dj-stripe mirroring the event, which calls Stripe."""
+    state = {"fail": False}
+
+    def process(self, save=True, api_key=None):
+        if state["fail"]:
+            raise RuntimeError("Stripe is unavailable")
+        self.exception = self.traceback = ""
+        self.processed = True
+        if save:
+            self.save()
+
+    monkeypatch.setattr(WebhookEventTrigger, "process", process)
+    return state
+
+
+@pytest.fixture
+def deliver(api_client, endpoint, stripe_sync, django_capture_on_commit_callbacks):
+    url = reverse("djstripe:djstripe_webhook_by_uuid", args=[endpoint.djstripe_uuid])
+
+    def post(event):
+        body = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            SECRET.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256
+        ).hexdigest()
+        with django_capture_on_commit_callbacks(execute=True):
+            return api_client.post(
+                url,
+                body,
+                content_type="application/json",
+                HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={signature}",
+            )
+
+    return post
+
+
+def _completed(workspace, plan, event_id="evt_1"):
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "checkout.session.completed",
+        "livemode": False,
+        "api_version": "2024-06-20",
+        "created": int(time.time()),
+        "data": {
+            "object": {
+                "id": "cs_1",
+                "object": "checkout.session",
+                "payment_status": "paid",
+                "client_reference_id": str(workspace.id),
+                "metadata": {"workspace_id": str(workspace.id), "plan": plan},
+            }
+        },
+    }
+
+
+@pytest.mark.django_db
+def test_webhook_confirms_plan_and_confirm_skips_stripe(deliver, user):
+    ws = create_workspace_with_defaults(user, "Hook WS")
+    choose_plan(ws, "pro")
+
+    response = deliver(_completed(ws, "pro"))
+
+    assert response.status_code == 200
+    sub = Subscription.objects.get(workspace=ws)
+    assert (sub.plan, sub.pending_plan, sub.status) == ("pro", None, "active")
+    assert WebhookEventTrigger.objects.get().valid
+
+    # The success page confirms from local state: no Stripe client is needed
+    with stripe_clients.override(object()):
+        ws.refresh_from_db()
+        data = confirm_checkout_session(workspace=ws, session_id="cs_1")
+    assert data["plan"] == "pro"
+
+
+@pytest.mark.django_db
+def test_redelivered_event_does_not_confirm_a_newer_choice(deliver, user):
+    ws = create_workspace_with_defaults(user, "Redelivery WS")
+    choose_plan(ws, "pro")
+    deliver(_completed(ws, "pro"))
+
+    choose_plan(ws, "business")
+    deliver(_completed(ws, "pro"))
+
+    sub = Subscription.objects.get(workspace=ws)
+    assert (sub.plan, sub.pending_plan) == ("pro", "business")
+
+
+@pytest.mark.django_db
+def test_invalid_signature_is_rejected(api_client, endpoint, user):
+    ws = create_workspace_with_defaults(user, "Forged WS")
+    choose_plan(ws, "pro")
+    url = reverse("djstripe:djstripe_webhook_by_uuid", args=[endpoint.djstripe_uuid])
+
+    response = api_client.post(
+        url,
+        json.dumps(_completed(ws, "pro")),
+        content_type="application/json",
+        HTTP_STRIPE_SIGNATURE=f"t={int(time.time())},v1=forged",
+    )
+
+    assert response.status_code == 400
+    assert Subscription.objects.get(workspace=ws).plan == "free"
+
+
+@pytest.mark.django_db
+def test_failed_sync_keeps_the_plan_and_is_redriven(
+    api_client, deliver, stripe_sync, user, caplog
+):
+    ws = create_workspace_with_defaults(user, "Redrive WS")
+    choose_plan(ws, "pro")
+    api_client.raise_request_exception = False
+    stripe_sync["fail"] = True
+
+    response = deliver(_completed(ws, "pro"))
+
+    # dj-stripe answers 500 so Stripe redelivers, but the plan is settled
+    assert response.status_code == 500
+    assert Subscription.objects.get(workspace=ws).plan == "pro"
+    trigger = WebhookEventTrigger.objects.get()
+    assert not trigger.processed and trigger.exception
+
+    with caplog.at_level(logging.ERROR, logger="workspace.services.billing_webhooks"):
+        assert redrive_webhooks(older_than=timedelta(0)) == 1
+    assert "still unprocessed" in caplog.text
+
+    stripe_sync["fail"] = False
+    assert redrive_webhooks(older_than=timedelta(0)) == 0
+    trigger.refresh_from_db()
+    assert trigger.processed and not trigger.exception
+
+
+@pytest.mark.django_db
+def test_workspace_without_subscription_is_skipped(deliver, user, caplog):
+    ws = create_workspace_with_defaults(user, "No Sub WS")
+    Subscription.all_objects.filter(workspace=ws).delete(force_policy=HARD_DELETE)
+
+    with caplog.at_level(logging.WARNING, logger="workspace.services.billing_webhooks"):
+        response = deliver(_completed(ws, "pro"))
+
+    assert response.status_code == 200
+    assert "has no subscription" in caplog.text
+    assert WebhookEventTrigger.objects.get().processed
@@ -0,0 +1,245 @@
+import io
+from datetime import timedelta
+import pytest
+from PIL import Image
+from safedelete import HARD_DELETE
+from django_q.conf import Conf
+from django.core.files.uploadedfile import SimpleUploadedFile
+from common.models import ImageProcessingStatus, MediaBlob
+from common.services.image import ImageTooLargeError
+from common.services.media import MediaCleanup
+from common.tasks import optimize_image_field
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from workspace.models import Organization
+from workspace.services.onboarding import create_workspace_with_defaults
+from .conftest import UserFactory
+
+
+def _png_upload(name="logo.png", size=(64, 48)) -> SimpleUploadedFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "#0af").save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@pytest.fixture
+def media_root(settings, tmp_path, monkeypatch):
+    settings.MEDIA_ROOT = tmp_path
+    # Run queued tasks (file deletions) in-process
+    monkeypatch.setattr(Conf, "SYNC", True)
+    return tmp_path
+
+
+@pytest.fixture
+def committed(django_capture_on_commit_callbacks):
+    """Context manager running the on-commit callbacks of the wrapped block."""
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+@pytest.mark.django_db
+def test_logo_upload_defers_optimization(
+    media_root, committed, django_capture_on_commit_callbacks
+):
+    owner = UserFactory(username="logo-owner")
+    with django_capture_on_commit_callbacks() as callbacks:
+        org = Organization.objects.create(owner=owner, name="Logo Co", logo=_png_upload())
+
+    # The original is stored as-is and the conversion is queued after commit
+    assert org.logo.name.endswith(".png")
+    assert org.logo_status == ImageProcessingStatus.PENDING
+    assert (media_root / org.logo.name).exists()
+    assert len(callbacks) == 1
+
+    with committed():
+        assert optimize_image_field(
+            "workspace.Organization", str(org.pk), "logo", org.logo.name
+        )
+    org.refresh_from_db()
+    assert org.logo.name.endswith(".webp")
+    assert org.logo_status == ImageProcessingStatus.READY
+    assert not list(media_root.rglob("*.png"))
+
+
+@pytest.mark.django_db
+def test_logo_variants_are_generated_and_cleaned_up(media_root, committed):
+    owner = UserFactory(username="logo-owner3")
+    org = Organization.objects.create(
+        owner=owner, name="Variant Co", logo=_png_upload(size=(400, 200))
+    )
+    assert org.logo_variants is None
+    with committed():
+        optimize_image_field(
+            "workspace.Organization", str(org.pk), "logo", org.logo.name
+        )
+    org.refresh_from_db()
+
+    variants = org.logo_variants
+    assert set(variants) == {"thumbnail", "small", "medium"}
+    assert set(variants["small"]) == {"avif", "webp"}
+    assert variants["small"]["webp"].endswith(f"{org.logo.name}.small.webp")
+    thumb = media_root / f"{org.logo.name}.thumbnail.webp"
+    with Image.open(thumb) as img:
+        assert max(img.size) <= 64
+
+    with committed():
+        org.delete(force_policy=HARD_DELETE)
+    assert not list(media_root.rglob("*.*"))
+
+
+@pytest.mark.django_db
+def test_optimization_skips_replaced_logo(media_root):
+    owner = UserFactory(username="logo-owner2")
+    org = Organization.objects.create(owner=owner, name="Swap Co", logo=_png_upload())
+    stale_name = org.logo.name
+
+    org.logo = _png_upload("newer.png")
+    org.save()
+
+    assert not optimize_image_field(
+        "workspace.Organization", str(org.pk), "logo", stale_name
+    )
+    org.refresh_from_db()
+    assert org.logo.name.endswith("newer.png")
+
+
+@pytest.mark.django_db
+def test_failed_optimization_invalidates_member_profiles(media_root, monkeypatch):
+    owner = UserFactory(username="logo-owner8")
+    org = Organization.objects.create(owner=owner, name="Fail Co", logo=_png_upload())
+    create_workspace_with_defaults(owner, "Fail WS", organization=org)
+    field = Organization._meta.get_field("logo")
+
+    def too_large(instance, file):
+        raise ImageTooLargeError("too many pixels")
+
+    monkeypatch.setattr(field, "store_optimized", too_large)
+    invalidated = []
+    monkeypatch.setattr(
+        "workspace.signals.invalidate_profiles",
+        lambda user_ids: invalidated.extend(user_ids),
+    )
+
+    assert not optimize_image_field(
+        "workspace.Organization", str(org.pk), "logo", org.logo.name
+    )
+    org.refresh_from_db()
+    assert org.logo_status == ImageProcessingStatus.FAILED
+    assert owner.pk in invalidated
+
+
+@pytest.mark.django_db
+def test_identical_logos_share_one_blob(media_root, committed):
+    owner = UserFactory(username="logo-owner4")
+    orgs = []
+    for name in ("Brand A", "Brand B"):
+        org = Organization.objects.create(owner=owner, name=name, logo=_png_upload())
+        optimize_image_field(
+            "workspace.Organization", str(org.pk), "logo", org.logo.name
+        )
+        org.refresh_from_db()
+        orgs.append(org)
+
+    shared = orgs[0].logo.name
+    assert orgs[1].logo.name == shared
+    assert MediaBlob.objects.get(name=shared).ref_count == 2
+
+    with committed():
+        orgs[0].delete(force_policy=HARD_DELETE)
+    assert (media_root / shared).exists()
+    assert MediaBlob.objects.get(name=shared).ref_count == 1
+
+    with committed():
+        orgs[1].delete(force_policy=HARD_DELETE)
+    assert not (media_root / shared).exists()
+    assert not MediaBlob.objects.filter(name=shared).exists()
+
+
+@pytest.mark.django_db
+def test_logo_replacement_needs_no_select(media_root, committed):
+    owner = UserFactory(username="logo-owner5")
+    org = Organization.objects.create(owner=owner, name="Edit Co", logo=_png_upload())
+    with committed():
+        optimize_image_field(
+            "workspace.Organization", str(org.pk), "logo", org.logo.name
+        )
+    org.refresh_from_db()
+    stored = org.logo.name
+
+    def logo_selects(ctx):
+        return [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and '"logo"' in q["sql"]
+        ]
+
+    org.brand = {"color": "#0af"}
+    with CaptureQueriesContext(connection) as ctx:
+        org.save(update_fields=["brand"])
+    assert not logo_selects(ctx)
+
+    org = Organization.objects.get(pk=org.pk)
+    org.logo = _png_upload("replacement.png", size=(32, 32))
+    with committed(), CaptureQueriesContext(connection) as ctx:
+        org.save()
+    assert not logo_selects(ctx)
+    assert not (media_root / stored).exists()
+    org.refresh_from_db()
+    assert (media_root / org.logo.name).exists()
+
+
+@pytest.mark.django_db
+def test_rolled_back_replacement_keeps_file(media_root, committed):
+    owner = UserFactory(username="logo-owner6")
+    org = Organization.objects.create(owner=owner, name="Undo Co", logo=_png_upload())
+    stored = org.logo.name
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            org.logo = _png_upload("other.png")
+            org.save()
+            raise RuntimeError
+    # Nothing is deleted until the replacing transaction commits
+    assert (media_root / stored).exists()
+
+
+@pytest.mark.django_db
+def test_sweep_removes_only_orphans(media_root):
+    owner = UserFactory(username="logo-owner7")
+    org = Organization.objects.create(owner=owner, name="Sweep Co", logo=_png_upload())
+    orphan = media_root / "org_logos" / "orphan.png"
+    orphan.write_bytes(b"stale")
+
+    assert MediaCleanup.sweep(grace=timedelta(hours=1)) == []
+    assert MediaCleanup.sweep(grace=timedelta(0)) == ["org_logos/orphan.png"]
+    assert not orphan.exists()
+    assert (media_root / org.logo.name).exists()
+
+
+@pytest.mark.django_db
+def test_sweep_keeps_variants_of_referenced_logos(media_root, committed):
+    owner = UserFactory(username="logo-owner9")
+    org = Organization.objects.create(
+        owner=owner, name="Variant Sweep Co", logo=_png_upload(size=(400, 200))
+    )
+    with committed():
+        optimize_image_field(
+            "workspace.Organization", str(org.pk), "logo", org.logo.name
+        )
+    org.refresh_from_db()
+    field = Organization._meta.get_field("logo")
+    variants = field.variant_names(org.logo.name)
+    assert variants and all((media_root / name).exists() for name in variants)
+    # A blob whose row let go of it keeps its variants until the blob goes
+    unowned = MediaBlob.objects.create(name="org_logos/unowned.webp", digest="x")
+    for name in [unowned.name, *field.variant_names(unowned.name)]:
+        (media_root / name).write_bytes(b"blob")
+    orphan = media_root / "org_logos" / "orphan.png.small.webp"
+    orphan.write_bytes(b"stale")
+
+    assert MediaCleanup.sweep(grace=timedelta(0)) == [
+        "org_logos/orphan.png.small.webp"
+    ]
+    assert all((media_root / name).exists() for name in variants)
+    assert all(
+        (media_root / name).exists() for name in field.variant_names(unowned.name)
+    )
@@ -0,0 +1,207 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .conftest import UserFactory
+from workspace.config.registry import (
+    get_permissions_registry,
+    reload_permissions_registry,
+)
+from workspace.config.types import PermissionCode as PC
+from workspace.models import PermissionScope, UserPermissionOverride
+from workspace.services.access_control import has_workspace_permission
+from workspace.services.onboarding import create_workspace_with_defaults
+from workspace.services import role_templates
+from workspace.services.permission_masks import resync_masks, stored_masks
+from workspace.services.role_templates import workspace_role
+from workspace.services.roles import customize_role
+
+
+@pytest.mark.django_db
+def test_warm_permission_check_costs_no_queries(django_assert_num_queries):
+    owner = UserFactory(username="cache-owner")
+    ws = create_workspace_with_defaults(owner, "Cached WS")
+
+    assert has_workspace_permission(owner, ws, "subscription", "change")
+    with django_assert_num_queries(0):
+        assert has_workspace_permission(owner, ws, "subscription", "change")
+        assert has_workspace_permission(owner, ws, "roles", "view")
+
+
+@pytest.mark.django_db
+def test_override_invalidates_compiled_permissions():
+    owner = UserFactory(username="cache-owner2")
+    member = UserFactory(username="cache-member")
+    ws = create_workspace_with_defaults(owner, "Override WS")
+    membership = ws.memberships.create(
+        user=member, role=workspace_role(ws, "Member")
+    )
+
+    assert not has_workspace_permission(member, ws, "subscription", "view")
+    override = UserPermissionOverride.objects.create(
+        membership=membership, code="subscription.view", scope=PermissionScope.OWN
+    )
+    assert not has_workspace_permission(member, ws, "subscription", "view")
+    assert has_workspace_permission(
+        member, ws, "subscription", "view", owner_id=member.id
+    )
+
+    override.scope = PermissionScope.ALL
+    override.save()
+    assert has_workspace_permission(member, ws, "subscription", "view")
+
+    override.delete()
+    assert not has_workspace_permission(member, ws, "subscription", "view")
+
+
+@pytest.mark.django_db
+def test_deactivated_membership_loses_permissions():
+    owner = UserFactory(username="cache-owner3")
+    ws = create_workspace_with_defaults(owner, "Inactive WS")
+    assert has_workspace_permission(owner, ws, "organization", "view")
+
+    membership = ws.memberships.get(user=owner)
+    membership.is_active = False
+    membership.save()
+    assert not has_workspace_permission(owner, ws, "organization", "view")
+
+
+@pytest.mark.django_db
+def test_workspace_request_resolves_rows_once(
+    authenticated_client, user, django_assert_num_queries
+):
+    ws = create_workspace_with_defaults(user, "Resolved WS")
+    url = reverse("subscription")
+    headers = {"HTTP_X_WORKSPACE_ID": str(ws.id)}
+    assert authenticated_client.get(url, **headers).status_code == 200
+
+    # One membership query carries workspace, role and subscription
+    with django_assert_num_queries(1):
+        response = authenticated_client.get(url, **headers)
+    assert response.status_code == 200
+    assert response.data["plan"] == "free"
+
+
+@pytest.mark.django_db
+def test_customized_role_is_copied_for_one_workspace_only():
+    owner = UserFactory(username="cow-owner")
+    member = UserFactory(username="cow-member")
+    ws = create_workspace_with_defaults(owner, "Custom WS")
+    other = create_workspace_with_defaults(owner, "Template WS")
+    template = workspace_role(ws, "Member")
+    membership = ws.memberships.create(user=member, role=template)
+    other.memberships.create(user=member, role=template)
+    assert not has_workspace_permission(member, ws, "subscription", "view")
+
+    role = customize_role(ws, "Member")
+    assert role.workspace_id == ws.pk
+    assert customize_role(ws, "Member") == role
+    membership.refresh_from_db()
+    assert membership.role == role
+    assert set(role.permissions.values_list("code", flat=True)) == {
+        "invites.view",
+        "organization.view",
+    }
+
+    role.permissions.create(code="subscription.view", scope=PermissionScope.ALL)
+    assert has_workspace_permission(member, ws, "subscription", "view")
+    assert not has_workspace_permission(member, other, "subscription", "view")
+    assert workspace_role(other, "Member") == template
+
+
+@pytest.mark.django_db
+def test_membership_masks_follow_role_and_override_writes(
+    django_assert_num_queries,
+):
+    owner = UserFactory(username="mask-owner")
+    member = UserFactory(username="mask-member")
+    ws = create_workspace_with_defaults(owner, "Mask WS")
+    registry = get_permissions_registry()
+    owner_membership = ws.memberships.get(user=owner)
+    assert stored_masks(owner_membership).all & registry["roles.change"].mask
+
+    membership = ws.memberships.create(
+        user=member, role=workspace_role(ws, "Member")
+    )
+    with django_assert_num_queries(0):
+        assert has_workspace_permission(
+            member, ws, "invites", "view", membership=membership
+        )
+        assert not has_workspace_permission(
+            member, ws, "subscription", "view", membership=membership
+        )
+
+    UserPermissionOverride.objects.create(
+        membership=membership, code="subscription.view", scope=PermissionScope.OWN
+    )
+    membership.refresh_from_db()
+    assert has_workspace_permission(
+        member, ws, "subscription", "view", owner_id=member.id, membership=membership
+    )
+    assert not has_workspace_permission(
+        member, ws, "subscription", "view", membership=membership
+    )
+
+    role = customize_role(ws, "Member")
+    role.permissions.create(code="subscription.view", scope=PermissionScope.ALL)
+    membership.refresh_from_db()
+    masks = stored_masks(membership)
+    assert masks.all & registry["subscription.view"].mask
+    assert not masks.own & registry["subscription.view"].mask
+    assert has_workspace_permission(
+        member, ws, "subscription", "view", membership=membership
+    )
+
+
+@pytest.mark.django_db
+def test_stale_masks_are_checked_read_only_and_resynced():
+    owner = UserFactory(username="stale-owner")
+    ws = create_workspace_with_defaults(owner, "Stale WS")
+    ws.memberships.update(masks_version="", all_scope_mask=0)
+    membership = ws.memberships.select_related("role").get()
+    assert stored_masks(membership) is None
+
+    # Answered from the compiled cache without writing the row
+    with CaptureQueriesContext(connection) as queries:
+        assert has_workspace_permission(
+            owner, ws, "subscription", "change", membership=membership
+        )
+    assert not [q for q in queries if not q["sql"].startswith("SELECT")]
+    membership.refresh_from_db()
+    assert stored_masks(membership) is None
+
+    assert resync_masks() == 1
+    membership.refresh_from_db()
+    assert stored_masks(membership).all & (
+        get_permissions_registry()["subscription.change"].mask
+    )
+
+
+@pytest.mark.django_db
+def test_template_grant_changes_invalidate_stored_masks(monkeypatch):
+    owner = UserFactory(username="template-owner")
+    member = UserFactory(username="template-member")
+    ws = create_workspace_with_defaults(owner, "Template WS")
+    membership = ws.memberships.create(
+        user=member, role=workspace_role(ws, "Member")
+    )
+    signature = get_permissions_registry().signature
+    assert stored_masks(membership) is not None
+
+    # Same permission codes, but the Member template now also views billing
+    defs = dict(role_templates.DEFAULT_ROLE_DEFS)
+    defs["Member"] = [*defs["Member"], (PC.SUBSCRIPTION_VIEW, PermissionScope.ALL)]
+    monkeypatch.setattr(role_templates, "DEFAULT_ROLE_DEFS", defs)
+    try:
+        assert reload_permissions_registry().signature == signature
+        membership = ws.memberships.select_related("role").get(user=member)
+        assert stored_masks(membership) is None
+
+        resync_masks()
+        membership.refresh_from_db()
+        assert has_workspace_permission(
+            member, ws, "subscription", "view", membership=membership
+        )
+    finally:
+        monkeypatch.undo()
+        reload_permissions_registry()
@@ -0,0 +1,81 @@
+import sys
+import types
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.conf import settings as django_settings
+from workspace.config.registry import (
+    DEFAULT_PERMISSION_MODULES,
+    PermissionDef,
+    get_permissions_registry,
+    reload_permissions_registry,
+)
+from workspace.models import PermissionScope
+from workspace.services.role_templates import template_grants
+
+
+@pytest.fixture
+def permission_module(monkeypatch):
+    """Register an importable module whose ``PERMS`` the test fills in."""
+    modules = getattr(
+        django_settings, "WORKSPACE_PERMISSION_MODULES", DEFAULT_PERMISSION_MODULES
+    )
+    module = types.ModuleType("workspace_test_perms")
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    yield module
+    reload_permissions_registry(modules)
+
+
+def test_registry_is_built_once_and_frozen():
+    registry = get_permissions_registry()
+    assert get_permissions_registry() is registry
+    perm = registry["roles.change"]
+    assert perm == PermissionDef(
+        "roles.change", "roles", "change", PermissionScope.ALL, perm.bit
+    )
+    assert len({perm.mask for perm in registry.values()}) == len(registry)
+    assert registry.lookup("roles", "change") is registry["roles.change"]
+    assert registry.lookup("roles", "delete") is None
+    with pytest.raises(TypeError):
+        registry._by_code["roles.delete"] = None
+
+
+def test_reload_picks_up_new_modules(settings, permission_module):
+    permission_module.PERMS = {"reports.export": PermissionScope.OWN}
+    settings.WORKSPACE_PERMISSION_MODULES = [
+        "workspace.config.permissions",
+        permission_module.__name__,
+    ]
+    before = template_grants()
+
+    registry = reload_permissions_registry()
+
+    assert get_permissions_registry() is registry
+    assert registry.lookup("reports", "export").scope == PermissionScope.OWN
+    assert "roles.view" in registry
+    assert template_grants() is not before
+
+
+@pytest.mark.parametrize(
+    "perms",
+    [
+        None,
+        {"reports": PermissionScope.ALL},
+        {"reports.export": "all"},
+        {"roles.view": PermissionScope.OWN},
+    ],
+    ids=["missing", "malformed-code", "bad-scope", "conflict"],
+)
+def test_invalid_modules_fail_loudly(settings, permission_module, perms):
+    permission_module.PERMS = perms
+    settings.WORKSPACE_PERMISSION_MODULES = [
+        "workspace.config.permissions",
+        permission_module.__name__,
+    ]
+    with pytest.raises(ImproperlyConfigured):
+        reload_permissions_registry()
+
+
+def test_unimportable_module_fails_loudly(settings, permission_module):
+    settings.WORKSPACE_PERMISSION_MODULES = ["workspace.config.no_such_module"]
+    with pytest.raises(ImproperlyConfigured):
+        reload_permissions_registry()
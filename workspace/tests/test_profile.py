@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from common import config as dyn
+from workspace.services.onboarding import create_workspace_with_defaults
+
+
+def _profile_queries(client) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("user-profile"))
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_profile_query_count_is_independent_of_memberships(
+    authenticated_client, user
+):
+    create_workspace_with_defaults(user, "Profile WS 0")
+    dyn.snapshot()  # dynamic settings are loaded once per worker
+    baseline = _profile_queries(authenticated_client)
+
+    for i in range(1, 6):
+        create_workspace_with_defaults(user, f"Profile WS {i}")
+    assert _profile_queries(authenticated_client) == baseline
+    # memberships (+ workspace, org, subscription, role), role grants, overrides
+    assert baseline <= 3
+
+
+@pytest.mark.django_db
+def test_profile_includes_subscription_and_permissions(authenticated_client, user):
+    create_workspace_with_defaults(user, "Snapshot WS")
+    response = authenticated_client.get(reverse("user-profile"))
+
+    [workspace] = response.data["workspaces"]
+    assert workspace["subscription"]["plan"] == "free"
+    assert workspace["role"]["name"] == "Owner"
+    assert {"code": "subscription.change", "scope": "all"} in workspace["permissions"]
+
+
+@pytest.mark.django_db
+def test_profile_etag_revalidation(
+    authenticated_client, user, django_assert_num_queries
+):
+    ws = create_workspace_with_defaults(user, "ETag WS")
+    url = reverse("user-profile")
+    first = authenticated_client.get(url)
+    etag = first["ETag"]
+
+    with django_assert_num_queries(0):
+        cached = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304
+    assert cached["ETag"] == etag
+
+    # Any write to a table the profile depends on invalidates the snapshot
+    sub = ws.subscription
+    sub.pending_plan = "pro"
+    sub.save()
+    changed = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+    assert changed.data["workspaces"][0]["subscription"]["pending_plan"] == "pro"
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+from common import config as dyn
+from common.services.query_profiler import QueryProfiler, fingerprint
+from workspace.models import Organization, Workspace
+from workspace.services.onboarding import create_workspace_with_defaults
+from workspace.services.role_templates import ensure_system_roles
+
+
+def _workspaces_with_orgs(user, count):
+    for i in range(count):
+        ws = create_workspace_with_defaults(user, f"Budget WS {i}")
+        ws.organization = Organization.objects.create(name=f"Org {i}", owner=user)
+        ws.save()
+    dyn.snapshot()  # dynamic settings are loaded once per worker
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"
+    ) == fingerprint("SELECT *  FROM t WHERE id IN (%s) AND name = 'y''z' LIMIT 5")
+
+
+@pytest.mark.django_db
+def test_profiler_reports_repeated_shapes_with_origin(user):
+    _workspaces_with_orgs(user, 3)
+    with QueryProfiler("orgs") as profile:
+        names = [ws.organization.name for ws in Workspace.objects.all()]
+
+    assert len(names) == 3
+    [repeated] = profile.duplicates(threshold=3)
+    assert repeated.count == 3
+    [origin] = repeated.origins
+    assert origin.startswith("workspace/tests/test_query_budget.py:")
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(max_queries=4, max_repeats=1)
+def test_workspace_list_query_budget(authenticated_client, user):
+    _workspaces_with_orgs(user, 4)
+    response = authenticated_client.get(reverse("workspaces"))
+    assert response.status_code == 200
+    assert len(response.data) == 4
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(max_queries=4, max_repeats=1)
+def test_membership_list_query_budget(authenticated_client, user):
+    _workspaces_with_orgs(user, 4)
+    response = authenticated_client.get(reverse("my-memberships"))
+    assert response.status_code == 200
+    assert len(response.data) == 4
+
+
+@pytest.mark.django_db
+def test_workspace_creation_writes_each_table_once(authenticated_client, user):
+    dyn.snapshot()
+    ensure_system_roles()
+    payload = {"name": "Bulk WS", "plan": "pro"}
+    # Workspace, membership, subscription and 3 history inserts, plus two
+    # savepoints (view and service) and their releases; roles are shared
+    with QueryProfiler("create") as profile:
+        response = authenticated_client.post(
+            reverse("workspaces"), payload, format="json"
+        )
+
+    assert response.status_code == 201
+    writes = [s for s in profile.shapes.values() if s.sql.startswith("INSERT")]
+    assert all(shape.count == 1 for shape in writes)
+    assert profile.total == 10, profile.report(threshold=1)
+
+    ws = Workspace.objects.get(pk=response.data["id"])
+    assert ws.subscription.pending_plan == "pro"
+    assert not ws.roles.exists()
+    role = ws.memberships.get().role
+    assert role.name == "Owner" and role.workspace_id is None
@@ -0,0 +1,127 @@
+import pytest
+from rest_framework import generics, serializers
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APIRequestFactory, force_authenticate
+from .conftest import UserFactory
+from workspace.models import (
+    PermissionScope,
+    UserPermissionOverride,
+    WorkspaceMembership,
+)
+from workspace.services.access_control import (
+    WorkspaceRBACPermission,
+    WorkspaceScopedQuerysetMixin,
+    authorize_many,
+    scope_queryset,
+)
+from workspace.services.onboarding import create_workspace_with_defaults
+from workspace.services.role_templates import workspace_role
+
+
+class MembershipSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkspaceMembership
+        fields = ["id", "user"]
+
+
+class OwnedMembershipsView(WorkspaceScopedQuerysetMixin, generics.ListAPIView):
+    """Memberships stand in for an owner-scoped resource, owned by `user`."""
+
+    permission_classes = [IsAuthenticated, WorkspaceRBACPermission]
+    serializer_class = MembershipSerializer
+    resource = "subscription"
+    owner_field = "user"
+    pagination_class = None
+
+    def get_queryset(self):
+        return WorkspaceMembership.objects.filter(
+            workspace=self.get_workspace(self.request)
+        )
+
+
+@pytest.fixture
+def team():
+    owner = UserFactory(username="scope-owner")
+    member = UserFactory(username="scope-member")
+    ws = create_workspace_with_defaults(owner, "Scoped WS")
+    membership = ws.memberships.create(
+        user=member, role=workspace_role(ws, "Member")
+    )
+    for i in range(5):
+        ws.memberships.create(
+            user=UserFactory(username=f"scope-other{i}"),
+            role=workspace_role(ws, "Member"),
+        )
+    UserPermissionOverride.objects.create(
+        membership=membership, code="subscription.view", scope=PermissionScope.OWN
+    )
+    membership.refresh_from_db()
+    return ws, owner, member, membership
+
+
+def _list(ws, user):
+    request = APIRequestFactory().get("/", HTTP_X_WORKSPACE_ID=str(ws.pk))
+    force_authenticate(request, user=user)
+    return OwnedMembershipsView.as_view()(request)
+
+
+@pytest.mark.django_db
+def test_authorize_many_resolves_the_scope_once(team, django_assert_num_queries):
+    ws, owner, member, membership = team
+    rows = list(ws.memberships.order_by("created_at"))
+
+    with django_assert_num_queries(0):
+        flags = authorize_many(
+            member,
+            ws,
+            "subscription",
+            "view",
+            rows,
+            owner_field="user",
+            membership=membership,
+        )
+    assert flags == [row.user_id == member.id for row in rows]
+    assert not any(
+        authorize_many(member, ws, "roles", "change", rows, membership=membership)
+    )
+
+
+@pytest.mark.django_db
+def test_scope_queryset_filters_own_rows_in_sql(team, django_assert_num_queries):
+    ws, owner, member, membership = team
+    queryset = ws.memberships.all()
+
+    with django_assert_num_queries(1):
+        owned = list(
+            scope_queryset(
+                queryset,
+                member,
+                ws,
+                "subscription",
+                "view",
+                owner_field="user",
+                membership=membership,
+            )
+        )
+    assert [row.user_id for row in owned] == [member.id]
+    assert not scope_queryset(
+        queryset, member, ws, "roles", "change", membership=membership
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_scoped_list_view_costs_two_queries(team, django_assert_num_queries):
+    ws, owner, member, _ = team
+
+    # Membership with its workspace, then the list itself
+    with django_assert_num_queries(2):
+        response = _list(ws, member)
+    assert response.status_code == 200
+    assert [row["user"] for row in response.data] == [member.id]
+
+    with django_assert_num_queries(2):
+        response = _list(ws, owner)
+    assert len(response.data) == 7
+
+    outsider = UserFactory(username="scope-outsider")
+    assert _list(ws, outsider).status_code == 403
@@ -0,0 +1,135 @@
+import json
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from constance import config as constance_config
+from djstripe.models import Customer
+from workspace.services.billing import (
+    confirm_checkout_session,
+    create_checkout_session,
+)
+from workspace.services.onboarding import choose_plan, create_workspace_with_defaults
+from workspace.services.stripe_client import stripe_clients
+
+
+class FakeStripe(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sessions: dict = {}
+    failures: list = []
+    peers: list = []
+    posts: list = []
+
+    def do_GET(self):
+        self.peers.append((self.client_address, self.headers["Authorization"]))
+        if self.failures:
+            status, body = self.failures.pop(), {"error": {"type": "api_error"}}
+        else:
+            session_id = self.path.split("?")[0].rsplit("/", 1)[-1]
+            status, body = 200, self.sessions[session_id]
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"] or 0)
+        params = parse_qs(self.rfile.read(length).decode())
+        self.posts.append((self.path, self.headers["Authorization"], params))
+        if self.path == "/v1/customers":
+            body = {"id": "cus_1", "object": "customer", "livemode": False}
+        else:
+            body = {
+                "id": "cs_new",
+                "object": "checkout.session",
+                "url": "https://checkout.stripe.test/cs_new",
+            }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_stripe(settings, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStripe)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeStripe.sessions, FakeStripe.failures = {}, []
+    FakeStripe.peers, FakeStripe.posts = [], []
+    settings.STRIPE_API_BASE = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setenv("STRIPE_TEST_SECRET_KEY", "sk_test_fake")
+    stripe_clients.reset()
+    yield FakeStripe
+    stripe_clients.reset()
+    server.shutdown()
+    server.server_close()
+
+
+def _paid_session(workspace, session_id):
+    return {
+        "id": session_id,
+        "object": "checkout.session",
+        "payment_status": "paid",
+        "client_reference_id": str(workspace.id),
+        "metadata": {"workspace_id": str(workspace.id)},
+    }
+
+
+@pytest.mark.django_db
+def test_confirm_reuses_one_connection_with_keyed_client(fake_stripe, user):
+    ws = create_workspace_with_defaults(user, "Billing WS")
+    for session_id in ("cs_1", "cs_2"):
+        fake_stripe.sessions[session_id] = _paid_session(ws, session_id)
+
+    choose_plan(ws, "pro")
+    ws.refresh_from_db()
+    data = confirm_checkout_session(workspace=ws, session_id="cs_1")
+    confirm_checkout_session(workspace=ws, session_id="cs_2")
+
+    assert data["plan"] == "pro"
+    [(first, auth), (second, _)] = fake_stripe.peers
+    assert first == second  # kept alive, not redialed
+    assert auth == "Bearer sk_test_fake"
+
+
+@pytest.mark.django_db
+def test_transient_stripe_errors_are_retried(fake_stripe, user):
+    ws = create_workspace_with_defaults(user, "Retry WS")
+    fake_stripe.sessions["cs_1"] = _paid_session(ws, "cs_1")
+    fake_stripe.failures.append(503)
+
+    confirm_checkout_session(workspace=ws, session_id="cs_1")
+    assert len(fake_stripe.peers) == 2
+
+
+@pytest.mark.django_db
+def test_checkout_creates_customer_with_constance_key(
+    fake_stripe, settings, monkeypatch, user
+):
+    # Keys set only in Admin (Constance): dj-stripe's own settings have none
+    monkeypatch.delenv("STRIPE_TEST_SECRET_KEY")
+    settings.STRIPE_SECRET_KEY = ""
+    constance_config.STRIPE_TEST_SECRET_KEY = "sk_test_constance"
+    constance_config.STRIPE_PRICE_PRO = "price_pro"
+    ws = create_workspace_with_defaults(user, "Checkout WS")
+
+    data = create_checkout_session(user=user, workspace=ws, plan="pro")
+
+    assert data == {"url": "https://checkout.stripe.test/cs_new"}
+    [(_, auth, customer), (_, _, session)] = fake_stripe.posts
+    assert auth == "Bearer sk_test_constance"
+    assert customer["email"] == [user.email]
+    assert session["customer"] == ["cus_1"]
+    assert Customer.objects.get(subscriber=user).livemode is False
+
+    # The customer is reused, not created again
+    create_checkout_session(user=user, workspace=ws, plan="pro")
+    assert [path for path, _, _ in fake_stripe.posts[2:]] == ["/v1/checkout/sessions"]